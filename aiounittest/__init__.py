@@ -1,9 +1,55 @@
-from .case import AsyncTestCase
-from .helpers import futurized, run_sync, async_test
+import importlib
+import sys
+
+# name -> submodule, the submodules are imported on the first use
+_exports = {
+    "AsyncTestCase": "case",
+    "serial": "case",
+    "futurized": "helpers",
+    "futurized_constant": "helpers",
+    "futurized_sequence": "helpers",
+    "run_sync": "helpers",
+    "async_test": "helpers",
+    "VirtualTimeEventLoop": "loops",
+    "AsyncTestSuite": "suite",
+    "AsyncTestLoader": "suite",
+    "async_benchmark": "benchmark",
+    "async_stress": "stress",
+}
+_submodules = ("benchmark", "blocking", "case", "durations", "executor", "helpers", "leaks", "loops", "memory", "mock",
+               "profiling", "runner", "streams", "stress", "suite", "timing", "watchdog")
 
 __all__ = [
     "AsyncTestCase",
+    "AsyncTestSuite",
+    "AsyncTestLoader",
+    "VirtualTimeEventLoop",
     "futurized",
+    "futurized_constant",
+    "futurized_sequence",
     "run_sync",
-    "async_test"
+    "async_test",
+    "serial",
+    "async_benchmark",
+    "async_stress",
 ]
+
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module('.' + _exports[name], __name__), name)
+        globals()[name] = value
+        return value
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if sys.version_info < (3, 7):
+    # no module __getattr__ (PEP 562)
+    for _name in __all__:
+        __getattr__(_name)
@@ -0,0 +1,11 @@
+import asyncio
+
+
+def _all_tasks(loop):
+    if hasattr(asyncio, 'all_tasks'):
+        return asyncio.all_tasks(loop)
+    return asyncio.Task.all_tasks(loop)  # Python < 3.7
+
+
+def _get_coro(task):
+    return task.get_coro() if hasattr(task, 'get_coro') else task._coro  # Python < 3.8
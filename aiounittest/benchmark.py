@@ -0,0 +1,216 @@
+import atexit
+import functools
+import json
+import math
+import os
+import time
+import unittest
+from .helpers import run_sync
+
+
+#: benchmarks run in this process
+results = []
+
+DEFAULT_TOLERANCE = 0.2
+
+
+class BenchmarkRegression(AssertionError):
+    ''' Raised when the benchmark is slower than its baseline.
+    '''
+
+
+class BenchmarkStats:
+    ''' Statistics of the benchmark rounds.
+
+    :ivar str name: name of the benchmark (test id by default)
+    :ivar list timings: seconds of every round, warmup excluded
+
+    '''
+    def __init__(self, name, timings):
+        self.name = name
+        self.timings = timings
+        self._sorted = sorted(timings)
+
+    @property
+    def rounds(self):
+        return len(self.timings)
+
+    @property
+    def min(self):
+        return self._sorted[0]
+
+    @property
+    def max(self):
+        return self._sorted[-1]
+
+    @property
+    def mean(self):
+        return sum(self.timings) / len(self.timings)
+
+    @property
+    def median(self):
+        return self.percentile(50)
+
+    @property
+    def p99(self):
+        return self.percentile(99)
+
+    @property
+    def ops(self):
+        ''' Operations per second, based on the mean.
+        '''
+        mean = self.mean
+        return 1 / mean if mean else float('inf')
+
+    def percentile(self, p):
+        ''' The :code:`p`-th percentile of the rounds (nearest-rank).
+        '''
+        rank = max(int(math.ceil(p / 100 * len(self._sorted))), 1)
+        return self._sorted[rank - 1]
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'rounds': self.rounds,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'median': self.median,
+            'p99': self.p99,
+            'ops': self.ops,
+        }
+
+    def __repr__(self):
+        return '<BenchmarkStats %s rounds=%d median=%.9f ops=%.1f>' % (self.name, self.rounds, self.median, self.ops)
+
+
+async def run_benchmark(coro_fn, *args, rounds=100, warmup=10, name=None, baseline=None, tolerance=None, **kwargs):
+    ''' Awaits :code:`coro_fn(*args, **kwargs)` repeatedly on the running loop and measures every round.
+
+    :param callable coro_fn: coroutine function to benchmark
+    :param int rounds: number of measured rounds
+    :param int warmup: number of rounds run before measuring
+    :param str name: name of the benchmark, the qualified name of :code:`coro_fn` by default
+    :param baseline: baseline to check against, see :code:`aiounittest.benchmark.check_baseline`
+    :param float tolerance: allowed slowdown, see :code:`aiounittest.benchmark.check_baseline`
+    :rtype: BenchmarkStats
+
+    '''
+    if rounds < 1:
+        raise ValueError('At least one round is required, got %r' % rounds)
+    for _ in range(warmup):
+        await coro_fn(*args, **kwargs)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await coro_fn(*args, **kwargs)
+        timings.append(time.perf_counter() - started)
+    stats = BenchmarkStats(name or '%s.%s' % (coro_fn.__module__, coro_fn.__qualname__), timings)
+    results.append(stats)
+    check_baseline(stats, baseline, tolerance)
+    return stats
+
+
+def _load_baseline(baseline):
+    if baseline is None:
+        baseline = os.environ.get('AIOUNITTEST_BENCHMARK_BASELINE')
+    if isinstance(baseline, str):
+        if not os.path.exists(baseline):
+            return {}
+        with open(baseline) as f:
+            return json.load(f)
+    return baseline or {}
+
+
+def check_baseline(stats, baseline=None, tolerance=None):
+    ''' Fails if the median of the benchmark exceeds the baseline by more than :code:`tolerance`.
+
+    :param BenchmarkStats stats: benchmark to check
+    :param baseline: path of the JSON file written by :code:`aiounittest.benchmark.save_baseline` or a dict
+                     of benchmark name to its stats (or median), by default :code:`AIOUNITTEST_BENCHMARK_BASELINE`
+                     environment variable
+    :param float tolerance: allowed slowdown, eg. :code:`0.2` (default) means 20% slower than the baseline
+    :raises BenchmarkRegression: if the benchmark is too slow
+
+    Benchmarks missing in the baseline are not checked.
+
+    '''
+    expected = _load_baseline(baseline).get(stats.name)
+    if expected is None:
+        return
+    if isinstance(expected, dict):
+        expected = expected['median']
+    tolerance = DEFAULT_TOLERANCE if tolerance is None else tolerance
+    if stats.median > expected * (1 + tolerance):
+        raise BenchmarkRegression('%s: median %.9fs exceeds the baseline %.9fs by more than %d%%' % (
+            stats.name, stats.median, expected, tolerance * 100))
+
+
+def save_baseline(path, stats=None):
+    ''' Writes benchmarks as the baseline, benchmarks already stored in the file are kept unless rerun.
+
+    :param str path: path of the JSON file
+    :param list stats: benchmarks to store, all run by default
+
+    '''
+    stats = results if stats is None else stats
+    baseline = _load_baseline(path)
+    baseline.update((item.name, item.as_dict()) for item in stats)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def clear():
+    ''' Removes all collected benchmarks.
+    '''
+    del results[:]
+
+
+def async_benchmark(func=None, rounds=100, warmup=10, name=None, baseline=None, tolerance=None, **kwargs):
+    ''' Runs the decorated coroutine function repeatedly on a single event loop.
+
+    :param int rounds: number of measured rounds
+    :param int warmup: number of rounds run before measuring
+    :param str name: name of the benchmark, the test id by default
+    :param baseline: baseline to check against, see :code:`aiounittest.benchmark.check_baseline`
+    :param float tolerance: allowed slowdown, see :code:`aiounittest.benchmark.check_baseline`
+
+    Remaining keyword arguments are passed to :code:`aiounittest.async_test`, which creates the loop.
+    The decorated function returns :code:`aiounittest.benchmark.BenchmarkStats`, unless it's a test method
+    (then the stats are available in :code:`aiounittest.benchmark.results`).
+
+    .. code-block:: python
+
+            class MyBenchmark(unittest.TestCase):
+
+                @async_benchmark(rounds=1000, baseline='baseline.json')
+                async def test_parse(self):
+                    await parse(PAYLOAD)
+
+    '''
+    def decorator(coro_fn):
+        @functools.wraps(coro_fn)
+        def wrapper(*args, **kw):
+            test = args[0] if args and isinstance(args[0], unittest.TestCase) else None
+            bench_name = test.id() if name is None and test is not None else name
+
+            async def bench():
+                return await run_benchmark(coro_fn, *args, rounds=rounds, warmup=warmup, name=bench_name,
+                                           baseline=baseline, tolerance=tolerance, **kw)
+            stats = run_sync(bench, **kwargs)()
+            # tests should not return anything
+            return stats if test is None else None
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def _save_at_exit():
+    path = os.environ.get('AIOUNITTEST_BENCHMARK_SAVE')
+    if path and results:
+        save_baseline(path)
+
+
+atexit.register(_save_at_exit)
@@ -0,0 +1,63 @@
+import os
+import warnings
+
+
+BLOCK_ACTIONS = ('fail', 'warn')
+
+
+class LoopBlockedError(AssertionError):
+    ''' Raised when a callback (eg. a step of a task) blocks the event loop longer than allowed.
+
+    :ivar list blocks: :code:`(seconds, description)` of the blocking callbacks
+
+    '''
+    def __init__(self, message, blocks):
+        super().__init__(message)
+        self.blocks = blocks
+
+
+class LoopBlockedWarning(RuntimeWarning):
+    ''' Warns when a callback blocks the event loop longer than allowed (the :code:`warn` action).
+    '''
+
+
+def get_threshold(max_loop_block=None):
+    ''' Seconds a single callback may block the loop, by the argument or :code:`AIOUNITTEST_MAX_LOOP_BLOCK` environment
+    variable, :code:`None` if not monitored (:code:`0` disables it, both as the argument and the variable).
+    '''
+    if max_loop_block is None:
+        max_loop_block = os.environ.get('AIOUNITTEST_MAX_LOOP_BLOCK', '')
+    if max_loop_block in (False, ''):
+        return None
+    return float(max_loop_block) or None
+
+
+def get_action(on_loop_block=None):
+    ''' What to do with the blocking callbacks, by the argument or :code:`AIOUNITTEST_ON_LOOP_BLOCK` environment variable.
+
+    :return: :code:`fail` (default) or :code:`warn`
+
+    '''
+    if on_loop_block is None:
+        on_loop_block = os.environ.get('AIOUNITTEST_ON_LOOP_BLOCK') or 'fail'
+    if on_loop_block not in BLOCK_ACTIONS:
+        raise ValueError('Unknown loop block action %r, expected one of: %s' % (on_loop_block, ', '.join(BLOCK_ACTIONS)))
+    return on_loop_block
+
+
+def describe_blocks(blocks, threshold, name=None):
+    ''' Message listing the blocking callbacks, the longest first.
+    '''
+    return '%s blocked the event loop longer than %.3fs:\n%s' % (
+        name or 'Test', threshold,
+        '\n'.join('    %.3fs %s' % (duration, description) for duration, description in sorted(blocks, reverse=True)))
+
+
+def report(blocks, threshold, name=None, on_loop_block=None):
+    ''' Fails (raises :code:`LoopBlockedError`) or warns (:code:`LoopBlockedWarning`) about the blocking callbacks.
+    '''
+    message = describe_blocks(blocks, threshold, name)
+    if get_action(on_loop_block) == 'warn':
+        warnings.warn(message, LoopBlockedWarning)
+    else:
+        raise LoopBlockedError(message, list(blocks))
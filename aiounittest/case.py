@@ -1,6 +1,86 @@
 import asyncio
+import contextlib
+import functools
+import gc
+import inspect
+import sys
+import time
+import types
 import unittest
-from .helpers import async_test
+from .benchmark import run_benchmark
+from .helpers import async_test, _get_loop_scope, _is_requested, _preserve, _shared_loop, _unpreserve
+from .stress import run_stress
+
+
+def serial(func):
+    ''' Marks the test to be run alone, even if the :code:`AsyncTestCase` is :code:`concurrent`.
+
+    .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+                concurrent = True
+
+                @aiounittest.serial
+                async def test_uses_shared_resource(self):
+                    ...
+
+    '''
+    func.__aiounittest_serial__ = True
+    return func
+
+
+def _wrap_test_method(func):
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            return self._async_test(self._run_test)(types.MethodType(func, self), *args, **kwargs)
+    else:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            return self._run_sync_test(types.MethodType(func, self), *args, **kwargs)
+    wrapper.__aiounittest_wrapped__ = True
+    return wrapper
+
+
+class _MaxLoopBlock:
+    # async context manager of `AsyncTestCase.assertMaxLoopBlock`
+
+    def __init__(self, test, threshold, msg):
+        self.test = test
+        self.threshold = threshold
+        self.msg = msg
+        self.probe = None
+        self.own_probe = False
+        self.blocks = None
+
+    async def __aenter__(self):
+        from . import timing as _timing
+        loop = asyncio.get_event_loop()
+        self.probe = _timing.get_probe(loop)
+        if self.probe is None:
+            self.probe = _timing.LoopProbe(loop, _timing.TestTiming(None)).attach()
+            self.own_probe = True
+        self.blocks = self.probe.watch(self.threshold)
+        # the body starts in a new step, measured by the probe
+        await asyncio.sleep(0)
+        return self.blocks
+
+    async def __aexit__(self, *exc):
+        # the step running the body now hasn't finished yet
+        if self.probe.running_since is not None:
+            elapsed = time.perf_counter() - self.probe.running_since
+            if elapsed > self.threshold:
+                frame = sys._getframe(1)
+                description = 'Task %s (%s:%d)' % (frame.f_code.co_name, frame.f_code.co_filename, frame.f_lineno)
+                if self.probe.resumed_at is not None:
+                    description = '%s, resumed at %s' % (description, self.probe.resumed_at)
+                self.blocks.append((elapsed, description))
+        self.probe.unwatch(self.blocks)
+        if self.own_probe:
+            self.probe.detach()
+        if self.blocks and exc[0] is None:
+            from .blocking import describe_blocks
+            self.test.fail(self.test._formatMessage(self.msg, describe_blocks(self.blocks, self.threshold, self.test.id())))
 
 
 class AsyncTestCase(unittest.TestCase):
@@ -51,8 +131,106 @@ class AsyncTestCase(unittest.TestCase):
                         await async_one()
 
 
+    By default every test gets the brand new event loop. Set :code:`loop_scope` to
+    :code:`class`, :code:`module` or :code:`session` to reuse a single loop across the scope,
+    leftover tasks and async generators are cleaned up between tests
+    (see :code:`aiounittest.async_test`).
+
+    .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+                loop_scope = 'class'
+
+    Loops are created by :code:`loop_factory` (and run in debug mode if :code:`loop_debug` is set), eg. to run
+    the tests on `uvloop`:
+
+    .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+                loop_factory = 'uvloop'
+
+    With :code:`virtual_time = True` tests run on :code:`aiounittest.VirtualTimeEventLoop`,
+    so :code:`asyncio.sleep` and other timers complete immediately.
+
+    Set :code:`timing = True` to collect :code:`aiounittest.timing.TestTiming` of each test.
+
+    Set :code:`timeout` (seconds) to cancel hanging tests, the failure describes where the pending tasks are stuck.
+
+    Set :code:`profile = True` (or a directory) to write the profile of each test (see :code:`aiounittest.profiling`).
+
+    Set :code:`max_loop_block` (seconds) to fail the tests (or warn, with :code:`on_loop_block = 'warn'`) blocking
+    the event loop longer, eg. by :code:`time.sleep` called in a coroutine (see :code:`aiounittest.blocking`).
+    :code:`assertMaxLoopBlock` and :code:`assertCompletesWithin` check a part of the test.
+
+    Set :code:`memory = 'summary'` (or :code:`'detailed'`) to collect the memory allocated by each test
+    (see :code:`aiounittest.memory`), :code:`assertMaxMemory` and :code:`assertNoMemoryGrowth` guard
+    the memory used by a code path.
+
+    With :code:`shared_executor = True` (or number of threads) all tests share one default executor
+    (see :code:`aiounittest.executor`).
+
+    Set :code:`leaks = 'count'` (or :code:`'detailed'`) to fail tests leaving pending tasks, open transports
+    and other resources behind (see :code:`aiounittest.leaks`).
+
+    With :code:`stress` set (eg. :code:`stress = {'concurrency': 50, 'iterations': 1000}`, see
+    :code:`aiounittest.stress.run_stress`) the body of every asynchronous test is run many times concurrently
+    on one loop, fixtures are run once. Failures are aggregated, the statistics (throughput, latency percentiles)
+    are collected in :code:`aiounittest.stress.results`.
+
+    :code:`benchmark` runs a coroutine many times on the loop of the test and reports its statistics,
+    optionally failing when it is slower than the stored baseline.
+
+    Asynchronous fixtures are run on the same loop as the tests. :code:`asyncSetUp` and :code:`asyncTearDown`
+    are run after :code:`setUp` and before :code:`tearDown` respectively. :code:`asyncSetUpClass` is run once,
+    before the first test of the class, and :code:`asyncTearDownClass` after the last one (as a class cleanup,
+    before Python 3.8 by :code:`tearDownClass`, so call :code:`super().tearDownClass()` when overriding it).
+    Defining class fixtures makes the loop scope at least :code:`class`, so the resources stay
+    usable across the tests. Tasks and async generators created by :code:`asyncSetUpClass` (eg. a server)
+    are not cleaned up between the tests, only after :code:`asyncTearDownClass`.
+    Synchronous tests of a class with asynchronous fixtures run outside of the loop (between the fixtures run on it),
+    as in :code:`unittest.IsolatedAsyncioTestCase`.
+
+    .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+
+                @classmethod
+                async def asyncSetUpClass(cls):
+                    cls.pool = await create_pool()
+
+                @classmethod
+                async def asyncTearDownClass(cls):
+                    await cls.pool.close()
+
+                async def asyncSetUp(self):
+                    self.conn = await self.pool.acquire()
+
+                async def asyncTearDown(self):
+                    await self.pool.release(self.conn)
+
+    Tests of a class with :code:`concurrent = True` run concurrently on a single event loop (at most
+    :code:`concurrency_limit` at once) when executed by :code:`aiounittest.AsyncTestSuite`. Each test still
+    has its own instance and its outcome is reported separately. :code:`timeout` and :code:`max_loop_block` are
+    checked per test, with :code:`profile` or :code:`memory` enabled the tests run one at a time.
+
     '''
 
+    loop_scope = None
+    loop_factory = None
+    loop_debug = None
+    virtual_time = False
+    timing = None
+    leaks = None
+    stress = None
+    shared_executor = None
+    timeout = None
+    profile = None
+    memory = None
+    max_loop_block = None
+    on_loop_block = None
+    concurrent = False
+    concurrency_limit = 10
+
     def get_event_loop(self):
         ''' Method provides an event loop for the test
 
@@ -77,9 +255,477 @@ class AsyncTestCase(unittest.TestCase):
         '''
         return None
 
-    def __getattribute__(self, name):
-        attr = super().__getattribute__(name)
-        if name.startswith('test_') and asyncio.iscoroutinefunction(attr):
-            return async_test(attr, loop=self.get_event_loop())
+    async def asyncSetUp(self):
+        ''' Asynchronous counterpart of :code:`setUp`, run after it.
+        '''
+
+    async def asyncTearDown(self):
+        ''' Asynchronous counterpart of :code:`tearDown`, run before it.
+        '''
+
+    @classmethod
+    async def asyncSetUpClass(cls):
+        ''' Asynchronous class fixture, run once before the first test of the class.
+
+        If it fails, all tests of the class fail with the same error.
+
+        '''
+
+    @classmethod
+    async def asyncTearDownClass(cls):
+        ''' Asynchronous class fixture, run once after all tests of the class (as a class cleanup,
+        by :code:`tearDownClass` before Python 3.8).
+        '''
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        teardown = cls.__dict__.get('_aiounittest_class_teardown')
+        if teardown is not None:
+            del cls._aiounittest_class_teardown
+            teardown()
+
+    async def benchmark(self, coro_fn, *args, rounds=100, warmup=10, name=None, baseline=None, tolerance=None,
+                        **kwargs):
+        ''' Awaits :code:`coro_fn(*args, **kwargs)` repeatedly on the loop of the test and measures every round.
+
+        :param callable coro_fn: coroutine function to benchmark
+        :param int rounds: number of measured rounds
+        :param int warmup: number of rounds run before measuring
+        :param str name: name of the benchmark, by default the test id (suffixed with the qualified name
+                         of :code:`coro_fn` if it's not the first benchmark of the test)
+        :param baseline: path of the baseline JSON file (or dict), the test fails if the median is slower
+                         by more than :code:`tolerance` (see :code:`aiounittest.benchmark.check_baseline`)
+        :param float tolerance: allowed slowdown, 20% by default
+        :rtype: aiounittest.benchmark.BenchmarkStats
+
+        .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+
+                async def test_parse(self):
+                    stats = await self.benchmark(parse, PAYLOAD, rounds=1000, baseline='baseline.json')
+                    print(stats.median, stats.p99, stats.ops)
+
+        '''
+        if name is None:
+            name = self.id()
+            benchmarks = self.__dict__.setdefault('_aiounittest_benchmarks', set())
+            if name in benchmarks:
+                name = '%s[%s]' % (name, coro_fn.__qualname__)
+            benchmarks.add(name)
+        return await run_benchmark(coro_fn, *args, rounds=rounds, warmup=warmup, name=name, baseline=baseline,
+                                   tolerance=tolerance, **kwargs)
+
+    async def assertCompletesWithin(self, awaitable, seconds, msg=None):
+        ''' Awaits :code:`awaitable` and fails if it doesn't complete in :code:`seconds` (of the loop's clock).
+
+        :return: the result of :code:`awaitable`
+
+        It's cancelled after :code:`seconds`, completing later because of a callback blocking the loop fails as well.
+
+        .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+
+                async def test_cached(self):
+                    await self.client.get('key')
+                    value = await self.assertCompletesWithin(self.client.get('key'), 0.01)
+
+        '''
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        try:
+            ret = await asyncio.wait_for(awaitable, seconds)
+        except asyncio.TimeoutError:
+            if loop.time() - started < seconds:
+                # raised by the awaitable itself
+                raise
+            self.fail(self._formatMessage(msg, 'did not complete within %gs' % seconds))
+        elapsed = loop.time() - started
+        if elapsed > seconds:
+            self.fail(self._formatMessage(msg, 'completed in %.3fs, not within %gs' % (elapsed, seconds)))
+        return ret
+
+    def assertMaxLoopBlock(self, ms, msg=None):
+        ''' Fails if any callback (eg. a step of a task) run in the context blocks the event loop
+        longer than :code:`ms` milliseconds.
+
+        :return: async context manager, giving the list of :code:`(seconds, description)` of the blocking callbacks
+
+        .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+
+                async def test_not_blocking(self):
+                    async with self.assertMaxLoopBlock(50):
+                        await self.service.handle(REQUEST)
+
+        '''
+        return _MaxLoopBlock(self, ms / 1000.0, msg)
+
+    @contextlib.contextmanager
+    def assertMaxMemory(self, max_bytes, detailed=False, msg=None):
+        ''' Fails if the code run in the context allocates more than :code:`max_bytes` at once (the peak).
+
+        :param int max_bytes: allowed peak of the allocated memory
+        :param bool detailed: describe the top allocation sites (still allocated at the end) in the failure
+        :return: context manager, giving :code:`aiounittest.memory.MemoryUsage` (filled in at the end)
+
+        .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+
+                async def test_streaming(self):
+                    with self.assertMaxMemory(1024 * 1024):
+                        await copy_stream(reader_of_100_mb, writer)
+
+        '''
+        from .memory import MemoryTracker, format_size
+        tracker = MemoryTracker(self.id(), detailed)
+        tracker.start()
+        try:
+            yield tracker.usage
+        finally:
+            usage = tracker.stop()
+        if usage.peak > max_bytes:
+            message = 'peak memory %s exceeds %s' % (format_size(usage.peak), format_size(max_bytes))
+            if usage.top:
+                message += ', allocated at:\n' + usage.format_top()
+            self.fail(self._formatMessage(msg, message))
+
+    async def assertNoMemoryGrowth(self, coro_fn, *args, rounds=10, warmup=2, tolerance=1024, msg=None, **kwargs):
+        ''' Awaits :code:`coro_fn(*args, **kwargs)` repeatedly and fails if the memory still allocated grows.
+
+        :param callable coro_fn: coroutine function to run
+        :param int rounds: number of measured rounds
+        :param int warmup: number of rounds run before measuring (filling caches, pools, etc.)
+        :param int tolerance: allowed growth in bytes per round
+        :return: :code:`aiounittest.memory.MemoryUsage` of the measured rounds
+
+        The failure describes the top allocation sites of the growth.
+
+        .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+
+                async def test_no_leak(self):
+                    await self.assertNoMemoryGrowth(self.pipeline.process, BATCH, rounds=50)
+
+        '''
+        for _ in range(warmup):
+            await coro_fn(*args, **kwargs)
+        gc.collect()
+        from .memory import MemoryTracker, format_size
+        tracker = MemoryTracker(self.id(), detailed=True)
+        tracker.start()
+        try:
+            for _ in range(rounds):
+                await coro_fn(*args, **kwargs)
+            gc.collect()
+        finally:
+            usage = tracker.stop()
+        if usage.net > tolerance * rounds:
+            message = 'memory grew by %s in %d rounds (%s per round, allowed %s), allocated at:\n%s' % (
+                format_size(usage.net), rounds, format_size(usage.net / rounds), format_size(tolerance),
+                usage.format_top())
+            self.fail(self._formatMessage(msg, message))
+        return usage
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # wrap the test methods once per class, so attribute access of the instances costs nothing
+        for name in dir(cls):
+            if not name.startswith('test_'):
+                continue
+            func = inspect.getattr_static(cls, name)
+            if cls._needs_wrapping(func):
+                setattr(cls, name, _wrap_test_method(func))
+
+    def run(self, result=None):
+        name = self._testMethodName
+        if name not in self.__dict__:
+            # added after the class was created (eg. by a class decorator, like ddt or parameterized)
+            func = inspect.getattr_static(type(self), name, None)
+            if self._needs_wrapping(func):
+                setattr(self, name, types.MethodType(_wrap_test_method(func), self))
+        return super().run(result)
+
+    @classmethod
+    def _needs_wrapping(cls, func):
+        if (not isinstance(func, types.FunctionType) or getattr(func, '__aiounittest_wrapped__', False) or
+                getattr(func, '__aiounittest_async_test__', False)):
+            # already run by `async_test`
+            return False
+        return asyncio.iscoroutinefunction(func) or cls._has_fixtures()
+
+    @classmethod
+    def _has_fixtures(cls):
+        return (cls.asyncSetUp is not AsyncTestCase.asyncSetUp or
+                cls.asyncTearDown is not AsyncTestCase.asyncTearDown or
+                cls._has_class_fixtures())
+
+    @classmethod
+    def _has_class_fixtures(cls):
+        return (cls.asyncSetUpClass.__func__ is not AsyncTestCase.asyncSetUpClass.__func__ or
+                cls.asyncTearDownClass.__func__ is not AsyncTestCase.asyncTearDownClass.__func__)
+
+    async def _set_up_class_fixtures(self):
+        cls = type(self)
+        fixture = cls.__dict__.get('_aiounittest_class_fixture')
+        if fixture is None:
+            fixture = cls._aiounittest_class_fixture = asyncio.ensure_future(cls.asyncSetUpClass())
+            teardown = self._async_test(self._tear_down_class_fixtures)
+            if hasattr(cls, 'addClassCleanup'):
+                cls.addClassCleanup(teardown)
+            else:
+                # Python < 3.8, run by `tearDownClass`
+                cls._aiounittest_class_teardown = teardown
+            await asyncio.shield(fixture)
+            # resources of class fixtures are not leaked by the test, nor cleaned up after it
+            loop = asyncio.get_event_loop()
+            if _is_requested(self.leaks, 'AIOUNITTEST_LEAKS'):
+                from . import leaks as _leaks
+                _leaks.rebase(loop)
+            _preserve(loop)
+        else:
+            await asyncio.shield(fixture)
+
+    async def _tear_down_class_fixtures(self):
+        cls = type(self)
+        fixture = cls.__dict__.get('_aiounittest_class_fixture')
+        del cls._aiounittest_class_fixture
+        try:
+            if fixture.done() and not fixture.cancelled() and fixture.exception() is None:
+                await cls.asyncTearDownClass()
+        finally:
+            # the leftovers are cleaned up now
+            _unpreserve(asyncio.get_event_loop())
+
+    async def _run_test(self, method, *args, **kwargs):
+        await self._set_up_fixtures()
+        try:
+            if self.stress and asyncio.iscoroutinefunction(method):
+                await run_stress(functools.partial(method, *args, **kwargs), name=self.id(), **self.stress)
+                return None
+            ret = method(*args, **kwargs)
+            if inspect.isawaitable(ret):
+                ret = await ret
+            return ret
+        finally:
+            await self.asyncTearDown()
+
+    async def _set_up_fixtures(self):
+        if self._has_class_fixtures():
+            await self._set_up_class_fixtures()
+        await self.asyncSetUp()
+
+    def _run_sync_test(self, method, *args, **kwargs):
+        # like in `unittest.IsolatedAsyncioTestCase` the synchronous test runs outside of the loop,
+        # between the asynchronous fixtures run on the same loop
+        loop = self.get_event_loop()
+        if loop is not None:
+            return self._run_between_fixtures(loop, method, *args, **kwargs)
+        with _shared_loop(self._effective_loop_scope(), type(self).loop_factory, self.loop_debug, self.virtual_time,
+                          self) as loop:
+            return self._run_between_fixtures(loop, method, *args, **kwargs)
+
+    def _run_between_fixtures(self, loop, method, *args, **kwargs):
+        self._async_test(self._set_up_fixtures, loop)()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self._async_test(self.asyncTearDown, loop)()
+
+    def _effective_loop_scope(self):
+        if _get_loop_scope(self.loop_scope) == 'test' and self._has_class_fixtures():
+            # resources of class fixtures have to outlive the test
+            return 'class'
+        return self.loop_scope
+
+    def _async_test(self, func, loop=None, **kwargs):
+        cls = type(self)
+        options = dict(loop_scope=self._effective_loop_scope(), loop_factory=cls.loop_factory,
+                       loop_debug=self.loop_debug, virtual_time=self.virtual_time, timing=self.timing, leaks=self.leaks,
+                       shared_executor=self.shared_executor, timeout=self.timeout, profile=self.profile,
+                       memory=self.memory, max_loop_block=self.max_loop_block, on_loop_block=self.on_loop_block)
+        options.update(kwargs)
+        return async_test(func, loop=loop or self.get_event_loop(), **options)
+
+    def _get_test_method(self):
+        # the test method as defined, not wrapped
+        method = getattr(self, self._testMethodName)
+        if getattr(method, '__aiounittest_wrapped__', False):
+            method = types.MethodType(method.__wrapped__, self)
+        return method
+
+    def _can_run_concurrently(self):
+        if not self.concurrent:
+            return False
+        if _is_requested(self.profile, 'AIOUNITTEST_PROFILE') or _is_requested(self.memory, 'AIOUNITTEST_MEMORY'):
+            from . import memory as _memory
+            from . import profiling as _profiling
+            if _profiling.get_directory(self.profile) or _memory.get_mode(self.memory):
+                # profiles and memory of the tests sharing the loop can't be told apart, these run one at a time
+                return False
+        method = self._get_test_method()
+        return asyncio.iscoroutinefunction(method) and not getattr(method, '__aiounittest_serial__', False)
+
+    def _run_concurrently(self, tests, result):
+        outcomes = {}
+        # named after the class, a check of the whole batch (eg. leaks) can't tell which test has failed it
+        batch = functools.partial(self._gather_tests, tests, outcomes)
+        batch.__self__ = self
+        batch.__aiounittest_name__ = '%s.%s (%d concurrent tests)' % (type(self).__module__, type(self).__qualname__,
+                                                                      len(tests))
+        batch_error = None
+        try:
+            # the timeouts and blocking callbacks are checked per test (see `_run_checked`)
+            self._async_test(batch, timeout=False, max_loop_block=False)()
+        except KeyboardInterrupt:
+            raise
+        except BaseException:
+            batch_error = sys.exc_info()
+        for test in tests:
+            outcome, duration = outcomes.get(test, ([], 0.0))
+            if batch_error is not None and not any(name == 'addSkip' for name, *_ in outcome):
+                name = 'addFailure' if issubclass(batch_error[0], self.failureException) else 'addError'
+                outcome = [item for item in outcome if item[0] not in ('addSuccess', 'addUnexpectedSuccess')]
+                outcome.append((name, batch_error))
+            test._report(result, outcome, duration)
+
+    async def _gather_tests(self, tests, outcomes):
+        semaphore = asyncio.Semaphore(self.concurrency_limit) if self.concurrency_limit else None
+        probe, own_probe = None, False
+        if self._get_block_threshold() is not None:
+            from . import timing as _timing
+            loop = asyncio.get_event_loop()
+            probe = _timing.get_probe(loop)
+            if probe is None:
+                probe, own_probe = _timing.LoopProbe(loop, _timing.TestTiming(None)).attach(), True
+
+        async def run(test):
+            if semaphore is None:
+                outcomes[test] = await test._run_async(probe)
+            else:
+                async with semaphore:
+                    outcomes[test] = await test._run_async(probe)
+
+        try:
+            await asyncio.gather(*[run(test) for test in tests])
+        finally:
+            if own_probe:
+                probe.detach()
+
+    async def _run_checked(self, method, probe):
+        # the checks `async_test` does per call, done per test for the concurrent tests sharing the loop
+        loop = asyncio.get_event_loop()
+        future = asyncio.ensure_future(self._run_owned(method, probe))
+        watchdog = None
+        if _is_requested(self.timeout, 'AIOUNITTEST_TIMEOUT'):
+            from . import watchdog as _watchdog
+            timeout = _watchdog.get_timeout(self.timeout)
+            watchdog = _watchdog.Watchdog(loop, future, timeout, self.id()).start() if timeout else None
+        threshold = self._get_block_threshold()
+        blocks = probe.watch(threshold, self) if probe is not None else None
+        try:
+            try:
+                await future
+            except asyncio.CancelledError:
+                if watchdog is not None and watchdog.expired:
+                    raise watchdog.error() from None
+                raise
+            finally:
+                if watchdog is not None:
+                    watchdog.stop()
+            if watchdog is not None and watchdog.expired:
+                # the test has ignored the cancellation
+                raise watchdog.error()
+        finally:
+            if blocks is not None:
+                probe.unwatch(blocks)
+        if blocks:
+            from . import blocking as _blocking
+            _blocking.report(blocks, threshold, self.id(), self.on_loop_block)
+
+    def _get_block_threshold(self):
+        if not _is_requested(self.max_loop_block, 'AIOUNITTEST_MAX_LOOP_BLOCK'):
+            return None
+        from . import blocking as _blocking
+        return _blocking.get_threshold(self.max_loop_block)
+
+    async def _run_owned(self, method, probe):
+        if probe is not None:
+            # the probe tells the blocking callbacks of this test by the owner
+            from . import timing as _timing
+            _timing.set_owner(self)
+        await self._run_test(method)
+
+    async def _run_async(self, probe=None):
+        # counterpart of `unittest.TestCase.run` for a coroutine test, the outcome is
+        # reported later (see `_report`), so the output of concurrent tests does not interleave
+        method = self._get_test_method()
+        started = time.perf_counter()
+        outcome = []
+        skip_why = None
+        if getattr(self.__class__, '__unittest_skip__', False) or getattr(method, '__unittest_skip__', False):
+            skip_why = (getattr(self.__class__, '__unittest_skip_why__', '') or
+                        getattr(method, '__unittest_skip_why__', ''))
         else:
-            return attr
+            expecting_failure = getattr(method, '__unittest_expecting_failure__', False)
+            errors = []
+            try:
+                self.setUp()
+            except unittest.SkipTest as e:
+                skip_why = str(e)
+            except KeyboardInterrupt:
+                raise
+            except BaseException:
+                errors.append(sys.exc_info())
+            else:
+                try:
+                    await self._run_checked(method, probe)
+                except unittest.SkipTest as e:
+                    skip_why = str(e)
+                except KeyboardInterrupt:
+                    raise
+                except BaseException:
+                    errors.append(sys.exc_info())
+                try:
+                    self.tearDown()
+                except KeyboardInterrupt:
+                    raise
+                except BaseException:
+                    errors.append(sys.exc_info())
+            while self._cleanups:
+                function, args, kwargs = self._cleanups.pop()
+                try:
+                    function(*args, **kwargs)
+                except KeyboardInterrupt:
+                    raise
+                except BaseException:
+                    errors.append(sys.exc_info())
+
+            if errors and expecting_failure:
+                outcome.append(('addExpectedFailure', errors[0]))
+            elif errors:
+                for exc_info in errors:
+                    if issubclass(exc_info[0], self.failureException):
+                        outcome.append(('addFailure', exc_info))
+                    else:
+                        outcome.append(('addError', exc_info))
+            elif skip_why is None:
+                outcome.append(('addUnexpectedSuccess',) if expecting_failure else ('addSuccess',))
+        if skip_why is not None and not outcome:
+            outcome.append(('addSkip', skip_why))
+        return outcome, time.perf_counter() - started
+
+    def _report(self, result, outcome, duration):
+        result.startTest(self)
+        try:
+            for name, *args in outcome:
+                getattr(result, name)(self, *args)
+            if hasattr(result, 'addDuration'):
+                result.addDuration(self, duration)
+        finally:
+            result.stopTest(self)
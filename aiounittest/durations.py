@@ -0,0 +1,108 @@
+import json
+import os
+
+
+DEFAULT_PATH = '.aiounittest-durations.json'
+
+ORDERS = ('failed', 'longest', 'none')
+
+
+def get_path(durations=None):
+    ''' Path of the durations cache, by the argument or :code:`AIOUNITTEST_DURATIONS` environment variable,
+    :code:`None` if disabled.
+    '''
+    if durations is None:
+        durations = os.environ.get('AIOUNITTEST_DURATIONS', '')
+    if durations is True:
+        return DEFAULT_PATH
+    if durations in ('', '0') or durations is False:
+        return None
+    return DEFAULT_PATH if durations == '1' else durations
+
+
+def class_key(test_id):
+    ''' Key of the class of the test, :code:`module.Class` of :code:`module.Class.test_method`.
+    '''
+    return test_id.partition(' ')[0].rpartition('.')[0]
+
+
+class DurationCache:
+    ''' Durations (and outcomes) of the tests and their classes observed by previous runs, stored as JSON.
+
+    :param str path: path of the cache file
+    :ivar dict tests: test id to :code:`{"duration": seconds, "failed": bool}`
+    :ivar dict classes: :code:`module.Class` to :code:`{"duration": seconds (sum of its tests), "failed": bool (any of them)}`
+
+    Only the tests run are updated on :code:`save`, entries of the others are kept.
+
+    '''
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.tests = {}
+        self.classes = {}
+        self._observed = {}
+        self.load()
+
+    def load(self):
+        ''' (Re)loads the cache file, a missing or broken file is an empty cache.
+        '''
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            self.tests = dict(data['tests'])
+            self.classes = dict(data['classes'])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.tests = {}
+            self.classes = {}
+
+    def record(self, test_id, duration, failed=False):
+        ''' Records the duration of a test run now (saved by :code:`save`).
+        '''
+        self._observed[test_id] = {'duration': duration, 'failed': bool(failed)}
+
+    def get(self, key):
+        ''' Entry of the test id or class key, :code:`None` if not known.
+        '''
+        return self.tests.get(key) or self.classes.get(key)
+
+    def sort_key(self, key, order='failed'):
+        ''' Sorting key of the test id or class key for :code:`sorted`, see :code:`sort`.
+        '''
+        entry = self.get(key)
+        # not known first, they might be long
+        duration = entry['duration'] if entry else float('inf')
+        if order == 'failed':
+            return (not entry or not entry['failed'], -duration)
+        return (-duration,)
+
+    def sort(self, keys, order='failed'):
+        ''' Sorts test ids or class keys, the longest first (:code:`longest`), after the ones
+        that failed the last time (:code:`failed`), or keeps the order (:code:`none`).
+        '''
+        if order not in ORDERS:
+            raise ValueError('Unknown order %r, expected one of: %s' % (order, ', '.join(ORDERS)))
+        if order == 'none':
+            return list(keys)
+        return sorted(keys, key=lambda key: self.sort_key(key, order))
+
+    def save(self):
+        ''' Merges the recorded durations into the cache file (reloaded first, so concurrent runs don't lose
+        their entries).
+        '''
+        if not self._observed:
+            return
+        self.load()
+        self.tests.update(self._observed)
+        touched = {class_key(test_id) for test_id in self._observed}
+        classes = {key: {'duration': 0.0, 'failed': False} for key in touched}
+        for test_id, entry in self.tests.items():
+            total = classes.get(class_key(test_id))
+            if total is not None:
+                total['duration'] += entry['duration']
+                total['failed'] = total['failed'] or entry['failed']
+        self.classes.update(classes)
+        self._observed = {}
+        tmp = '%s.%d.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump({'tests': self.tests, 'classes': self.classes}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,167 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .timing import describe_callback
+
+
+_shared = None
+
+
+class ExecutorBusyError(AssertionError):
+    ''' Raised when the work submitted to the executor is still running at the end of the test.
+    '''
+
+
+class SharedExecutor(ThreadPoolExecutor):
+    ''' Thread pool shared by the event loops created by :code:`aiounittest`, installed as their default executor.
+
+    Loops shut down their default executor when closed, :code:`SharedExecutor` ignores it, so its threads survive
+    the loop recycling. Use :code:`close` to shut it down for real, it's done at the interpreter exit.
+
+    '''
+    def __init__(self, max_workers=None, thread_name_prefix='aiounittest'):
+        super().__init__(max_workers, thread_name_prefix=thread_name_prefix)
+        self._stats_lock = threading.Lock()
+        self._running = {}
+        self._tokens = iter(range(2 ** 63))
+        self.reset_stats()
+
+    def reset_stats(self):
+        ''' Starts collecting the statistics from scratch.
+        '''
+        with self._stats_lock:
+            self._started = time.perf_counter()
+            self.submitted = 0
+            self.completed = 0
+            self.active = 0
+            self.max_active = 0
+            self.max_queue_depth = 0
+            self.busy = 0.0
+
+    def submit(self, fn, *args, **kwargs):
+        with self._stats_lock:
+            token = next(self._tokens)
+            self._running[token] = fn
+            self.submitted += 1
+        future = super().submit(self._run, token, fn, args, kwargs)
+        future.add_done_callback(lambda f: f.cancelled() and self._done(token, 0.0))
+        depth = self._work_queue.qsize()
+        with self._stats_lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+        return future
+
+    def _run(self, token, fn, args, kwargs):
+        with self._stats_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._stats_lock:
+                self.active -= 1
+            self._done(token, time.perf_counter() - started)
+
+    def _done(self, token, busy):
+        with self._stats_lock:
+            if self._running.pop(token, None) is not None:
+                self.completed += 1
+                self.busy += busy
+
+    @property
+    def pending(self):
+        ''' Descriptions of the work submitted, but not finished yet (running or queued).
+        '''
+        with self._stats_lock:
+            return [describe_callback(fn) for fn in self._running.values()]
+
+    def stats(self):
+        ''' Statistics since the creation (or :code:`reset_stats`).
+
+        :return: dict of :code:`max_workers`, :code:`threads` (started so far), :code:`submitted`, :code:`completed`,
+                 :code:`active` (running now), :code:`max_active`, :code:`queue_depth` (waiting for a thread now),
+                 :code:`max_queue_depth`, :code:`busy` (seconds the threads were running the work) and
+                 :code:`utilisation` (busy time to the time available to all the threads)
+
+        '''
+        with self._stats_lock:
+            elapsed = time.perf_counter() - self._started
+            threads = len(self._threads)
+            return {
+                'max_workers': self._max_workers,
+                'threads': threads,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'active': self.active,
+                'max_active': self.max_active,
+                'queue_depth': self._work_queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'busy': self.busy,
+                'utilisation': self.busy / (threads * elapsed) if threads and elapsed else 0.0,
+            }
+
+    def check_idle(self, name=None):
+        ''' Raises :code:`ExecutorBusyError` if any submitted work hasn't finished.
+
+        :param str name: name of the test, for the message
+
+        '''
+        pending = self.pending
+        if pending:
+            raise ExecutorBusyError('Executor work still running%s: %s' % (
+                ' at the end of %s' % name if name else '', ', '.join(pending)))
+
+    def shutdown(self, wait=True, **kwargs):
+        # called by the loops when closed, the executor outlives them
+        pass
+
+    def close(self, wait=True):
+        ''' Shuts the executor down.
+        '''
+        super().shutdown(wait)
+
+
+def get_shared_executor(max_workers=None):
+    ''' Returns the shared executor, creates it if needed (or recreates it, when the size differs).
+
+    :param int max_workers: number of threads, the default of :code:`ThreadPoolExecutor` if :code:`None`
+
+    '''
+    global _shared
+    if _shared is not None and max_workers is not None and _shared._max_workers != max_workers:
+        _shared.close()
+        _shared = None
+    if _shared is None:
+        _shared = SharedExecutor(max_workers)
+    return _shared
+
+
+def get_size(shared_executor=None):
+    ''' Whenever the shared executor is enabled and its size, by the argument or
+    :code:`AIOUNITTEST_SHARED_EXECUTOR` environment variable (:code:`1` - enabled, more - number of threads).
+
+    :return: :code:`False` (disabled), :code:`None` (enabled, default size) or number of threads
+
+    '''
+    if shared_executor is None:
+        value = os.environ.get('AIOUNITTEST_SHARED_EXECUTOR', '0')
+        if value in ('', '0'):
+            return False
+        return None if value == '1' else int(value)
+    if isinstance(shared_executor, bool):
+        return None if shared_executor else False
+    return int(shared_executor)
+
+
+def close_shared_executor():
+    ''' Shuts the shared executor down, next loops will get a new one.
+    '''
+    global _shared
+    if _shared is not None:
+        _shared.close()
+        _shared = None
+
+
+atexit.register(close_shared_executor)
@@ -1,6 +1,26 @@
 import asyncio
+import atexit
+import contextlib
 import functools
-import wrapt
+import os
+import time
+import unittest
+import weakref
+from ._compat import _all_tasks, _get_coro
+from .loops import VirtualTimeEventLoop, resolve_loop_factory, is_debug_enabled
+
+
+LOOP_SCOPES = ('test', 'class', 'module', 'session')
+
+# loop_scope -> (scope key, (loop factory, debug), loop)
+_scoped_loops = {}
+
+# ((loop factory, debug), loop) provided by the test runner (see aiounittest.pytest_plugin),
+# used by the tests of the default loop scope
+_runner_loop = None
+
+# loop -> (tasks, async generators) surviving the cleanup between tests (eg. created by class fixtures)
+_preserved = weakref.WeakKeyDictionary()
 
 
 def futurized(o):
@@ -74,12 +94,315 @@ def futurized(o):
     return f
 
 
-def run_sync(func=None, loop=None):
+class _Constant:
+    # awaitable resolving to the value (or raising the exception) every time it is awaited
+
+    __slots__ = ('value', 'exception')
+
+    def __init__(self, value, exception):
+        self.value = value
+        self.exception = exception
+
+    def __await__(self):
+        if self.exception is not None:
+            raise self.exception.with_traceback(None)
+        return self.value
+        yield  # makes it a generator
+
+    __iter__ = __await__  # `yield from`
+
+    def __repr__(self):
+        return '<futurized_constant %r>' % (self.exception if self.exception is not None else self.value)
+
+
+def futurized_constant(o):
+    ''' Makes the given object to be awaitable, any number of times and on any loop.
+
+    :param any o: Object to wrap
+    :return: awaitable that resolves to provided object (or raises it, if it's an exception)
+
+    Unlike :code:`futurized` it doesn't create :code:`asyncio.Future`, so it's not bound to the event loop
+    (survives the loop recreated by :code:`async_test`) and it's cheap. The same object can be returned
+    by a mock called many times.
+
+    .. code-block:: python
+
+        mock_sleep = Mock(return_value=futurized_constant(None))
+        for i in range(1000):
+            await mock_sleep(i)
+
+    '''
+    if isinstance(o, Exception):
+        return _Constant(None, o)
+    return _Constant(o, None)
+
+
+def futurized_sequence(seq):
+    ''' Makes an iterator of awaitables, one per each object of the given sequence (see :code:`futurized_constant`).
+
+    :param iterable seq: objects (or exceptions) to resolve to, consumed lazily
+
+    Use it as :code:`side_effect` of a mock to get successive results across calls.
+
+    .. code-block:: python
+
+        fetch = Mock(side_effect=futurized_sequence(['page1', 'page2', TimeoutError()]))
+        await fetch()  # page1
+        await fetch()  # page2
+        await fetch()  # raises TimeoutError
+
+    '''
+    return (futurized_constant(o) for o in seq)
+
+
+def _is_asyncgen_finalizer(task):
+    # `aclose()` of an async generator, scheduled by the finalizer hook of the loop (as a task at once on Python 3.6)
+    coro = _get_coro(task)
+    return type(coro).__name__ == 'async_generator_athrow'
+
+
+def _cancel_pending_tasks(loop, keep=()):
+    tasks = [task for task in _all_tasks(loop) if not task.done() and task not in keep]
+    if not tasks:
+        return
+    for task in tasks:
+        if not _is_asyncgen_finalizer(task):
+            task.cancel()
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+def _close_async_generators(loop, keep=()):
+    # unlike `loop.shutdown_asyncgens` it leaves the loop usable for next tests
+    asyncgens = getattr(loop, '_asyncgens', None)
+    if not asyncgens:
+        return
+    closing = [agen for agen in asyncgens if agen not in keep]
+    if not closing:
+        return
+    for agen in closing:
+        asyncgens.discard(agen)
+    tasks = [loop.create_task(agen.aclose()) for agen in closing]
+    loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+def _cleanup_loop(loop):
+    tasks, asyncgens = _preserved.get(loop, ((), ()))
+    _cancel_pending_tasks(loop, tasks)
+    _close_async_generators(loop, asyncgens)
+    if isinstance(loop, VirtualTimeEventLoop):
+        loop._reset_time()
+
+
+def _preserve(loop):
+    # tasks and async generators existing now survive the cleanup between tests, until `_unpreserve`
+    tasks, asyncgens = _preserved.setdefault(loop, (weakref.WeakSet(), weakref.WeakSet()))
+    tasks.update(task for task in _all_tasks(loop) if not task.done())
+    asyncgens.update(getattr(loop, '_asyncgens', None) or ())
+
+
+def _unpreserve(loop):
+    _preserved.pop(loop, None)
+
+
+def _close_loop(loop):
+    if loop.is_closed():
+        return
+    _unpreserve(loop)
+    try:
+        _cancel_pending_tasks(loop)
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        if hasattr(loop, 'shutdown_default_executor'):
+            loop.run_until_complete(loop.shutdown_default_executor())
+    finally:
+        loop.close()
+
+
+def _is_scoped_loop(loop):
+    if _runner_loop is not None and _runner_loop[1] is loop:
+        return True
+    return any(scoped is loop for _, _, scoped in _scoped_loops.values())
+
+
+def _get_brand_new_default_event_loop(loop_factory=asyncio.new_event_loop, loop_debug=False):
+    try:
+        old_loop = asyncio.get_event_loop()
+        if not old_loop.is_closed() and not _is_scoped_loop(old_loop):
+            old_loop.close()
+    except RuntimeError:
+        # no default event loop, ignore exception
+        pass
+    _loop = loop_factory()
+    if loop_debug:
+        _loop.set_debug(True)
+    asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def _get_loop_scope(loop_scope):
+    if loop_scope is None:
+        loop_scope = os.environ.get('AIOUNITTEST_LOOP_SCOPE') or 'test'
+    if loop_scope not in LOOP_SCOPES:
+        raise ValueError('Unknown loop scope %r, expected one of: %s' % (loop_scope, ', '.join(LOOP_SCOPES)))
+    return loop_scope
+
+
+def _get_scope_key(loop_scope, wrapped, instance):
+    if loop_scope == 'session':
+        return None
+    owner = instance if instance is not None else getattr(wrapped, '__self__', None)
+    if loop_scope == 'module':
+        return type(owner).__module__ if isinstance(owner, unittest.TestCase) else wrapped.__module__
+    if owner is not None:
+        return type(owner)
+    # plain function, use the enclosing namespace
+    return wrapped.__module__, wrapped.__qualname__.rpartition('.')[0]
+
+
+def _get_scoped_loop(loop_scope, key, loop_factory, loop_debug):
+    if loop_scope in _scoped_loops:
+        scoped_key, spec, loop = _scoped_loops.pop(loop_scope)
+        if scoped_key == key and spec == (loop_factory, loop_debug) and not loop.is_closed():
+            _scoped_loops[loop_scope] = (scoped_key, spec, loop)
+            asyncio.set_event_loop(loop)
+            return loop
+        # the scope has ended (eg. next test class)
+        _close_loop(loop)
+    loop = _get_brand_new_default_event_loop(loop_factory, loop_debug)
+    _scoped_loops[loop_scope] = (key, (loop_factory, loop_debug), loop)
+    return loop
+
+
+def close_scoped_loops(loop_scope=None):
+    ''' Closes event loops kept alive by :code:`loop_scope`.
+
+    :param str loop_scope: scope to close, all scopes by default
+
+    Scoped loops are closed automatically when the scope ends (eg. a test of the next
+    class is run) and at the interpreter exit. Call it if you need to free them earlier.
+
+    '''
+    scopes = [loop_scope] if loop_scope else list(_scoped_loops)
+    for scope in scopes:
+        if scope in _scoped_loops:
+            _, _, loop = _scoped_loops.pop(scope)
+            _close_loop(loop)
+
+
+atexit.register(close_scoped_loops)
+
+
+def _acquire_loop(loop, loop_scope, loop_factory, loop_debug, wrapped, instance):
+    if loop is not None:
+        return loop, None
+    if (loop_scope is None and _runner_loop is not None and _runner_loop[0] == (loop_factory, loop_debug) and
+            not _runner_loop[1].is_closed()):
+        asyncio.set_event_loop(_runner_loop[1])
+        return _runner_loop[1], 'runner'
+    scope = _get_loop_scope(loop_scope)
+    if scope == 'test':
+        return _get_brand_new_default_event_loop(loop_factory, loop_debug), scope
+    return _get_scoped_loop(scope, _get_scope_key(scope, wrapped, instance), loop_factory, loop_debug), scope
+
+
+def _release_loop(loop, scope):
+    if scope == 'test':
+        # clean up
+        loop.close()
+        # again set a new (unstopped) event loop
+        _get_brand_new_default_event_loop()
+    elif scope not in (None, 'runner') and not loop.is_closed():
+        # keep the loop, but leave it clean for the next test
+        _cleanup_loop(loop)
+
+
+@contextlib.contextmanager
+def _shared_loop(loop_scope=None, loop_factory=None, loop_debug=None, virtual_time=False, instance=None):
+    # one loop for several `run_sync` calls (given the loop), eg. fixtures and the synchronous test between them
+    loop, scope = _acquire_loop(None, loop_scope, VirtualTimeEventLoop if virtual_time else resolve_loop_factory(loop_factory),
+                                is_debug_enabled(loop_debug), None, instance)
+    try:
+        yield loop
+    finally:
+        _release_loop(loop, scope)
+
+
+def _get_instance(wrapped, wrapper, args):
+    # the instance the decorated method is called on, if any
+    name = getattr(wrapped, '__name__', None)
+    if args and name and getattr(type(args[0]), name, None) is wrapper:
+        return args[0]
+    return None
+
+
+def _get_test_name(wrapped, instance):
+    name = getattr(wrapped, '__aiounittest_name__', None)
+    if name is not None:
+        return name
+    owner = instance if instance is not None else getattr(wrapped, '__self__', None)
+    if isinstance(owner, unittest.TestCase):
+        return owner.id()
+    return '%s.%s' % (wrapped.__module__, wrapped.__qualname__)
+
+
+def _is_requested(value, variable):
+    # whenever the optional feature may be enabled, by the argument or the environment variable, its module
+    # is imported only then (and tells exactly)
+    if value is None:
+        return os.environ.get(variable, '') not in ('', '0')
+    return value is not False
+
+
+def _run_until_complete(loop, future, timeout, wrapped, instance):
+    if not timeout:
+        return loop.run_until_complete(future)
+    from . import watchdog as _watchdog
+    watchdog = _watchdog.Watchdog(loop, future, timeout, _get_test_name(wrapped, instance)).start()
+    try:
+        ret = loop.run_until_complete(future)
+    except asyncio.CancelledError:
+        if watchdog.expired:
+            raise watchdog.error() from None
+        raise
+    finally:
+        watchdog.stop()
+    if watchdog.expired:
+        # the test has ignored the cancellation
+        raise watchdog.error()
+    return ret
+
+
+def run_sync(func=None, loop=None, loop_scope=None, loop_factory=None, loop_debug=None, virtual_time=False, timing=None,
+             leaks=None, shared_executor=None, timeout=None, profile=None, memory=None, max_loop_block=None,
+             on_loop_block=None):
     ''' Runs synchonously given function (coroutine)
 
     :param callable func: function to run (mostly coroutine)
     :param ioloop loop: event loop to use to run `func`
     :type loop: event loop of None
+    :param str loop_scope: lifetime of the created event loop, one of :code:`test` (default),
+                           :code:`class`, :code:`module` or :code:`session`
+    :param loop_factory: callable creating the event loop, or its name (see :code:`aiounittest.loops.resolve_loop_factory`),
+                         by default :code:`AIOUNITTEST_LOOP_FACTORY` environment variable or :code:`asyncio.new_event_loop`
+    :param bool loop_debug: enable the debug mode of created loops, by default :code:`AIOUNITTEST_LOOP_DEBUG`
+                            environment variable
+    :param bool virtual_time: run on :code:`aiounittest.VirtualTimeEventLoop`, timers (eg. :code:`asyncio.sleep`)
+                              complete without waiting
+    :param bool timing: collect :code:`aiounittest.timing.TestTiming` of every call, by default enabled
+                        with :code:`AIOUNITTEST_TIMING` environment variable
+    :param str leaks: fail if resources are left behind, :code:`count` or :code:`detailed`
+                      (see :code:`aiounittest.leaks`), by default :code:`AIOUNITTEST_LEAKS` environment variable
+    :param shared_executor: install :code:`aiounittest.executor.SharedExecutor` (:code:`True` or number of threads)
+                            as the default executor of the loop, by default :code:`AIOUNITTEST_SHARED_EXECUTOR`
+                            environment variable
+    :param float timeout: seconds to cancel the test after, by default :code:`AIOUNITTEST_TIMEOUT` environment variable
+    :param profile: profile the test, writing the profiles to the given directory (or the default one for :code:`True`),
+                    by default :code:`AIOUNITTEST_PROFILE` environment variable
+    :param str memory: account the memory allocated by the test, :code:`summary` or :code:`detailed`
+                       (see :code:`aiounittest.memory`), by default :code:`AIOUNITTEST_MEMORY` environment variable
+    :param float max_loop_block: seconds a single callback may block the loop, by default
+                                 :code:`AIOUNITTEST_MAX_LOOP_BLOCK` environment variable
+    :param str on_loop_block: :code:`fail` (default) or :code:`warn` when a callback blocks the loop longer,
+                              by default :code:`AIOUNITTEST_ON_LOOP_BLOCK` environment variable
 
     By default the brand new event loop will be created (old closed). After completion, the loop will be closed and then recreated, set as default,
     leaving asyncio clean.
@@ -111,38 +434,169 @@ def run_sync(func=None, loop=None):
 
         If the loop is provided, it won't be closed. It's up to you.
 
+    Creating the loop for every test is the safest option, but not the cheapest one. With the :code:`loop_scope`
+    other than :code:`test` the loop is kept alive and reused by all tests of the same class, module or
+    the whole session. Between tests the leftover tasks are cancelled and the async generators are closed,
+    so the tests stay isolated. The default scope can be set with :code:`AIOUNITTEST_LOOP_SCOPE`
+    environment variable.
+
+    .. code-block:: python
+
+            class MyAsyncTestDecorator(unittest.TestCase):
+
+                @async_test(loop_scope='class')
+                async def test_async_add(self):
+                    ret = await add(5, 6)
+                    self.assertEqual(ret, 11)
+
+    The loops are created by the :code:`loop_factory`, eg. to test with `uvloop` use :code:`loop_factory='uvloop'` (or
+    :code:`uvloop.new_event_loop`). Either way, :code:`run_sync` closes and cleans up the loops it has created.
+
+    .. code-block:: python
+
+            @async_test(loop_factory='uvloop', loop_debug=True)
+            async def test_async_add(self):
+                ...
+
+    With :code:`timing` enabled, every call records the cost of the loop setup and teardown, the time
+    the loop was busy and idle, number of callbacks and tasks, and the slowest callbacks
+    (see :code:`aiounittest.timing`).
+
+    With :code:`leaks` enabled, the call fails with :code:`aiounittest.leaks.ResourceLeakError` if the coroutine
+    leaves pending tasks, open transports or servers, coroutines never awaited or async generators not finalized.
+    The :code:`count` mode just counts them, the :code:`detailed` one describes them, including the stacks where
+    the tasks were created.
+
+    .. code-block:: python
+
+            @async_test(leaks='detailed')
+            async def test_no_leaks(self):
+                ...
+
+    The default executor of every loop is created lazily and shut down with the loop, with
+    :code:`shared_executor` enabled all loops share one executor instead, its threads survive
+    the loop recycling. The call fails with :code:`aiounittest.executor.ExecutorBusyError` if the work
+    submitted to it is still running at the end (see :code:`aiounittest.executor`).
+
+    With :code:`timeout` the test is cancelled after the deadline (of the real time, even on
+    :code:`aiounittest.VirtualTimeEventLoop`) and fails with :code:`aiounittest.watchdog.DeadlineExceeded`,
+    describing the stack of every pending task and what it is awaiting. If the loop itself is blocked, the stack
+    of its thread is written to stderr.
+
+    .. code-block:: python
+
+            @async_test(timeout=10)
+            async def test_no_hang(self):
+                ...
+
+    With :code:`profile` the run of the coroutine is profiled, :code:`pstats` and collapsed stacks
+    (for flame graphs) are written per test, see :code:`aiounittest.profiling`.
+
+    With :code:`max_loop_block` every callback run by the loop (eg. a step of a task) is measured, the call fails
+    with :code:`aiounittest.blocking.LoopBlockedError` (or warns) if any has blocked the loop longer, telling where
+    the blocking code is (eg. :code:`time.sleep` called in a coroutine).
+
+    .. code-block:: python
+
+            @async_test(max_loop_block=0.05)
+            async def test_not_blocking(self):
+                ...
+
+    With :code:`memory` the peak and net memory allocated by the coroutine are collected
+    in :code:`aiounittest.memory.results`.
+
     This function is also used internally by :code:`aiounittest.AsyncTestCase` to run coroutines.
 
     '''
-    def get_brand_new_default_event_loop():
-        try:
-            old_loop = asyncio.get_event_loop()
-            if not old_loop.is_closed():
-                old_loop.close()
-        except RuntimeError:
-            # no default event loop, ignore exception
-            pass
-        _loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(_loop)
-        return _loop
-
-    @wrapt.decorator
-    def decorator(wrapped, instance, args, kwargs):
-        nonlocal loop
-        use_default_event_loop = loop is None
-        if use_default_event_loop:
-            loop = get_brand_new_default_event_loop()
-        try:
-            ret = wrapped(*args, **kwargs)
-            future = asyncio.ensure_future(ret, loop=loop)
-            return loop.run_until_complete(future)
-        finally:
-            if use_default_event_loop:
-                # clean up
-                loop.close()
-                del loop
-                # again set a new (unstopped) event loop
-                get_brand_new_default_event_loop()
+    def decorator(wrapped):
+        @functools.wraps(wrapped)
+        def wrapper(*args, **kwargs):
+            instance = _get_instance(wrapped, wrapper, args)
+            record = None
+            if _is_requested(timing, 'AIOUNITTEST_TIMING'):
+                from . import timing as _timing
+                record = _timing.TestTiming(_get_test_name(wrapped, instance)) if _timing.is_enabled(timing) else None
+            started = time.perf_counter()
+            _loop, scope = _acquire_loop(
+                loop, loop_scope, VirtualTimeEventLoop if virtual_time else resolve_loop_factory(loop_factory),
+                is_debug_enabled(loop_debug), wrapped, instance
+            )
+            executor = None
+            if _is_requested(shared_executor, 'AIOUNITTEST_SHARED_EXECUTOR'):
+                from . import executor as _executor
+                executor_size = _executor.get_size(shared_executor)
+                if executor_size is not False and scope is not None:
+                    executor = _executor.get_shared_executor(executor_size)
+                    _loop.set_default_executor(executor)
+            detector = None
+            if _is_requested(leaks, 'AIOUNITTEST_LEAKS'):
+                from . import leaks as _leaks
+                leaks_mode = _leaks.get_mode(leaks)
+                detector = _leaks.LeakDetector(_loop, leaks_mode).attach() if leaks_mode else None
+            probe = None
+            blocks = None
+            block_threshold = None
+            if _is_requested(max_loop_block, 'AIOUNITTEST_MAX_LOOP_BLOCK'):
+                from . import blocking as _blocking
+                block_threshold = _blocking.get_threshold(max_loop_block)
+            if record is not None:
+                record.setup = time.perf_counter() - started
+            if record is not None or block_threshold is not None:
+                from . import timing as _timing
+                probe = _timing.LoopProbe(_loop, record or _timing.TestTiming(None)).attach()
+                if block_threshold is not None:
+                    blocks = probe.watch(block_threshold)
+            profile_directory = None
+            if _is_requested(profile, 'AIOUNITTEST_PROFILE'):
+                from . import profiling as _profiling
+                profile_directory = _profiling.get_directory(profile)
+            profiler = None
+            memory_mode = None
+            if _is_requested(memory, 'AIOUNITTEST_MEMORY'):
+                from . import memory as _memory
+                memory_mode = _memory.get_mode(memory)
+            timeout_seconds = None
+            if _is_requested(timeout, 'AIOUNITTEST_TIMEOUT'):
+                from . import watchdog as _watchdog
+                timeout_seconds = _watchdog.get_timeout(timeout)
+            tracker = None
+            try:
+                ret = wrapped(*args, **kwargs)
+                future = asyncio.ensure_future(ret, loop=_loop)
+                started = time.perf_counter()
+                if memory_mode is not None:
+                    tracker = _memory.MemoryTracker(_get_test_name(wrapped, instance), memory_mode == 'detailed')
+                    tracker.start()
+                if profile_directory is not None:
+                    profiler = _profiling.Profiler(_loop, _get_test_name(wrapped, instance), profile_directory).start()
+                try:
+                    ret = _run_until_complete(_loop, future, timeout_seconds, wrapped, instance)
+                finally:
+                    if profiler is not None:
+                        profiler.stop()
+                    if tracker is not None:
+                        _memory.results.append(tracker.stop())
+                if blocks:
+                    _blocking.report(blocks, block_threshold, _get_test_name(wrapped, instance), on_loop_block)
+                if executor is not None:
+                    executor.check_idle(_get_test_name(wrapped, instance))
+                if detector is not None:
+                    detector.check(_get_test_name(wrapped, instance))
+                return ret
+            finally:
+                if probe is not None:
+                    probe.detach()
+                if record is not None:
+                    record.run = time.perf_counter() - started
+                    started = time.perf_counter()
+                if detector is not None:
+                    detector.detach()
+                _release_loop(_loop, scope)
+                if record is not None:
+                    record.teardown = time.perf_counter() - started
+                    _timing.records.append(record)
+        wrapper.__aiounittest_async_test__ = True
+        return wrapper
 
     if func is None:
         return decorator
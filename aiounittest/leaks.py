@@ -0,0 +1,205 @@
+import asyncio
+import gc
+import os
+import sys
+import traceback
+import warnings
+import weakref
+from ._compat import _all_tasks
+
+
+LEAK_MODES = ('count', 'detailed')
+
+# loop -> active detector
+_detectors = weakref.WeakKeyDictionary()
+
+
+class ResourceLeakError(AssertionError):
+    ''' Raised when the test leaves resources behind.
+
+    :ivar dict leaks: kind of the resource (eg. :code:`pending task`) to the list of descriptions
+                      (empty strings in the :code:`count` mode)
+
+    '''
+    def __init__(self, message, leaks):
+        super().__init__(message)
+        self.leaks = leaks
+
+
+def get_mode(leaks=None):
+    ''' Mode of the leak detection, by the argument or :code:`AIOUNITTEST_LEAKS` environment variable.
+
+    :return: :code:`None` (disabled), :code:`count` or :code:`detailed`
+
+    '''
+    if leaks is None:
+        leaks = os.environ.get('AIOUNITTEST_LEAKS', '0')
+    if leaks in (False, '', '0'):
+        return None
+    if leaks in (True, '1'):
+        return 'count'
+    if leaks not in LEAK_MODES:
+        raise ValueError('Unknown leaks mode %r, expected one of: %s' % (leaks, ', '.join(LEAK_MODES)))
+    return leaks
+
+
+def _open_files(loop):
+    # fd -> file object registered in the selector, except the loop's own self-pipe
+    selector = getattr(loop, '_selector', None)
+    if selector is None:
+        return {}
+    ssock = getattr(loop, '_ssock', None)
+    own = ssock.fileno() if ssock is not None else None
+    return {key.fd: key.fileobj for key in selector.get_map().values() if key.fd != own}
+
+
+def _transports(loop):
+    transports = getattr(loop, '_transports', None) or {}
+    return {fd: transport for fd, transport in list(transports.items()) if not transport.is_closing()}
+
+
+def _format_stack(stack):
+    return ''.join(traceback.format_list(stack)).rstrip('\n')
+
+
+class LeakDetector:
+    ''' Finds resources left by the test run on the :code:`loop`: pending tasks, open transports and servers,
+    coroutines never awaited and async generators not finalized. Resources existing when attached are ignored.
+
+    :param loop: event loop to watch
+    :param str mode: :code:`count` (cheap, just counts the resources) or :code:`detailed` (describes them,
+                     with the stacks where tasks and coroutines were created)
+
+    '''
+    stack_depth = 10
+
+    def __init__(self, loop, mode='count'):
+        self.loop = loop
+        self.mode = mode
+        self._stacks = weakref.WeakKeyDictionary()
+        self._task_factory = None
+        self._warnings = None
+        self._unawaited = []
+        self._origin_depth = None
+
+    def attach(self):
+        self.rebase()
+        if self.mode == 'detailed':
+            self._task_factory = self.loop.get_task_factory()
+            self.loop.set_task_factory(self._create_task)
+            if hasattr(sys, 'set_coroutine_origin_tracking_depth'):
+                self._origin_depth = sys.get_coroutine_origin_tracking_depth()
+                sys.set_coroutine_origin_tracking_depth(self.stack_depth)
+        self._warnings = warnings.catch_warnings(record=True)
+        self._unawaited = self._warnings.__enter__()
+        warnings.simplefilter('always', RuntimeWarning)
+        _detectors[self.loop] = self
+        return self
+
+    def rebase(self):
+        ''' Treats resources existing now as not leaked (eg. created by class fixtures).
+        '''
+        loop = self.loop
+        self._tasks = set(_all_tasks(loop))
+        self._transports = set(_transports(loop).values())
+        self._files = set(_open_files(loop))
+        self._asyncgens = set(getattr(loop, '_asyncgens', None) or ())
+
+    def detach(self):
+        _detectors.pop(self.loop, None)
+        if self._warnings is not None:
+            recorded = list(self._unawaited)
+            self._warnings.__exit__(None, None, None)
+            self._warnings = None
+            # show again the warnings recorded, but not related to leaks
+            for warning in recorded:
+                if not self._is_unawaited(warning):
+                    warnings.showwarning(warning.message, warning.category, warning.filename, warning.lineno,
+                                         warning.file, warning.line)
+        if self._origin_depth is not None:
+            sys.set_coroutine_origin_tracking_depth(self._origin_depth)
+            self._origin_depth = None
+        if self.mode == 'detailed' and not self.loop.is_closed():
+            self.loop.set_task_factory(self._task_factory)
+
+    def _create_task(self, loop, coro, **kwargs):
+        if self._task_factory is not None:
+            task = self._task_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        self._stacks[task] = traceback.extract_stack(sys._getframe(1), limit=self.stack_depth)
+        return task
+
+    @staticmethod
+    def _is_unawaited(warning):
+        return issubclass(warning.category, RuntimeWarning) and 'was never awaited' in str(warning.message)
+
+    def find(self):
+        ''' Resources leaked so far.
+
+        :return: dict of kind to the list of descriptions (empty strings in the :code:`count` mode)
+        :rtype: dict
+
+        '''
+        detailed = self.mode == 'detailed'
+        loop = self.loop
+        if detailed:
+            # coroutines in reference cycles are reported on collection
+            gc.collect()
+        leaks = {}
+
+        tasks = [task for task in set(_all_tasks(loop)) - self._tasks if not task.done()]
+        leaks['pending task'] = [self._describe_task(task) if detailed else '' for task in tasks]
+
+        transports = _transports(loop)
+        leaked = {fd: t for fd, t in transports.items() if t not in self._transports}
+        leaks['open transport'] = [repr(t) if detailed else '' for t in leaked.values()]
+
+        files = _open_files(loop)
+        servers = [fileobj for fd, fileobj in files.items() if fd not in self._files and fd not in transports]
+        leaks['open server'] = [repr(fileobj) if detailed else '' for fileobj in servers]
+
+        unawaited = [warning for warning in self._unawaited if self._is_unawaited(warning)]
+        leaks['coroutine never awaited'] = [str(w.message) if detailed else '' for w in unawaited]
+
+        asyncgens = [agen for agen in (getattr(loop, '_asyncgens', None) or ()) if agen not in self._asyncgens]
+        leaks['async generator not finalized'] = [self._describe_asyncgen(agen) if detailed else ''
+                                                  for agen in asyncgens]
+        return {kind: items for kind, items in leaks.items() if items}
+
+    def _describe_task(self, task):
+        description = repr(task)
+        stack = self._stacks.get(task) or getattr(task, '_source_traceback', None)
+        if stack:
+            description += '\ncreated at (most recent call last):\n' + _format_stack(stack)
+        return description
+
+    @staticmethod
+    def _describe_asyncgen(agen):
+        code = agen.ag_code
+        return '%s (%s:%d)' % (getattr(agen, '__qualname__', code.co_name), code.co_filename, code.co_firstlineno)
+
+    def check(self, name=None):
+        ''' Raises :code:`ResourceLeakError` if any resource has leaked.
+
+        :param str name: name of the test, for the message
+
+        '''
+        leaks = self.find()
+        if not leaks:
+            return
+        summary = ', '.join('%s: %d' % (kind, len(items)) for kind, items in leaks.items())
+        lines = ['Resources leaked%s (%s)' % (' by %s' % name if name else '', summary)]
+        for kind, items in leaks.items():
+            for item in items:
+                if item:
+                    lines.append('%s %s' % (kind, item.replace('\n', '\n    ')))
+        raise ResourceLeakError('\n  '.join(lines), leaks)
+
+
+def rebase(loop):
+    ''' Treats resources existing now on the :code:`loop` as not leaked, if the loop is watched.
+    '''
+    detector = _detectors.get(loop)
+    if detector is not None:
+        detector.rebase()
@@ -0,0 +1,152 @@
+import asyncio
+import importlib
+import os
+import selectors
+
+
+class _VirtualTimeSelector(selectors.DefaultSelector):
+    loop = None
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if events or timeout == 0 or self.loop is None:
+            return events
+        if timeout is None:
+            # nothing is scheduled, only I/O (eg. a result from an executor) can wake the loop up
+            return super().select(None)
+        # idle, jump to the next scheduled timer
+        self.loop._virtual_time += timeout
+        return []
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    ''' Event loop with a virtual clock, that never waits for timers.
+
+    Whenever the loop has nothing to do but wait for a scheduled timer, the clock jumps
+    straight to it. :code:`asyncio.sleep`, :code:`asyncio.wait_for`, :code:`loop.call_later` etc.
+    complete immediately in wall time, while the order of timers and the values of
+    :code:`loop.time()` stay as if the time has really passed.
+
+    .. code-block:: python
+
+            from aiounittest import AsyncTestCase
+
+            import dummy_math
+
+            class MyAddTest(AsyncTestCase):
+                virtual_time = True
+
+                async def test_add(self):
+                    loop = asyncio.get_event_loop()
+                    started = loop.time()
+                    ret = await dummy_math.add(5, 6)  # sleeps 666 seconds
+                    self.assertEqual(ret, 11)
+                    self.assertEqual(loop.time() - started, 666)
+
+    Can be also enabled with :code:`async_test(virtual_time=True)` or returned by
+    :code:`AsyncTestCase.get_event_loop`. A loop reused by tests (see :code:`loop_scope`) starts every test
+    with the clock at 0.
+
+    .. note::
+
+        Real I/O is still polled, but it does not stop the clock. Eg. waiting with timeout for a result
+        of :code:`run_in_executor` times out immediately if the loop has nothing else to do.
+
+    '''
+    def __init__(self):
+        self._virtual_time = 0.0
+        selector = _VirtualTimeSelector()
+        super().__init__(selector)
+        selector.loop = self
+
+    def time(self):
+        ''' Returns the virtual time.
+        '''
+        return self._virtual_time
+
+    async def advance(self, seconds):
+        ''' Moves the clock forward and runs everything that became due.
+
+        :param float seconds: number of seconds
+
+        .. code-block:: python
+
+                task = asyncio.ensure_future(dummy_math.add(5, 6))
+                await asyncio.sleep(0)  # let the task start
+                await loop.advance(600)
+                self.assertFalse(task.done())
+                await loop.advance(66)
+                self.assertTrue(task.done())
+
+        '''
+        if seconds < 0:
+            raise ValueError('Time cannot go backwards')
+        self._virtual_time += seconds
+        # let run the timers and the callbacks they have scheduled
+        while self._ready or (self._scheduled and self._scheduled[0]._when <= self._virtual_time):
+            await asyncio.sleep(0)
+
+    def _reset_time(self):
+        # back to 0 for the next test reusing the loop, timers left (eg. of class fixtures) keep their delays
+        for handle in self._scheduled:
+            handle._when -= self._virtual_time
+        self._virtual_time = 0.0
+
+
+def new_eager_event_loop():
+    ''' Creates an event loop with :code:`asyncio.eager_task_factory` (Python 3.12+).
+    '''
+    if not hasattr(asyncio, 'eager_task_factory'):
+        raise RuntimeError('asyncio.eager_task_factory requires Python 3.12+')
+    loop = asyncio.new_event_loop()
+    loop.set_task_factory(asyncio.eager_task_factory)
+    return loop
+
+
+def new_uvloop_event_loop():
+    ''' Creates an `uvloop <https://github.com/MagicStack/uvloop>`_ event loop, requires :code:`uvloop` to be installed.
+    '''
+    import uvloop
+    return uvloop.new_event_loop()
+
+
+#: loop factories available by name
+LOOP_FACTORIES = {
+    'asyncio': asyncio.new_event_loop,
+    'virtual': VirtualTimeEventLoop,
+    'eager': new_eager_event_loop,
+    'uvloop': new_uvloop_event_loop,
+}
+
+
+def resolve_loop_factory(loop_factory=None):
+    ''' Returns a callable creating event loops.
+
+    :param loop_factory: callable, name from :code:`LOOP_FACTORIES` (:code:`asyncio`, :code:`virtual`,
+                         :code:`eager`, :code:`uvloop`) or :code:`module:callable` path, if :code:`None`
+                         the :code:`AIOUNITTEST_LOOP_FACTORY` environment variable is used, :code:`asyncio` by default
+
+    '''
+    if loop_factory is None:
+        loop_factory = os.environ.get('AIOUNITTEST_LOOP_FACTORY') or 'asyncio'
+    if callable(loop_factory):
+        return loop_factory
+    if loop_factory in LOOP_FACTORIES:
+        return LOOP_FACTORIES[loop_factory]
+    module, sep, name = loop_factory.partition(':')
+    if not sep:
+        raise ValueError('Unknown loop factory %r, expected one of: %s or "module:callable"' % (
+            loop_factory, ', '.join(LOOP_FACTORIES)))
+    obj = importlib.import_module(module)
+    for attr in name.split('.'):
+        obj = getattr(obj, attr)
+    return obj
+
+
+def is_debug_enabled(loop_debug=None):
+    ''' Whenever created loops should run in debug mode, by the argument or :code:`AIOUNITTEST_LOOP_DEBUG`
+    environment variable.
+    '''
+    if loop_debug is not None:
+        return bool(loop_debug)
+    return os.environ.get('AIOUNITTEST_LOOP_DEBUG', '0') not in ('', '0')
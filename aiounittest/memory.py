@@ -0,0 +1,151 @@
+import os
+import tracemalloc
+
+
+MEMORY_MODES = ('summary', 'detailed')
+
+#: memory usage of the runs in this process
+results = []
+
+# trackers measuring now, a tracker started inside another one resets the peak
+_active = []
+
+
+def get_mode(memory=None):
+    ''' Mode of the memory accounting, by the argument or :code:`AIOUNITTEST_MEMORY` environment variable.
+
+    :return: :code:`None` (disabled), :code:`summary` (peak and net memory) or :code:`detailed`
+             (the top allocation sites as well)
+
+    '''
+    if memory is None:
+        memory = os.environ.get('AIOUNITTEST_MEMORY', '0')
+    if memory in (False, '', '0'):
+        return None
+    if memory in (True, '1'):
+        return 'summary'
+    if memory not in MEMORY_MODES:
+        raise ValueError('Unknown memory mode %r, expected one of: %s' % (memory, ', '.join(MEMORY_MODES)))
+    return memory
+
+
+def format_size(size):
+    ''' Human readable number of bytes.
+    '''
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return '%.1f %s' % (size, unit) if unit != 'B' else '%d B' % size
+        size /= 1024.0
+    return '%.1f GiB' % size
+
+
+class MemoryUsage:
+    ''' Memory allocated by a run, measured with :code:`tracemalloc`.
+
+    :ivar str name: test id (or function name when not run as a test)
+    :ivar int peak: the highest number of bytes allocated at once, above the start
+    :ivar int net: bytes allocated at the end, above the start (still referenced)
+    :ivar list top: the top allocation sites (still allocated at the end), list of :code:`(bytes, count, location)`,
+                    only in the :code:`detailed` mode
+
+    '''
+    def __init__(self, name, peak=0, net=0, top=None):
+        self.name = name
+        self.peak = peak
+        self.net = net
+        self.top = top or []
+
+    def format_top(self):
+        ''' The top allocation sites, one per line.
+        '''
+        return '\n'.join('    %s: %s in %d blocks' % (location, format_size(size), count)
+                         for size, count, location in self.top)
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'peak': self.peak,
+            'net': self.net,
+            'top': [list(item) for item in self.top],
+        }
+
+    def __repr__(self):
+        return '<MemoryUsage %s peak=%s net=%s>' % (self.name, format_size(self.peak), format_size(self.net))
+
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ))
+
+
+class MemoryTracker:
+    ''' Measures the memory allocated between :code:`start` and :code:`stop`, it starts :code:`tracemalloc`
+    if it's not tracing already (and stops it at the end).
+
+    :param str name: name of the run
+    :param bool detailed: find the top allocation sites (takes snapshots, slower)
+    :param int limit: number of the top allocation sites
+
+    '''
+    def __init__(self, name, detailed=False, limit=10):
+        self.usage = MemoryUsage(name)
+        self.detailed = detailed
+        self.limit = limit
+        self._started_tracing = False
+        self._start = 0
+        self._peak = 0
+        self._snapshot = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.detailed:
+            self._snapshot = _snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        for tracker in _active:
+            tracker._peak = max(tracker._peak, peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else:
+            # Python < 3.9, the peak since the tracing has started
+            self._peak = peak if not self._started_tracing else current
+        self._start = current
+        _active.append(self)
+        return self
+
+    def stop(self):
+        ''' Stops measuring, returns :code:`MemoryUsage`.
+        '''
+        current, peak = tracemalloc.get_traced_memory()
+        self._peak = max(self._peak, peak)
+        _active.remove(self)
+        for tracker in _active:
+            tracker._peak = max(tracker._peak, self._peak)
+        self.usage.peak = max(self._peak - self._start, 0)
+        self.usage.net = current - self._start
+        if self._snapshot is not None:
+            stats = _snapshot().compare_to(self._snapshot, 'lineno')
+            self.usage.top = [
+                (stat.size_diff, stat.count_diff, '%s:%d' % (stat.traceback[0].filename, stat.traceback[0].lineno))
+                for stat in stats if stat.size_diff > 0
+            ][:self.limit]
+            self._snapshot = None
+        if self._started_tracing:
+            tracemalloc.stop()
+        return self.usage
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def clear():
+    ''' Removes all collected memory usages.
+    '''
+    del results[:]
@@ -1,3 +1,58 @@
+import asyncio
+import bisect
+import collections
+import inspect
+import itertools
+import math
+import random
+from unittest.mock import Mock
+from .benchmark import BenchmarkStats
+
+
+def constant_latency(seconds):
+    ''' Latency distribution, always the same :code:`seconds`.
+    '''
+    return lambda: seconds
+
+
+def uniform_latency(low, high, rng=random):
+    ''' Latency distribution, uniform between :code:`low` and :code:`high` seconds.
+
+    :param rng: source of randomness, eg. :code:`random.Random(seed)` for the reproducible results
+    '''
+    return lambda: rng.uniform(low, high)
+
+
+def lognormal_latency(median, sigma, rng=random):
+    ''' Latency distribution, log-normal with the given :code:`median` (seconds) and :code:`sigma`
+    (the standard deviation of the underlying normal distribution), models the long tail of real services.
+
+    :param rng: source of randomness, eg. :code:`random.Random(seed)` for the reproducible results
+    '''
+    mu = math.log(median)
+    return lambda: rng.lognormvariate(mu, sigma)
+
+
+def histogram_latency(histogram, rng=random):
+    ''' Latency distribution, based on the recorded histogram.
+
+    :param histogram: latencies (seconds) observed, a sequence of them or a dict of latency to its count (weight)
+    :param rng: source of randomness, eg. :code:`random.Random(seed)` for the reproducible results
+
+    .. code-block:: python
+
+        latency = histogram_latency({0.010: 90, 0.050: 9, 0.500: 1})
+
+    '''
+    if isinstance(histogram, dict):
+        values, weights = zip(*sorted(histogram.items()))
+    else:
+        values, weights = tuple(histogram), (1,) * len(histogram)
+    cumulative = list(itertools.accumulate(weights))
+    total = cumulative[-1]
+    return lambda: values[bisect.bisect_right(cumulative, rng.random() * total)]
+
+
 class AsyncMockIterator:
     ''' Allows to mock asynchronous for-loops.
 
@@ -35,24 +90,169 @@ class AsyncMockIterator:
                     mock_iter.assertFullyConsumed()
                     mock_iter.assertIterCount(3)
 
+    The source can be any iterable, including generators and asynchronous iterables (eg. async generators),
+    it is consumed lazily, item by item, so huge streams are never materialized.
+
+    To model slow sources (eg. a paginated API) set the :code:`latency` - seconds to wait before each item,
+    or before each page of :code:`page_size` items. It's either a number or a callable returning it
+    (eg. a distribution, :code:`aiounittest.mock.lognormal_latency(0.05, 0.5)`). The latency uses :code:`asyncio.sleep`,
+    so on :code:`aiounittest.VirtualTimeEventLoop` it takes no real time.
+
+    With :code:`chunk_size` every iteration delivers a list of (up to) that many items. With :code:`prefetch`
+    the items are fetched in the background to the bounded buffer of that size, so the latency overlaps
+    with the processing of the consumer. Call :code:`aclose` if such an iterator isn't consumed till the end.
+
+    .. code-block:: python
+
+            class MyStreamTest(AsyncTestCase):
+                virtual_time = True
+
+                async def test_paginate(self):
+                    mock_iter = AsyncMockIterator(range(10 ** 9), latency=0.2, page_size=100, prefetch=100)
+                    ...
+                    print(mock_iter.stats)  # {'iterations': ..., 'items': ..., 'elapsed': ..., 'throughput': ...}
 
     '''
-    def __init__(self, seq):
-        self.iter = iter(seq)
+    def __init__(self, seq, latency=None, page_size=None, chunk_size=None, prefetch=0):
+        if hasattr(seq, '__aiter__'):
+            self.iter = None
+            self.aiter = seq.__aiter__()
+        else:
+            self.iter = iter(seq)
+            self.aiter = None
+        self.latency = latency
+        self.page_size = page_size
+        self.chunk_size = chunk_size
+        self.prefetch = prefetch
+        self.__simple = self.iter is not None and latency is None and chunk_size is None and not prefetch
         self.__consumed = False
         self.__iter_count = 0
+        self.__items = 0
+        self.__fetched = 0
+        self.__started = None
+        self.__finished = None
+        self.__queue = None
+        self.__slots = None
+        self.__producer = None
 
     def __aiter__(self, *args, **kwargs):
         return self
 
     async def __anext__(self, *args, **kwargs):
-        try:
-            val = next(self.iter)
+        if self.__started is None:
+            self.__started = asyncio.get_event_loop().time()
+        if self.__simple:
+            try:
+                val = next(self.iter)
+            except StopIteration:
+                self.__finish()
+                raise StopAsyncIteration
             self.__iter_count += 1
+            self.__items += 1
             return val
-        except StopIteration:
+
+        if self.chunk_size is None:
+            try:
+                val = await self.__next_item()
+            except StopAsyncIteration:
+                self.__finish()
+                raise
+            self.__items += 1
+        else:
+            val = []
+            while len(val) < self.chunk_size:
+                try:
+                    val.append(await self.__next_item())
+                except StopAsyncIteration:
+                    self.__finish()
+                    if not val:
+                        raise
+                    break
+            self.__items += len(val)
+        self.__iter_count += 1
+        return val
+
+    def __finish(self):
+        if not self.__consumed:
             self.__consumed = True
+            self.__finished = asyncio.get_event_loop().time()
+
+    async def __fetch(self):
+        if self.latency is not None and (not self.page_size or self.__fetched % self.page_size == 0):
+            await asyncio.sleep(self.latency() if callable(self.latency) else self.latency)
+        if self.iter is not None:
+            try:
+                val = next(self.iter)
+            except StopIteration:
+                raise StopAsyncIteration
+        else:
+            val = await self.aiter.__anext__()
+        self.__fetched += 1
+        return val
+
+    async def __next_item(self):
+        if not self.prefetch:
+            return await self.__fetch()
+        if self.__producer is None:
+            # the buffer is bounded by the slots, so the end (or the error) can always be put without waiting
+            self.__queue = asyncio.Queue()
+            self.__slots = asyncio.Semaphore(self.prefetch)
+            self.__producer = asyncio.ensure_future(self.__produce())
+        done, val = await self.__queue.get()
+        if done:
+            # let the next calls end (or fail) as well
+            self.__queue.put_nowait((True, val))
+            if val is not None:
+                raise val
             raise StopAsyncIteration
+        self.__slots.release()
+        return val
+
+    async def __produce(self):
+        try:
+            while True:
+                await self.__slots.acquire()
+                val = await self.__fetch()
+                self.__queue.put_nowait((False, val))
+        except asyncio.CancelledError:  # an Exception before Python 3.8
+            raise
+        except StopAsyncIteration:
+            self.__queue.put_nowait((True, None))
+        except Exception as e:
+            self.__queue.put_nowait((True, e))
+
+    async def aclose(self):
+        ''' Stops prefetching and closes the asynchronous source.
+        '''
+        if self.__producer is not None and not self.__producer.done():
+            self.__producer.cancel()
+            try:
+                await self.__producer
+            except asyncio.CancelledError:
+                pass
+        if self.aiter is not None and hasattr(self.aiter, 'aclose'):
+            await self.aiter.aclose()
+
+    @property
+    def stats(self):
+        ''' Consumption statistics, a dict of:
+
+            - :code:`iterations` - number of values delivered to :code:`async for`
+            - :code:`items` - number of items delivered (differs from iterations when chunked)
+            - :code:`elapsed` - seconds (of the loop's clock) since the first iteration until the end (or now)
+            - :code:`throughput` - items per second consumed by the code under test
+
+        '''
+        elapsed = 0.0
+        if self.__started is not None:
+            end = self.__finished if self.__finished is not None else asyncio.get_event_loop().time()
+            elapsed = end - self.__started
+        return {
+            'iterations': self.__iter_count,
+            'items': self.__items,
+            'elapsed': elapsed,
+            'throughput': self.__items / elapsed if elapsed else float('inf'),
+        }
 
     def assertFullyConsumed(self):
         ''' Whenever `async for` reached the end of the given sequence.
@@ -66,3 +266,394 @@ class AsyncMockIterator:
 
         '''
         assert expected == self.__iter_count, '%d iterations instead of %d' % (self.__iter_count, expected)
+
+
+class LatencyMock(Mock):
+    ''' Asynchronous mock, that resolves after the simulated latency.
+
+    :param latency: seconds, or the distribution to draw them from (a callable,
+                    eg. :code:`aiounittest.mock.lognormal_latency(0.05, 0.5)`)
+    :param float error_rate: probability of the call to fail with :code:`error`
+    :param error: exception (instance or class) raised by failed calls, :code:`ConnectionError` by default
+    :param int concurrency: number of calls served at once, the others wait (the waiting counts to the latency)
+    :param int seed: seed of the error sampling, for the reproducible results
+
+    The remaining arguments are passed to :code:`unittest.mock.Mock`. Calls are recorded as by :code:`Mock`,
+    but the mock returns an awaitable, that resolves to the :code:`return_value` (or :code:`side_effect`,
+    awaited if needed) after the latency. The latency uses :code:`asyncio.sleep`, so on
+    :code:`aiounittest.VirtualTimeEventLoop` simulated backends take no real time.
+
+    .. code-block:: python
+
+            class MyClientTest(AsyncTestCase):
+                virtual_time = True
+
+                async def test_hedging(self):
+                    backend = LatencyMock(return_value=b'OK', latency=lognormal_latency(0.05, 1), error_rate=0.01,
+                                          concurrency=10)
+                    client = Client(fetch=backend)
+                    stats = await self.benchmark(client.get, rounds=1000)
+                    print(stats.p99, backend.latency_stats.p99, backend.max_concurrency, backend.errors)
+
+    '''
+    def __init__(self, *args, latency=0, error_rate=0.0, error=ConnectionError, concurrency=None, seed=None,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error = error
+        self.concurrency = concurrency
+        self.latencies = []
+        self.errors = 0
+        self.active = 0
+        self.max_concurrency = 0
+        self._random = random.Random(seed)
+        self._semaphore = None
+
+    def reset_mock(self, *args, **kwargs):
+        super().reset_mock(*args, **kwargs)
+        self.latencies = []
+        self.errors = 0
+        self.max_concurrency = 0
+
+    def _get_child_mock(self, **kwargs):
+        # attributes are ordinary mocks
+        return Mock(**kwargs)
+
+    def __call__(self, *args, **kwargs):
+        try:
+            result, exc = super().__call__(*args, **kwargs), None
+        except Exception as e:
+            result, exc = None, e
+        return self._respond(result, exc)
+
+    def _get_semaphore(self):
+        loop = asyncio.get_event_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.concurrency))
+        return self._semaphore[1]
+
+    async def _respond(self, result, exc):
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        if self.concurrency:
+            async with self._get_semaphore():
+                await self._serve()
+        else:
+            await self._serve()
+        self.latencies.append(loop.time() - started)
+        if exc is None and self.error_rate and self._random.random() < self.error_rate:
+            exc = self.error() if isinstance(self.error, type) else self.error
+        if exc is not None:
+            self.errors += 1
+            raise exc
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _serve(self):
+        self.active += 1
+        self.max_concurrency = max(self.max_concurrency, self.active)
+        try:
+            delay = self.latency() if callable(self.latency) else self.latency
+            await asyncio.sleep(delay)
+        finally:
+            self.active -= 1
+
+    @property
+    def latency_stats(self):
+        ''' Latencies of the completed calls (including waiting for the concurrency limit),
+        as :code:`aiounittest.benchmark.BenchmarkStats`, :code:`None` if there were no calls.
+        '''
+        if not self.latencies:
+            return None
+        return BenchmarkStats(repr(self), self.latencies)
+
+
+def _draw(latency):
+    return latency() if callable(latency) else latency
+
+
+class AsyncMockContextManager:
+    ''' Allows to mock asynchronous context managers (:code:`async with`).
+
+    :param value: value given by :code:`__aenter__` (the target of :code:`as`)
+    :param latency: seconds to wait on enter, or the distribution to draw them from
+    :param exit_latency: seconds to wait on exit, or the distribution to draw them from
+    :param error: exception (instance or class) raised on enter
+    :param bool suppress: whenever the exceptions raised in the block are suppressed
+
+    .. code-block:: python
+
+            from aiounittest import AsyncTestCase
+            from aiounittest.mock import AsyncMockContextManager, LatencyMock
+            from unittest.mock import Mock
+
+
+            async def fetch_user(db, user_id):
+                async with db.transaction() as tx:
+                    return await tx.fetch('SELECT ...', user_id)
+
+
+            class MyAsyncMockContextManagerTest(AsyncTestCase):
+
+                async def test_fetch(self):
+                    db = Mock()
+                    tx = Mock(fetch=LatencyMock(return_value={'id': 1}))
+                    db.transaction.return_value = AsyncMockContextManager(tx, latency=0.01)
+
+                    self.assertEqual(await fetch_user(db, 1), {'id': 1})
+                    db.transaction.return_value.assertExited()
+                    db.transaction.return_value.assertEnterCount(1)
+
+    The exceptions leaving the block are recorded in :code:`exceptions` (:code:`None` for the clean exits).
+
+    '''
+    def __init__(self, value=None, latency=None, exit_latency=None, error=None, suppress=False):
+        self.value = value
+        self.latency = latency
+        self.exit_latency = exit_latency
+        self.error = error
+        self.suppress = suppress
+        self.exceptions = []
+        self.active = 0
+        self.__enter_count = 0
+        self.__exit_count = 0
+
+    async def __aenter__(self):
+        self.__enter_count += 1
+        if self.latency is not None:
+            await asyncio.sleep(_draw(self.latency))
+        if self.error is not None:
+            raise self.error() if isinstance(self.error, type) else self.error
+        self.active += 1
+        return self.value
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.active -= 1
+        self.__exit_count += 1
+        self.exceptions.append(exc)
+        if self.exit_latency is not None:
+            await asyncio.sleep(_draw(self.exit_latency))
+        return self.suppress
+
+    def assertEnterCount(self, expected):
+        ''' Checks whenever a number of entering the context matches expected.
+
+        :param expected int: Expected number of enters
+
+        '''
+        assert expected == self.__enter_count, '%d enters instead of %d' % (self.__enter_count, expected)
+
+    def assertExited(self):
+        ''' Whenever every (successfully) entered context has been exited.
+        '''
+        assert not self.active, 'Context wasnt exited %d times' % self.active
+
+
+class _PoolAcquire:
+    # result of `MockPool.acquire`, awaitable and asynchronous context manager
+
+    def __init__(self, pool, timeout):
+        self.pool = pool
+        self.timeout = timeout
+        self.connection = None
+
+    def __await__(self):
+        return self.pool._acquire(self.timeout).__await__()
+
+    async def __aenter__(self):
+        self.connection = await self.pool._acquire(self.timeout)
+        return self.connection
+
+    async def __aexit__(self, *exc):
+        self.pool.release(self.connection)
+
+
+class MockPool:
+    ''' Simulated pool of connections (or any resources), with a limited capacity.
+
+    :param int size: number of connections, when all of them are in use :code:`acquire` waits in the queue (FIFO)
+    :param latency: seconds to acquire a free connection (eg. a health check), or the distribution to draw them from
+    :param float timeout: default seconds to wait in the queue, then :code:`acquire` raises :code:`asyncio.TimeoutError`,
+                          :code:`None` to wait forever
+    :param factory: callable creating the connections (lazily, up to :code:`size`), :code:`unittest.mock.Mock` by default
+
+    Connections are acquired by :code:`async with pool.acquire() as conn` or :code:`conn = await pool.acquire()`
+    and :code:`pool.release(conn)`. The pool records how long each acquire waited in the queue and the depth of the
+    queue over time, so the behaviour of the code under test can be checked when the pool saturates. The waiting uses
+    the loop's clock, so on :code:`aiounittest.VirtualTimeEventLoop` it takes no real time. The pool belongs to the
+    loop it's first used with, create it in the test (or :code:`setUp`).
+
+    .. code-block:: python
+
+            class MyServiceTest(AsyncTestCase):
+                virtual_time = True
+
+                async def test_saturated(self):
+                    pool = MockPool(size=5, latency=0.001, timeout=1)
+                    service = Service(pool)
+                    await asyncio.gather(*[service.handle(request) for request in requests])
+                    pool.assertAllReleased()
+                    print(pool.stats)  # {'acquired': ..., 'timeouts': ..., 'max_wait': ..., 'max_queue_depth': ...}
+                    print(pool.wait_stats.p99)
+
+    :ivar list connections: connections created so far
+    :ivar list waits: seconds each successful acquire waited in the queue (:code:`0` if a connection was free)
+    :ivar list queue_depth: :code:`(loop time, number of waiting acquires)` on every change of the queue
+    :ivar int in_use: number of connections acquired now
+    :ivar int max_in_use: the highest :code:`in_use`
+    :ivar int timeouts: number of acquires that have timed out
+
+    '''
+    def __init__(self, size=10, latency=None, timeout=None, factory=Mock):
+        self.size = size
+        self.latency = latency
+        self.timeout = timeout
+        self.factory = factory
+        self.connections = []
+        self.waits = []
+        self.queue_depth = []
+        self.in_use = 0
+        self.max_in_use = 0
+        self.timeouts = 0
+        self._free = collections.deque()
+        self._used = set()
+        self._waiters = collections.deque()
+        self._started = None
+
+    def acquire(self, timeout=...):
+        ''' Acquires a connection, use as :code:`async with pool.acquire() as conn` or :code:`await pool.acquire()`.
+
+        :param float timeout: seconds to wait in the queue, the pool's :code:`timeout` by default
+
+        '''
+        return _PoolAcquire(self, self.timeout if timeout is ... else timeout)
+
+    def release(self, connection):
+        ''' Returns the connection to the pool, the longest waiting acquire gets it.
+        '''
+        if id(connection) not in self._used:
+            raise ValueError('%r is not acquired from the pool' % (connection,))
+        self._used.remove(id(connection))
+        self.in_use -= 1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._record_depth()
+                self._take(connection)
+                waiter.set_result(connection)
+                return
+        self._free.append(connection)
+
+    def _take(self, connection):
+        self._used.add(id(connection))
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        return connection
+
+    def _record_depth(self):
+        self.queue_depth.append((asyncio.get_event_loop().time(), sum(not waiter.done() for waiter in self._waiters)))
+
+    async def _acquire(self, timeout):
+        loop = asyncio.get_event_loop()
+        if self._started is None:
+            self._started = loop.time()
+        if self._free:
+            connection = self._take(self._free.popleft())
+            self.waits.append(0.0)
+        elif len(self.connections) < self.size:
+            self.connections.append(self.factory())
+            connection = self._take(self.connections[-1])
+            self.waits.append(0.0)
+        else:
+            started = loop.time()
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            self._record_depth()
+            try:
+                connection = await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            except BaseException as e:
+                if waiter.done() and not waiter.cancelled():
+                    # got a connection meanwhile, pass it on
+                    self.release(waiter.result())
+                else:
+                    waiter.cancel()
+                    self._waiters.remove(waiter)
+                    self._record_depth()
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                raise
+            self.waits.append(loop.time() - started)
+        if self.latency is not None:
+            try:
+                await asyncio.sleep(_draw(self.latency))
+            except BaseException:
+                self.release(connection)
+                raise
+        return connection
+
+    @property
+    def max_wait(self):
+        ''' The longest wait in the queue (seconds).
+        '''
+        return max(self.waits, default=0.0)
+
+    @property
+    def max_queue_depth(self):
+        ''' The highest number of acquires waiting at once.
+        '''
+        return max((depth for _, depth in self.queue_depth), default=0)
+
+    @property
+    def wait_stats(self):
+        ''' Waits of the successful acquires, as :code:`aiounittest.benchmark.BenchmarkStats`, :code:`None` if there
+        were none.
+        '''
+        if not self.waits:
+            return None
+        return BenchmarkStats(repr(self), self.waits)
+
+    @property
+    def stats(self):
+        ''' Usage statistics, a dict of:
+
+            - :code:`acquired` - number of successful acquires
+            - :code:`timeouts` - number of acquires that have timed out
+            - :code:`max_in_use` - the highest number of connections in use at once
+            - :code:`max_wait` - the longest wait in the queue (seconds)
+            - :code:`mean_wait` - the average wait in the queue (seconds)
+            - :code:`max_queue_depth` - the highest number of acquires waiting at once
+            - :code:`mean_queue_depth` - the number of waiting acquires averaged over time, since the first acquire
+
+        '''
+        mean_depth = 0.0
+        if self.queue_depth:
+            now = asyncio.get_event_loop().time()
+            elapsed = now - self._started
+            samples = self.queue_depth + [(now, 0)]
+            area = sum(depth * (end - start) for (start, depth), (end, _) in zip(samples, samples[1:]))
+            mean_depth = area / elapsed if elapsed else 0.0
+        return {
+            'acquired': len(self.waits),
+            'timeouts': self.timeouts,
+            'max_in_use': self.max_in_use,
+            'max_wait': self.max_wait,
+            'mean_wait': sum(self.waits) / len(self.waits) if self.waits else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+            'mean_queue_depth': mean_depth,
+        }
+
+    def assertAllReleased(self):
+        ''' Whenever every acquired connection has been released.
+        '''
+        assert not self.in_use, '%d connections werent released' % self.in_use
+
+    def assertMaxWait(self, seconds):
+        ''' Checks whenever no acquire waited in the queue longer than :code:`seconds`.
+        '''
+        assert self.max_wait <= seconds, 'acquire waited %.3fs, more than %.3fs' % (self.max_wait, seconds)
+
+    def __repr__(self):
+        return '<MockPool size=%d in_use=%d waiting=%d>' % (
+            self.size, self.in_use, sum(not waiter.done() for waiter in self._waiters))
@@ -0,0 +1,142 @@
+import asyncio
+import collections
+import os
+import re
+import sys
+import threading
+from ._compat import _all_tasks, _get_coro
+
+
+#: profiles collected in this process
+results = []
+
+DEFAULT_DIRECTORY = 'aiounittest-profile'
+DEFAULT_INTERVAL = 0.001
+
+_HANDLE_RUN = asyncio.events.Handle._run.__code__
+_TASKS_FILE = asyncio.tasks.__file__
+
+
+def get_directory(profile=None):
+    ''' Directory to write profiles to, by the argument or :code:`AIOUNITTEST_PROFILE` environment variable
+    (:code:`1` - the default directory, otherwise a path), :code:`None` if disabled.
+    '''
+    if profile is None or profile is True:
+        value = os.environ.get('AIOUNITTEST_PROFILE', '')
+        if value in ('', '0', '1'):
+            return DEFAULT_DIRECTORY if value == '1' or profile is True else None
+        return value
+    return profile or None
+
+
+def _label(code):
+    return '%s (%s:%d)' % (getattr(code, 'co_qualname', code.co_name), code.co_filename, code.co_firstlineno)
+
+
+def _current_task(loop):
+    if hasattr(asyncio, 'current_task'):
+        return asyncio.current_task(loop)
+    return asyncio.Task.current_task(loop)  # Python < 3.7
+
+
+def _awaiting_stack(task):
+    # logical stack of the suspended task, following the awaited coroutines
+    stack = []
+    coro = _get_coro(task)
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        stack.append(_label(frame.f_code))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    waiter = getattr(task, '_fut_waiter', None)
+    if waiter is not None or coro is not None:
+        stack.append('[await %s]' % type(waiter if waiter is not None else coro).__name__)
+    return stack
+
+
+class Profiler:
+    ''' Profiles the test run on the :code:`loop` (in the current thread) with :code:`cProfile` and a sampler.
+
+    The sampler (a thread) looks at the loop's thread every :code:`interval` seconds. When the loop runs a task,
+    the sample goes to the stack of the task (the coroutines awaiting each other, up to the task's
+    coroutine), when it waits for I/O or timers, every pending task gets the sample at its logical stack,
+    ending with what it awaits. So the time spent awaiting is attributed to the code awaiting.
+
+    :ivar str name: test id
+    :ivar collections.Counter samples: collapsed stacks (:code:`;` separated) to number of samples
+    :ivar str pstats_path: path of the written :code:`pstats` file
+    :ivar str collapsed_path: path of the written collapsed stacks file
+
+    '''
+    def __init__(self, loop, name, directory=DEFAULT_DIRECTORY, interval=DEFAULT_INTERVAL):
+        self.loop = loop
+        self.name = name
+        self.directory = directory
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.pstats_path = None
+        self.collapsed_path = None
+        self._thread_id = threading.get_ident()
+        self._stopped = threading.Event()
+        self._sampler = None
+        self._profile = None
+
+    def start(self):
+        import cProfile  # only when profiling, it's not cheap to import
+        self._profile = cProfile.Profile()
+        self._sampler = threading.Thread(target=self._run_sampler, name='aiounittest-profiler', daemon=True)
+        self._sampler.start()
+        self._profile.enable()
+        return self
+
+    def stop(self):
+        ''' Stops profiling and writes :code:`<name>.pstats` and :code:`<name>.collapsed` files to the directory.
+        '''
+        self._profile.disable()
+        self._stopped.set()
+        self._sampler.join()
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, re.sub(r'[^\w.\-\[\]]+', '_', self.name))
+        self.pstats_path = base + '.pstats'
+        self._profile.dump_stats(self.pstats_path)
+        self.collapsed_path = base + '.collapsed'
+        with open(self.collapsed_path, 'w') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write('%s %d\n' % (stack, count))
+        results.append(self)
+        return self
+
+    def _run_sampler(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self._sample()
+            except RuntimeError:
+                # the tasks have changed meanwhile, skip the sample
+                pass
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._thread_id)
+        stack = []
+        while frame is not None and frame.f_code is not _HANDLE_RUN:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+        if frame is None:
+            # between the callbacks, waiting for I/O or timers
+            for task in list(_all_tasks(self.loop)):
+                if not task.done():
+                    self.samples[';'.join([self.name] + _awaiting_stack(task))] += 1
+            return
+        task = _current_task(self.loop)
+        labels = [self.name] if task is not None else [self.name, '[callback]']
+        labels.extend(_label(code) for code in reversed(stack) if code.co_filename != _TASKS_FILE)
+        self.samples[';'.join(labels)] += 1
+
+    def __repr__(self):
+        return '<Profiler %s samples=%d>' % (self.name, sum(self.samples.values()))
+
+
+def clear():
+    ''' Removes all collected profiles (the files are kept).
+    '''
+    del results[:]
@@ -0,0 +1,199 @@
+import asyncio
+import functools
+import glob
+import inspect
+import json
+import os
+import pytest
+from . import benchmark as _benchmark
+from . import helpers as _helpers
+from . import timing as _timing
+from .loops import resolve_loop_factory, is_debug_enabled
+
+
+# loop scope -> pytest fixture scope
+_FIXTURE_SCOPES = {'test': 'function', 'class': 'class', 'module': 'module', 'session': 'session'}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('aiounittest')
+    group.addoption('--aiounittest-loop-scope', choices=_helpers.LOOP_SCOPES, default=None,
+                    help='scope of the event loop shared by the tests and async fixtures '
+                         '(default: AIOUNITTEST_LOOP_SCOPE environment variable or "test")')
+    parser.addini('aiounittest_loop_scope', 'default of --aiounittest-loop-scope')
+
+
+def get_loop_scope(config):
+    ''' Loop scope of the session, by :code:`--aiounittest-loop-scope` option, :code:`aiounittest_loop_scope` ini option
+    or :code:`AIOUNITTEST_LOOP_SCOPE` environment variable.
+    '''
+    loop_scope = config.getoption('aiounittest_loop_scope') or config.getini('aiounittest_loop_scope') or None
+    return _helpers._get_loop_scope(loop_scope)
+
+
+def _get_worker_id(config):
+    workerinput = getattr(config, 'workerinput', None)
+    return workerinput['workerid'] if workerinput else None
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'aiounittest: run the test on the loop of aiounittest')
+    loop_scope = config.getoption('aiounittest_loop_scope') or config.getini('aiounittest_loop_scope')
+    if loop_scope:
+        # tests that don't use the loop of the plugin (eg. virtual time) follow the same scope
+        config._aiounittest_environ = os.environ.get('AIOUNITTEST_LOOP_SCOPE')
+        os.environ['AIOUNITTEST_LOOP_SCOPE'] = get_loop_scope(config)
+
+
+def pytest_unconfigure(config):
+    if not hasattr(config, '_aiounittest_environ'):
+        return
+    if config._aiounittest_environ is None:
+        os.environ.pop('AIOUNITTEST_LOOP_SCOPE', None)
+    else:
+        os.environ['AIOUNITTEST_LOOP_SCOPE'] = config._aiounittest_environ
+
+
+def _fixture_scope(fixture_name, config):
+    return _FIXTURE_SCOPES[get_loop_scope(config)]
+
+
+@pytest.fixture(scope=_fixture_scope)
+def aiounittest_loop():
+    ''' Event loop shared by the tests and async fixtures, of the configured loop scope.
+    '''
+    spec = (resolve_loop_factory(), is_debug_enabled())
+    loop = _helpers._get_brand_new_default_event_loop(*spec)
+    _helpers._runner_loop = (spec, loop)
+    try:
+        yield loop
+    finally:
+        _helpers._runner_loop = None
+        _helpers._close_loop(loop)
+        _helpers._get_brand_new_default_event_loop()
+
+
+def _is_aiounittest_test(item):
+    from .case import AsyncTestCase
+    cls = getattr(item, 'cls', None)
+    if cls is not None and issubclass(cls, AsyncTestCase):
+        return True
+    function = getattr(item, 'function', None)
+    return (getattr(function, '__aiounittest_async_test__', False) or
+            item.get_closest_marker('aiounittest') is not None)
+
+
+@pytest.fixture(autouse=True)
+def _aiounittest_runner_loop(request):
+    # provides the loop to tests run by aiounittest, other tests don't pay for it
+    if _is_aiounittest_test(request.node):
+        request.getfixturevalue('aiounittest_loop')
+    yield
+
+
+def _is_async_fixture(func):
+    return inspect.iscoroutinefunction(func) or inspect.isasyncgenfunction(func)
+
+
+def _bind_fixture(func, request):
+    if request.instance is not None and not hasattr(func, '__self__') and '.' in func.__qualname__:
+        # fixture defined in the test class
+        return func.__get__(request.instance)
+    return func
+
+
+def _sync_fixture(func, request):
+    loop = request.getfixturevalue('aiounittest_loop')
+
+    def run(awaitable):
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(awaitable)
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        def generator(*args, **kwargs):
+            agen = func(*args, **kwargs)
+            yield run(agen.__anext__())
+            try:
+                run(agen.__anext__())
+            except StopAsyncIteration:
+                pass
+            else:
+                raise ValueError('%s yielded more than once' % request.fixturename)
+        return generator
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        return run(func(*args, **kwargs))
+    return call
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    # coroutine functions marked with `aiounittest`, `async_test` functions are already synchronous
+    if pyfuncitem.get_closest_marker('aiounittest') is None or not asyncio.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    _helpers.run_sync(pyfuncitem.obj)(**kwargs)
+    return True
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    func = fixturedef.func
+    item = getattr(request, '_pyfuncitem', None)
+    if not _is_async_fixture(func) or item is None or not _is_aiounittest_test(item):
+        # left to pytest (or other plugins, eg. anyio)
+        yield
+        return
+    # run async fixtures requested by the tests of aiounittest on their loop, only for the duration of this call
+    fixturedef.func = _sync_fixture(_bind_fixture(func, request), request)
+    try:
+        yield
+    finally:
+        fixturedef.func = func
+
+
+def _worker_paths(path):
+    return sorted(glob.glob('%s.gw*' % glob.escape(path)))
+
+
+def _merge_benchmarks(path):
+    baseline = _benchmark._load_baseline(path)
+    worker_paths = _worker_paths(path)
+    for worker_path in worker_paths:
+        baseline.update(_benchmark._load_baseline(worker_path))
+    if worker_paths:
+        with open(path, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+    for worker_path in worker_paths:
+        os.remove(worker_path)
+
+
+def _merge_timings(path):
+    for worker_path in _worker_paths(path):
+        with open(worker_path) as f, open(path, 'a') as out:
+            out.write(f.read())
+        os.remove(worker_path)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    benchmark_path = os.environ.get('AIOUNITTEST_BENCHMARK_SAVE')
+    timing_path = os.environ.get('AIOUNITTEST_TIMING', '')
+    if timing_path in ('0', '1'):
+        timing_path = ''
+    worker_id = _get_worker_id(session.config)
+    if worker_id is not None:
+        # xdist worker, the results go to its own files (before it reports finished), merged by the controller
+        if benchmark_path and _benchmark.results:
+            _benchmark.save_baseline('%s.%s' % (benchmark_path, worker_id))
+            _benchmark.clear()
+        if timing_path and _timing.records:
+            _timing.dump_jsonl('%s.%s' % (timing_path, worker_id))
+            _timing.clear()
+        return
+    if benchmark_path:
+        _merge_benchmarks(benchmark_path)
+    if timing_path:
+        _merge_timings(timing_path)
@@ -0,0 +1,302 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import unittest
+from collections import OrderedDict
+from .durations import DEFAULT_PATH, DurationCache, ORDERS, get_path
+from .suite import AsyncTestLoader, AsyncTestSuite, _isnotsuite
+
+
+def _iter_tests(suite):
+    for test in suite:
+        if _isnotsuite(test):
+            yield test
+        else:
+            yield from _iter_tests(test)
+
+
+def _is_loadable(test):
+    # tests that can be loaded again by `TestLoader.loadTestsFromName(test.id())` in a worker
+    return (isinstance(test, unittest.TestCase) and not isinstance(test, unittest.FunctionTestCase) and
+            type(test).__module__ not in ('unittest.loader', '__main__'))
+
+
+def _shard_key(test, granularity):
+    if granularity == 'test':
+        return test.id()
+    return '%s.%s' % (type(test).__module__, type(test).__qualname__)
+
+
+class _RemoteTest:
+    ''' Stand-in for a test run by a worker, enough for reporting.
+    '''
+    def __init__(self, test_id, name, description):
+        self._id = test_id
+        self._name = name
+        self._description = description
+
+    def id(self):
+        return self._id
+
+    def shortDescription(self):
+        return self._description
+
+    def countTestCases(self):
+        return 1
+
+    def __str__(self):
+        return self._name
+
+
+class _QueueResult(unittest.TestResult):
+    ''' Worker side result, streams every event to the parent.
+    '''
+    def __init__(self, results, worker):
+        super().__init__()
+        self._results = results
+        self._worker = worker
+        self._started = None
+
+    def _send(self, event, test, *args):
+        self._results.put((self._worker, event, test.id(), str(test), test.shortDescription()) + args)
+
+    def startTest(self, test):
+        super().startTest(test)
+        self._started = time.perf_counter()
+        self._send('startTest', test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        # the duration goes with the event, for the durations cache
+        self._send('stopTest', test, time.perf_counter() - self._started)
+
+    def addSuccess(self, test):
+        self._send('addSuccess', test)
+
+    def addFailure(self, test, err):
+        self._send('addFailure', test, self._exc_info_to_string(err, test))
+
+    def addError(self, test, err):
+        self._send('addError', test, self._exc_info_to_string(err, test))
+
+    def addSkip(self, test, reason):
+        self._send('addSkip', test, reason)
+
+    def addExpectedFailure(self, test, err):
+        self._send('addExpectedFailure', test, self._exc_info_to_string(err, test))
+
+    def addUnexpectedSuccess(self, test):
+        self._send('addUnexpectedSuccess', test)
+
+    def addSubTest(self, test, subtest, err):
+        if err is not None:
+            event = 'addFailure' if issubclass(err[0], test.failureException) else 'addError'
+            self._send(event, subtest, self._exc_info_to_string(err, test))
+
+    def addDuration(self, test, elapsed):
+        self._send('addDuration', test, elapsed)
+
+
+def _run_worker(worker, shards, results, sys_path, loop_scope):
+    sys.path[:] = sys_path
+    if loop_scope:
+        os.environ['AIOUNITTEST_LOOP_SCOPE'] = loop_scope
+    loader = AsyncTestLoader()
+    try:
+        for shard in iter(shards.get, None):
+            suite = AsyncTestSuite()
+            for name in shard:
+                suite.addTests(_iter_tests(loader.loadTestsFromName(name)))
+            # a fresh result, the suite tears down class and module fixtures of the previous shard by it
+            suite.run(_QueueResult(results, worker))
+    finally:
+        results.put((worker, 'done'))
+
+
+class ShardedTextTestResult(unittest.TextTestResult):
+    ''' Text result that accepts failures already formatted by a worker.
+    '''
+    def _exc_info_to_string(self, err, test):
+        if isinstance(err, str):
+            return err
+        return super()._exc_info_to_string(err, test)
+
+
+class ShardedTestRunner(unittest.TextTestRunner):
+    ''' Runs tests in parallel in :code:`jobs` worker processes.
+
+    :param int jobs: number of worker processes, defaults to the number of CPUs
+    :param str granularity: :code:`class` (default) sends all tests of a class to the same worker,
+                            :code:`test` distributes single tests
+    :param str loop_scope: loop scope used by workers, by default the same as in the main process
+                           (:code:`AIOUNITTEST_LOOP_SCOPE` or a loop per test, see :code:`aiounittest.async_test`)
+    :param duration_cache: path of the durations cache (:code:`True` - the default one), by default
+                      :code:`AIOUNITTEST_DURATIONS` environment variable (see :code:`aiounittest.durations`)
+    :param str order: order of the shards by the durations cache: :code:`failed` (default) - failed the last
+                      time first, then the longest first, :code:`longest` - the longest first,
+                      :code:`none` - as discovered
+
+    Results are streamed back from workers and merged into a single standard :code:`unittest` result.
+    With the durations cache the longest shards are started first, so the workers finish at the same time,
+    the cache is updated with the tests run.
+    Tests that cannot be loaded by name in a worker (eg. import errors) are run in the main process.
+    Other arguments are the same as for :code:`unittest.TextTestRunner` (including :code:`durations`, Python 3.12+).
+
+    .. code-block:: python
+
+            import unittest
+            from aiounittest.runner import ShardedTestRunner
+
+            suite = unittest.defaultTestLoader.discover('tests')
+            ShardedTestRunner(jobs=4, verbosity=2).run(suite)
+
+    '''
+    resultclass = ShardedTextTestResult
+
+    def __init__(self, *args, jobs=None, granularity='class', loop_scope=None, duration_cache=None,
+                 order='failed', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.granularity = granularity
+        self.loop_scope = loop_scope
+        path = get_path(duration_cache)
+        self.duration_cache = DurationCache(path) if path else None
+        self.order = order
+
+    def run(self, test):
+        return super().run(lambda result: self._run_sharded(test, result))
+
+    def split(self, test):
+        ''' Splits tests into shards (lists of test ids) and a suite of tests to be run locally.
+        '''
+        shards = OrderedDict()
+        local = AsyncTestSuite()
+        for case in _iter_tests(test):
+            if _is_loadable(case):
+                shards.setdefault(_shard_key(case, self.granularity), []).append(case.id())
+            else:
+                local.addTest(case)
+        if self.duration_cache is None:
+            return list(shards.values()), local
+        return [shards[key] for key in self.duration_cache.sort(shards, self.order)], local
+
+    def _run_sharded(self, test, result):
+        try:
+            self._run_shards(test, result)
+        finally:
+            if self.duration_cache is not None:
+                self.duration_cache.save()
+
+    def _run_shards(self, test, result):
+        shards, local = self.split(test)
+        local.run(result)
+        if not shards or result.shouldStop:
+            return
+
+        ctx = multiprocessing.get_context()
+        tasks, results = ctx.Queue(), ctx.Queue()
+        for shard in shards:
+            tasks.put(shard)
+        workers = []
+        for worker in range(min(self.jobs, len(shards))):
+            tasks.put(None)
+            process = ctx.Process(target=_run_worker, args=(worker, tasks, results, list(sys.path), self.loop_scope))
+            # not a daemon, so tests can start processes of their own, it's terminated below if needed
+            process.start()
+            workers.append(process)
+
+        running = set(range(len(workers)))
+        # events of a test are buffered until it stops, so reports of tests running in parallel don't interleave
+        buffered, proxies = {}, {}
+        finished = False
+        try:
+            while running and not result.shouldStop:
+                try:
+                    event = results.get(timeout=0.1)
+                except queue.Empty:
+                    for worker in list(running):
+                        if workers[worker].exitcode is not None:
+                            running.discard(worker)
+                            self._report_crash(result, worker, workers[worker].exitcode, buffered.pop(worker, []))
+                    continue
+                worker, name = event[:2]
+                if name == 'done':
+                    running.discard(worker)
+                    continue
+                test_id, test_name, description = event[2:5]
+                proxy = proxies.get(test_name)
+                if proxy is None:
+                    proxy = proxies[test_name] = _RemoteTest(test_id, test_name, description)
+                if name == 'stopTest':
+                    events = buffered.pop(worker, []) + [(name, proxy)]
+                    self._record_duration(test_id, event[5], events)
+                    self._replay(result, events)
+                else:
+                    buffered.setdefault(worker, []).append((name, proxy) + event[5:])
+            finished = not running
+        finally:
+            for process in workers:
+                # stopped early (failfast, interrupted, an error here), the workers don't get the rest of the shards
+                if process.is_alive() and not finished:
+                    process.terminate()
+                process.join()
+
+    def _record_duration(self, test_id, duration, events):
+        if self.duration_cache is not None:
+            failed = any(name in ('addFailure', 'addError', 'addUnexpectedSuccess') for name, *_ in events)
+            self.duration_cache.record(test_id, duration, failed)
+
+    def _replay(self, result, events):
+        for name, test, *args in events:
+            if hasattr(result, name):
+                getattr(result, name)(test, *args)
+
+    def _report_crash(self, result, worker, exitcode, events):
+        message = 'Worker %d exited unexpectedly with code %s\n' % (worker, exitcode)
+        if events:
+            test = events[0][1]
+        else:
+            test = _RemoteTest('aiounittest.runner.worker%d' % worker, 'worker %d' % worker, None)
+            events.append(('startTest', test))
+        self._replay(result, events + [('addError', test, message), ('stopTest', test)])
+
+
+def main(argv=None):
+    ''' Command line entry point, :code:`python -m aiounittest`.
+    '''
+    parser = argparse.ArgumentParser(prog='python -m aiounittest', description='Run tests in parallel processes.')
+    parser.add_argument('tests', nargs='*', help='test modules, classes or methods, discovered if not given')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='number of worker processes (default: CPU count)')
+    parser.add_argument('-s', '--start-directory', default='.', help='directory to start discovery (default: .)')
+    parser.add_argument('-p', '--pattern', default='test*.py', help='pattern to match test files (default: test*.py)')
+    parser.add_argument('-t', '--top-level-directory', default=None, help='top level directory of project')
+    parser.add_argument('--granularity', choices=('class', 'test'), default='class', help='sharding granularity')
+    parser.add_argument('--loop-scope', default=None, help='event loop scope in workers (default: AIOUNITTEST_LOOP_SCOPE or test)')
+    parser.add_argument('--durations', default=None,
+                        help='durations cache file, empty to disable (default: %s)' % DEFAULT_PATH)
+    parser.add_argument('--order', choices=ORDERS, default='failed',
+                        help='failed the last time first, then the longest (default), the longest first or as discovered')
+    parser.add_argument('-f', '--failfast', action='store_true', help='stop on first fail or error')
+    parser.add_argument('-v', '--verbose', dest='verbosity', action='store_const', const=2, default=1)
+    parser.add_argument('-q', '--quiet', dest='verbosity', action='store_const', const=0)
+    args = parser.parse_args(argv)
+
+    loader = AsyncTestLoader()
+    if args.tests:
+        sys.path.insert(0, os.getcwd())
+        suite = loader.loadTestsFromNames(args.tests)
+    else:
+        suite = loader.discover(args.start_directory, args.pattern, args.top_level_directory)
+
+    duration_cache = args.durations
+    if duration_cache is None:
+        # the command line keeps the cache by default
+        duration_cache = os.environ.get('AIOUNITTEST_DURATIONS') or True
+    runner = ShardedTestRunner(verbosity=args.verbosity, failfast=args.failfast, jobs=args.jobs,
+                               granularity=args.granularity, loop_scope=args.loop_scope,
+                               duration_cache=duration_cache, order=args.order)
+    result = runner.run(suite)
+    return 0 if result.wasSuccessful() else 1
@@ -0,0 +1,332 @@
+import asyncio
+import collections
+import itertools
+from unittest.mock import patch
+
+
+DEFAULT_LIMIT = 2 ** 16
+DEFAULT_HIGH_WATER = 2 ** 16
+
+
+class MemoryTransport(asyncio.Transport):
+    ''' In-memory counterpart of a TCP transport, connected to the peer transport (see :code:`create_transport_pair`).
+
+    Written data is buffered without copying (as :code:`memoryview` of the written bytes) and delivered
+    to the peer's protocol after :code:`latency` seconds, at most at :code:`bandwidth` bytes per second.
+    Undelivered data counts to the write buffer, the protocol is paused above the high-water mark and resumed
+    below the low-water mark (so :code:`StreamWriter.drain` blocks), data isn't delivered while the peer
+    paused reading.
+
+    '''
+    def __init__(self, loop, protocol, latency=0, bandwidth=None, extra=None):
+        super().__init__(extra)
+        self._loop = loop
+        self._protocol = protocol
+        self._latency = latency
+        self._bandwidth = bandwidth
+        self._peer = None
+        self._buffer = collections.deque()  # (ready at, data)
+        self._buffer_size = 0
+        self._link_free = 0
+        self._timer = None
+        self._reading = True
+        self._writing_paused = False
+        self._closing = False
+        self._eof = False
+        self._eof_sent = False
+        self._eof_at = 0
+        self._lost = False
+        self.set_write_buffer_limits()
+
+    def get_protocol(self):
+        return self._protocol
+
+    def set_protocol(self, protocol):
+        self._protocol = protocol
+
+    def is_closing(self):
+        return self._closing or self._lost
+
+    def is_reading(self):
+        return self._reading and not self._lost
+
+    def pause_reading(self):
+        self._reading = False
+
+    def resume_reading(self):
+        if not self._reading:
+            self._reading = True
+            if self._peer is not None:
+                self._peer._schedule()
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        if high is None:
+            high = DEFAULT_HIGH_WATER if low is None else 4 * low
+        if low is None:
+            low = high // 4
+        if not high >= low >= 0:
+            raise ValueError('high (%r) must be >= low (%r) must be >= 0' % (high, low))
+        self._high_water = high
+        self._low_water = low
+
+    def get_write_buffer_limits(self):
+        return self._low_water, self._high_water
+
+    def get_write_buffer_size(self):
+        return self._buffer_size
+
+    def can_write_eof(self):
+        return True
+
+    def write(self, data):
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError('data argument must be a bytes-like object, not %r' % type(data).__name__)
+        if self._eof:
+            raise RuntimeError('Cannot call write() after write_eof()')
+        if not data or self.is_closing():
+            return
+        # bytes are immutable, so they are kept without copying
+        view = memoryview(data if isinstance(data, bytes) else bytes(data))
+        size = view.nbytes
+        now = self._loop.time()
+        sent = max(now, self._link_free) + (size / self._bandwidth if self._bandwidth else 0)
+        self._link_free = sent
+        self._buffer.append((sent + self._latency, view))
+        self._buffer_size += size
+        self._schedule()
+        if not self._writing_paused and self._buffer_size > self._high_water:
+            self._writing_paused = True
+            self._protocol.pause_writing()
+
+    def write_eof(self):
+        if self._eof or self.is_closing():
+            return
+        self._eof = True
+        self._eof_at = max(self._loop.time(), self._link_free) + self._latency
+        self._schedule()
+
+    def close(self):
+        if self.is_closing():
+            return
+        self._closing = True
+        self._eof_at = max(self._loop.time(), self._link_free) + self._latency
+        self._schedule()
+
+    def abort(self):
+        self._lose(None)
+        if self._peer is not None:
+            self._peer._lose(ConnectionResetError('Connection reset by peer'))
+
+    def _schedule(self):
+        if self._timer is not None or self._lost:
+            return
+        if not self._buffer:
+            if self._eof or self._closing:
+                self._timer = self._loop.call_at(self._eof_at, self._deliver)
+            return
+        if not self._peer.is_reading() and not self._peer._lost:
+            # resumed by the peer
+            return
+        ready = self._buffer[0][0]
+        if ready <= self._loop.time():
+            self._timer = self._loop.call_soon(self._deliver)
+        else:
+            self._timer = self._loop.call_at(ready, self._deliver)
+
+    def _deliver(self):
+        self._timer = None
+        if self._lost:
+            return
+        peer = self._peer
+        if peer._lost:
+            # the other side is gone, the data is lost
+            self._buffer.clear()
+            self._buffer_size = 0
+        now = self._loop.time()
+        while self._buffer and self._buffer[0][0] <= now and peer.is_reading():
+            _, view = self._buffer.popleft()
+            self._buffer_size -= view.nbytes
+            peer._protocol.data_received(view.obj if view.nbytes == len(view.obj) else view.tobytes())
+        if self._writing_paused and self._buffer_size <= self._low_water:
+            self._writing_paused = False
+            self._protocol.resume_writing()
+        if self._buffer:
+            self._schedule()
+            return
+        if (self._eof or self._closing) and not self._eof_sent:
+            if self._eof_at > now:
+                self._timer = self._loop.call_at(self._eof_at, self._deliver)
+                return
+            self._eof_sent = True
+            if not peer._lost and not peer._protocol.eof_received():
+                peer.close()
+        if self._closing:
+            self._lose(None)
+
+    def _lose(self, exc):
+        if self._lost:
+            return
+        self._lost = True
+        self._closing = True
+        self._buffer.clear()
+        self._buffer_size = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._loop.call_soon(self._protocol.connection_lost, exc)
+
+
+def create_transport_pair(client_protocol, server_protocol, latency=0, bandwidth=None,
+                          client_address=('127.0.0.1', 1), server_address=('127.0.0.1', 2)):
+    ''' Connects two protocols with in-memory transports.
+
+    :param client_protocol: protocol of the client side
+    :param server_protocol: protocol of the server side
+    :param float latency: seconds for the data to reach the other side
+    :param int bandwidth: bytes per second, unlimited by default
+    :return: :code:`(client_transport, server_transport)`
+
+    '''
+    loop = asyncio.get_event_loop()
+    client = MemoryTransport(loop, client_protocol, latency, bandwidth,
+                             {'peername': server_address, 'sockname': client_address})
+    server = MemoryTransport(loop, server_protocol, latency, bandwidth,
+                             {'peername': client_address, 'sockname': server_address})
+    client._peer, server._peer = server, client
+    server_protocol.connection_made(server)
+    client_protocol.connection_made(client)
+    return client, server
+
+
+def _stream_protocol(limit, client_connected_cb=None):
+    reader = asyncio.StreamReader(limit=limit)
+    return reader, asyncio.StreamReaderProtocol(reader, client_connected_cb)
+
+
+async def create_stream_pair(latency=0, bandwidth=None, limit=DEFAULT_LIMIT):
+    ''' Creates a pair of connected streams, without any socket.
+
+    :param float latency: seconds for the data to reach the other side
+    :param int bandwidth: bytes per second, unlimited by default
+    :param int limit: buffer limit of the readers
+    :return: :code:`((client_reader, client_writer), (server_reader, server_writer))`
+
+    .. code-block:: python
+
+        class MyProtocolTest(aiounittest.AsyncTestCase):
+
+            async def test_echo(self):
+                (reader, writer), server = await create_stream_pair(latency=0.01)
+                asyncio.ensure_future(echo(*server))
+                writer.write(b'ping\\n')
+                await writer.drain()
+                self.assertEqual(await reader.readline(), b'ping\\n')
+
+    '''
+    loop = asyncio.get_event_loop()
+    client_reader, client_protocol = _stream_protocol(limit)
+    server_reader, server_protocol = _stream_protocol(limit)
+    client, server = create_transport_pair(client_protocol, server_protocol, latency, bandwidth)
+    return ((client_reader, asyncio.StreamWriter(client, client_protocol, client_reader, loop)),
+            (server_reader, asyncio.StreamWriter(server, server_protocol, server_reader, loop)))
+
+
+class MemoryServer:
+    ''' Server of :code:`MemoryNetwork`, mimics :code:`asyncio.Server`.
+    '''
+    def __init__(self, network, protocol_factory, address):
+        self._network = network
+        self._protocol_factory = protocol_factory
+        self.address = address
+        self.sockets = ()
+
+    def is_serving(self):
+        return self._network._servers.get(self.address) is self
+
+    def close(self):
+        if self.is_serving():
+            del self._network._servers[self.address]
+
+    async def wait_closed(self):
+        pass
+
+    async def start_serving(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+        await self.wait_closed()
+
+    def __repr__(self):
+        return '<MemoryServer %s:%d>' % self.address
+
+
+class MemoryNetwork:
+    ''' In-memory network, servers and connections without sockets.
+
+    :param float latency: seconds for the data to reach the other side
+    :param int bandwidth: bytes per second of every connection, unlimited by default
+
+    It provides counterparts of :code:`asyncio.start_server`, :code:`asyncio.open_connection` and
+    :code:`loop.create_server`, :code:`loop.create_connection`. Arguments of the real ones not listed
+    (eg. :code:`ssl`) are accepted, but ignored. Servers listen on the given host and port
+    (port :code:`0` picks a free one), connecting elsewhere raises :code:`ConnectionRefusedError`.
+
+    .. code-block:: python
+
+        class MyServerTest(aiounittest.AsyncTestCase):
+            virtual_time = True
+
+            async def test_server(self):
+                network = MemoryNetwork(latency=0.05, bandwidth=10 * 1024 * 1024)
+                with network.patch():
+                    # code under test calls asyncio.start_server and asyncio.open_connection
+                    server = await start_my_server('127.0.0.1', 8080)
+                    reply = await my_client('127.0.0.1', 8080)
+
+    '''
+    def __init__(self, latency=0, bandwidth=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._servers = {}
+        self._ports = itertools.count(49152)
+
+    def _free_port(self, host):
+        for port in self._ports:
+            if (host, port) not in self._servers:
+                return port
+
+    async def create_server(self, protocol_factory, host='127.0.0.1', port=0, **kwargs):
+        host = host or '127.0.0.1'
+        address = (host, port or self._free_port(host))
+        if address in self._servers:
+            raise OSError(98, 'address already in use: %s:%d' % address)
+        server = self._servers[address] = MemoryServer(self, protocol_factory, address)
+        return server
+
+    async def create_connection(self, protocol_factory, host='127.0.0.1', port=None, **kwargs):
+        server = self._servers.get((host or '127.0.0.1', port))
+        if server is None:
+            raise ConnectionRefusedError(111, 'Connect call failed (%r, %r)' % (host, port))
+        protocol = protocol_factory()
+        transport, _ = create_transport_pair(protocol, server._protocol_factory(), self.latency, self.bandwidth,
+                                             (server.address[0], self._free_port(server.address[0])),
+                                             server.address)
+        return transport, protocol
+
+    async def start_server(self, client_connected_cb, host='127.0.0.1', port=0, limit=DEFAULT_LIMIT, **kwargs):
+        return await self.create_server(lambda: _stream_protocol(limit, client_connected_cb)[1], host, port)
+
+    async def open_connection(self, host='127.0.0.1', port=None, limit=DEFAULT_LIMIT, **kwargs):
+        reader, protocol = _stream_protocol(limit)
+        transport, _ = await self.create_connection(lambda: protocol, host, port)
+        return reader, asyncio.StreamWriter(transport, protocol, reader, asyncio.get_event_loop())
+
+    def patch(self):
+        ''' Patches :code:`asyncio.start_server` and :code:`asyncio.open_connection` to use the network,
+        returns :code:`unittest.mock.patch` usable as a context manager or decorator.
+        '''
+        return patch.multiple(asyncio, start_server=self.start_server, open_connection=self.open_connection)
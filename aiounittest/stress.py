@@ -0,0 +1,187 @@
+import asyncio
+import functools
+import itertools
+import sys
+import traceback
+import unittest
+from .benchmark import BenchmarkStats
+
+
+#: stress runs in this process
+results = []
+
+DEFAULT_ITERATIONS = 100
+
+
+class StressFailure(AssertionError):
+    ''' Raised when any iteration of the stress run fails.
+
+    :ivar StressStats stats: statistics of the run
+    :ivar list failures: :code:`(iteration, exc_info)` of every failed iteration
+
+    '''
+    def __init__(self, message, stats, failures):
+        super().__init__(message)
+        self.stats = stats
+        self.failures = failures
+
+
+class StressStats(BenchmarkStats):
+    ''' Statistics of the stress run, :code:`timings` are the latencies of the iterations (of the loop's clock,
+    as :code:`elapsed`, so on :code:`aiounittest.VirtualTimeEventLoop` they are simulated too).
+
+    :ivar int concurrency: number of concurrent workers
+    :ivar int failed: number of failed iterations
+    :ivar float elapsed: seconds (of the loop's clock) the run took
+
+    '''
+    def __init__(self, name, timings, concurrency, failed, elapsed):
+        super().__init__(name, timings)
+        self.concurrency = concurrency
+        self.failed = failed
+        self.elapsed = elapsed
+
+    @property
+    def iterations(self):
+        return self.rounds
+
+    # no iteration may have completed (eg. with duration=0), then the statistics are zeros
+
+    @property
+    def min(self):
+        return super().min if self.timings else 0.0
+
+    @property
+    def max(self):
+        return super().max if self.timings else 0.0
+
+    @property
+    def mean(self):
+        return super().mean if self.timings else 0.0
+
+    @property
+    def ops(self):
+        return super().ops if self.timings else 0.0
+
+    def percentile(self, p):
+        return super().percentile(p) if self.timings else 0.0
+
+    @property
+    def throughput(self):
+        ''' Iterations per second, achieved by all workers.
+        '''
+        return self.iterations / self.elapsed if self.elapsed else float('inf')
+
+    def as_dict(self):
+        ret = super().as_dict()
+        ret.update(concurrency=self.concurrency, failed=self.failed, elapsed=self.elapsed,
+                   throughput=self.throughput)
+        return ret
+
+    def __repr__(self):
+        return '<StressStats %s iterations=%d failed=%d throughput=%.1f p99=%.9f>' % (
+            self.name, self.iterations, self.failed, self.throughput, self.p99)
+
+
+async def run_stress(coro_fn, *args, concurrency=10, iterations=None, duration=None, name=None, **kwargs):
+    ''' Awaits :code:`coro_fn(*args, **kwargs)` many times, by :code:`concurrency` workers running concurrently.
+
+    :param callable coro_fn: coroutine function to run
+    :param int concurrency: number of concurrent workers
+    :param int iterations: total number of runs, 100 by default (unless :code:`duration` is given)
+    :param float duration: seconds (of the loop's clock) to keep running, at most :code:`iterations` if given as well
+    :param str name: name of the run, the qualified name of :code:`coro_fn` by default
+    :rtype: StressStats
+    :raises StressFailure: if any iteration has failed, all failures are aggregated
+
+    '''
+    if iterations is None and duration is None:
+        iterations = DEFAULT_ITERATIONS
+    loop = asyncio.get_event_loop()
+    started = loop.time()
+    deadline = started + duration if duration is not None else None
+    counter = iter(range(iterations)) if iterations is not None else itertools.count()
+    timings = []
+    failures = []
+
+    async def worker():
+        for iteration in counter:
+            if deadline is not None and loop.time() >= deadline:
+                break
+            begin = loop.time()
+            try:
+                await coro_fn(*args, **kwargs)
+            except (KeyboardInterrupt, SystemExit, asyncio.CancelledError):
+                raise
+            except BaseException:
+                failures.append((iteration, sys.exc_info()))
+            timings.append(loop.time() - begin)
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    stats = StressStats(name or '%s.%s' % (coro_fn.__module__, coro_fn.__qualname__), timings, concurrency,
+                        len(failures), loop.time() - started)
+    results.append(stats)
+    if failures:
+        raise StressFailure(_describe_failures(stats, failures), stats, failures)
+    return stats
+
+
+def _describe_failures(stats, failures):
+    # distinct errors (by the type and the place raised), with the traceback of their first occurrence
+    distinct = {}
+    for iteration, exc_info in failures:
+        tb = exc_info[2]
+        while tb is not None and tb.tb_next is not None:
+            tb = tb.tb_next
+        key = (exc_info[0], tb.tb_frame.f_code.co_filename if tb else None, tb.tb_lineno if tb else None)
+        if key not in distinct:
+            distinct[key] = [iteration, 0, exc_info]
+        distinct[key][1] += 1
+    lines = ['%d of %d iterations failed (%d distinct errors, concurrency %d)' % (
+        len(failures), stats.iterations, len(distinct), stats.concurrency)]
+    for first, count, exc_info in distinct.values():
+        lines.append('%d times, first at iteration %d:\n%s' % (
+            count, first, ''.join(traceback.format_exception(*exc_info)).rstrip('\n')))
+    return '\n\n'.join(lines)
+
+
+def clear():
+    ''' Removes all collected stress runs.
+    '''
+    del results[:]
+
+
+def async_stress(func=None, concurrency=10, iterations=None, duration=None):
+    ''' Makes the decorated coroutine function run many times concurrently (see :code:`run_stress`).
+
+    :param int concurrency: number of concurrent workers
+    :param int iterations: total number of runs, 100 by default (unless :code:`duration` is given)
+    :param float duration: seconds to keep running
+
+    The decorated function is still a coroutine function, so it can be a test of :code:`AsyncTestCase`
+    (or decorated with :code:`async_test`). It returns :code:`aiounittest.stress.StressStats`, unless it's
+    a test method (then the stats are available in :code:`aiounittest.stress.results`). Failures of
+    all iterations are reported at once, with :code:`aiounittest.stress.StressFailure`.
+
+    .. code-block:: python
+
+            class MyTest(aiounittest.AsyncTestCase):
+
+                @async_stress(concurrency=50, iterations=1000)
+                async def test_counter(self):
+                    await self.counter.increment()
+
+    '''
+    def decorator(coro_fn):
+        @functools.wraps(coro_fn)
+        async def wrapper(*args, **kwargs):
+            test = args[0] if args and isinstance(args[0], unittest.TestCase) else None
+            stats = await run_stress(coro_fn, *args, concurrency=concurrency, iterations=iterations,
+                                     duration=duration, name=test.id() if test is not None else None, **kwargs)
+            # tests should not return anything
+            return stats if test is None else None
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
@@ -0,0 +1,113 @@
+import unittest
+from .case import AsyncTestCase
+
+
+def _isnotsuite(test):
+    try:
+        iter(test)
+    except TypeError:
+        return True
+    return False
+
+
+def _is_concurrent(test):
+    return isinstance(test, AsyncTestCase) and test._can_run_concurrently()
+
+
+class AsyncTestSuite(unittest.TestSuite):
+    ''' Test suite that runs the tests of :code:`concurrent` AsyncTestCase classes concurrently.
+
+    The coroutine tests of such class are gathered and run on one event loop, the remaining tests
+    (synchronous ones and marked with :code:`aiounittest.serial`) are run one by one afterwards.
+    Class and module fixtures work as in :code:`unittest.TestSuite`.
+
+    .. code-block:: python
+
+            import asyncio
+            import aiounittest
+
+            class MyTest(aiounittest.AsyncTestCase):
+                concurrent = True
+                concurrency_limit = 50
+
+                async def test_1(self):
+                    await asyncio.sleep(1)
+
+                async def test_2(self):
+                    await asyncio.sleep(1)
+
+
+            if __name__ == '__main__':
+                unittest.main(testLoader=aiounittest.AsyncTestLoader())
+
+    It can be also enabled per module with the :code:`load_tests` protocol:
+
+    .. code-block:: python
+
+            def load_tests(loader, tests, pattern):
+                return aiounittest.AsyncTestSuite(tests)
+
+    Other runners (eg. `pytest`) run such tests sequentially.
+
+    '''
+
+    def run(self, result, debug=False):
+        if debug:
+            return super().run(result, debug)
+
+        topLevel = False
+        if getattr(result, '_testRunEntered', False) is False:
+            result._testRunEntered = topLevel = True
+
+        batch, deferred = [], []
+        for index, test in enumerate(self):
+            if result.shouldStop:
+                break
+
+            if batch and (not _isnotsuite(test) or test.__class__ is not batch[0].__class__):
+                self._run_batch(batch, deferred, result)
+
+            if _isnotsuite(test):
+                self._tearDownPreviousClass(test, result)
+                self._handleModuleFixture(test, result)
+                self._handleClassSetUp(test, result)
+                result._previousTestClass = test.__class__
+
+                if (getattr(test.__class__, '_classSetupFailed', False) or
+                        getattr(result, '_moduleSetUpFailed', False)):
+                    continue
+            elif not isinstance(test, AsyncTestSuite):
+                test = AsyncTestSuite(test)
+
+            if _is_concurrent(test):
+                batch.append(test)
+            elif batch:
+                deferred.append(test)
+            else:
+                test(result)
+
+            if self._cleanup:
+                self._removeTestAtIndex(index)
+
+        if batch:
+            self._run_batch(batch, deferred, result)
+
+        if topLevel:
+            self._tearDownPreviousClass(None, result)
+            self._handleModuleTearDown(result)
+            result._testRunEntered = False
+        return result
+
+    def _run_batch(self, batch, deferred, result):
+        batch[0]._run_concurrently(batch, result)
+        for test in deferred:
+            if result.shouldStop:
+                break
+            test(result)
+        del batch[:], deferred[:]
+
+
+class AsyncTestLoader(unittest.TestLoader):
+    ''' Test loader that builds :code:`aiounittest.AsyncTestSuite` suites.
+    '''
+    suiteClass = AsyncTestSuite
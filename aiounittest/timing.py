@@ -0,0 +1,317 @@
+import asyncio
+import atexit
+import gc
+import heapq
+import itertools
+import json
+import os
+import time
+import weakref
+from ._compat import _get_coro
+
+try:
+    import contextvars
+except ImportError:  # Python < 3.7
+    contextvars = None
+
+
+#: timings collected in this process
+records = []
+
+# loop -> attached probe
+_probes = weakref.WeakKeyDictionary()
+
+# owner (eg. a concurrent test) of the running task, inherited by the tasks it creates
+_owner = contextvars.ContextVar('aiounittest_owner', default=None) if contextvars is not None else None
+
+
+class TestTiming:
+    ''' Timing of a single run of :code:`aiounittest.run_sync`.
+
+    :ivar str name: test id (or function name when not run as a test)
+    :ivar float setup: seconds spent on creating (or reusing) the event loop
+    :ivar float run: wall time of running the coroutine
+    :ivar float teardown: seconds spent on closing (or cleaning up) the event loop
+    :ivar float busy: part of :code:`run` the loop spent on running callbacks
+    :ivar float idle: part of :code:`run` the loop spent waiting in the selector, :code:`None` if the loop has no selector
+    :ivar int callbacks: number of callbacks scheduled
+    :ivar int tasks: number of tasks created
+    :ivar list slowest: the slowest callbacks, list of :code:`(seconds, description)`
+
+    '''
+    def __init__(self, name):
+        self.name = name
+        self.setup = 0.0
+        self.run = 0.0
+        self.teardown = 0.0
+        self.busy = 0.0
+        self.idle = None
+        self.callbacks = 0
+        self.tasks = 0
+        self.slowest = []
+
+    @property
+    def wall(self):
+        ''' Total time, including the loop setup and teardown.
+        '''
+        return self.setup + self.run + self.teardown
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'wall': self.wall,
+            'setup': self.setup,
+            'run': self.run,
+            'teardown': self.teardown,
+            'busy': self.busy,
+            'idle': self.idle,
+            'callbacks': self.callbacks,
+            'tasks': self.tasks,
+            'slowest': [list(item) for item in self.slowest],
+        }
+
+    def __repr__(self):
+        return '<TestTiming %s wall=%.6f run=%.6f>' % (self.name, self.wall, self.run)
+
+
+def _innermost(coro):
+    while True:
+        inner = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+        if inner is None or not (hasattr(inner, 'cr_frame') or hasattr(inner, 'gi_frame')):
+            return coro
+        coro = inner
+
+
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+
+def _callback_task(callback):
+    # the task of a task step callback, None for other callbacks
+    owner = getattr(callback, '__self__', None)
+    if isinstance(owner, asyncio.Task):
+        return owner
+    if type(callback).__name__ == 'TaskWakeupMethWrapper':
+        # Python 3.6, the wakeup callback of the C task doesn't expose the task
+        for referent in gc.get_referents(callback):
+            if isinstance(referent, asyncio.Task):
+                return referent
+    return None
+
+
+def _task_location(callback):
+    # where the task of the step is suspended (outside asyncio), None for other callbacks
+    owner = _callback_task(callback)
+    if owner is None:
+        return None
+    coro = _get_coro(owner)
+    location = None
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        if not frame.f_code.co_filename.startswith(_ASYNCIO_DIR):
+            location = '%s:%d' % (frame.f_code.co_filename, frame.f_lineno)
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return location
+
+
+def describe_callback(callback):
+    ''' Human readable description of a loop callback, for a task step it points where the task stopped.
+    '''
+    owner = _callback_task(callback)
+    if owner is not None:
+        coro = _innermost(_get_coro(owner))
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        where = getattr(coro, '__qualname__', repr(coro))
+        if frame is not None:
+            where = '%s (%s:%d)' % (where, frame.f_code.co_filename, frame.f_lineno)
+        return 'Task %s' % where
+    code = getattr(callback, '__code__', None)
+    where = getattr(callback, '__qualname__', None) or repr(callback)
+    if code is not None:
+        where = '%s (%s:%d)' % (where, code.co_filename, code.co_firstlineno)
+    return where
+
+
+class LoopProbe:
+    ''' Measures the activity of the loop, by wrapping its scheduling methods, task factory and selector.
+
+    :param loop: event loop to measure
+    :param TestTiming timing: record to fill in
+    :param int slowest: number of the slowest callbacks to keep
+
+    Callbacks blocking the loop longer than a threshold are collected by :code:`watch`.
+
+    '''
+    def __init__(self, loop, timing, slowest=5):
+        self.loop = loop
+        self.timing = timing
+        self.slowest = slowest
+        self._watchers = []
+        #: :code:`time.perf_counter()` when the running callback has started, :code:`None` between callbacks
+        self.running_since = None
+        #: where the task of the running step was resumed (only while watching)
+        self.resumed_at = None
+        self._heap = []
+        self._counter = itertools.count()
+        self._active = False
+        self._task_factory = None
+        self._selector = None
+
+    def attach(self):
+        loop = self.loop
+        call_soon, call_soon_threadsafe, call_at = loop.call_soon, loop.call_soon_threadsafe, loop.call_at
+
+        def _call_soon(callback, *args, **kwargs):
+            return call_soon(self._timed(callback), *args, **kwargs)
+
+        def _call_soon_threadsafe(callback, *args, **kwargs):
+            return call_soon_threadsafe(self._timed(callback), *args, **kwargs)
+
+        def _call_at(when, callback, *args, **kwargs):
+            return call_at(when, self._timed(callback), *args, **kwargs)
+
+        try:
+            loop.call_soon, loop.call_soon_threadsafe, loop.call_at = _call_soon, _call_soon_threadsafe, _call_at
+        except AttributeError:
+            # loop without instance attributes, callbacks won't be measured
+            pass
+
+        self._task_factory = loop.get_task_factory()
+        loop.set_task_factory(self._create_task)
+
+        selector = getattr(loop, '_selector', None)
+        if selector is not None:
+            self._selector = selector
+            self.timing.idle = 0.0
+            select = selector.select
+
+            def _select(timeout=None):
+                started = time.perf_counter()
+                try:
+                    return select(timeout)
+                finally:
+                    if self._active:
+                        self.timing.idle += time.perf_counter() - started
+            selector.select = _select
+        self._active = True
+        _probes[loop] = self
+        return self
+
+    def detach(self):
+        self._active = False
+        loop = self.loop
+        if _probes.get(loop) is self:
+            del _probes[loop]
+        for name in ('call_soon', 'call_soon_threadsafe', 'call_at'):
+            getattr(loop, '__dict__', {}).pop(name, None)
+        if not loop.is_closed():
+            loop.set_task_factory(self._task_factory)
+        if self._selector is not None:
+            self._selector.__dict__.pop('select', None)
+        self.timing.slowest = [(duration, description) for duration, _, description in sorted(self._heap, reverse=True)]
+        del self._heap[:]
+
+    def watch(self, threshold, owner=None):
+        ''' Collects callbacks running longer than :code:`threshold` seconds.
+
+        :param owner: collect only the callbacks of the tasks owned by it (see :code:`set_owner`), all by default
+        :return: list, filled in with :code:`(seconds, description)` of such callbacks (for a task step the
+                 description tells between which lines the task was running)
+
+        '''
+        blocks = []
+        self._watchers.append((threshold, blocks, owner))
+        return blocks
+
+    def unwatch(self, blocks):
+        ''' Stops filling the list returned by :code:`watch`.
+        '''
+        self._watchers = [watcher for watcher in self._watchers if watcher[1] is not blocks]
+
+    def _create_task(self, loop, coro, **kwargs):
+        if self._active:
+            self.timing.tasks += 1
+        if self._task_factory is not None:
+            return self._task_factory(loop, coro, **kwargs)
+        return asyncio.Task(coro, loop=loop, **kwargs)
+
+    def _timed(self, callback):
+        if self._active:
+            self.timing.callbacks += 1
+
+        def timed(*args):
+            resumed = self.resumed_at = _task_location(callback) if self._watchers else None
+            started = self.running_since = time.perf_counter()
+            try:
+                return callback(*args)
+            finally:
+                self.running_since = self.resumed_at = None
+                if self._active:
+                    self._record(callback, time.perf_counter() - started, resumed)
+        return timed
+
+    def _record(self, callback, duration, resumed=None):
+        for threshold, blocks, owner in self._watchers:
+            if duration > threshold and (owner is None or _owner is None or _owner.get() is owner):
+                description = describe_callback(callback)
+                if resumed is not None:
+                    description = '%s, resumed at %s' % (description, resumed)
+                blocks.append((duration, description))
+        self.timing.busy += duration
+        if len(self._heap) < self.slowest:
+            heapq.heappush(self._heap, (duration, next(self._counter), describe_callback(callback)))
+        elif duration > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (duration, next(self._counter), describe_callback(callback)))
+
+
+def set_owner(owner):
+    ''' Marks the current task (and the tasks it creates from now on) as owned by :code:`owner`, so the probe
+    can tell which of the tests sharing the loop is blocking it. Ignored before Python 3.7 (no :code:`contextvars`).
+    '''
+    if _owner is not None:
+        _owner.set(owner)
+
+
+def get_probe(loop):
+    ''' Probe attached to the loop, :code:`None` if there's none.
+    '''
+    return _probes.get(loop)
+
+
+def is_enabled(timing=None):
+    ''' Whenever timings should be collected, by the argument or :code:`AIOUNITTEST_TIMING` environment variable.
+    '''
+    if timing is not None:
+        return bool(timing)
+    return os.environ.get('AIOUNITTEST_TIMING', '0') not in ('', '0')
+
+
+def dump_jsonl(fp, timings=None):
+    ''' Writes timings as JSON lines.
+
+    :param fp: path or file object (opened for writing text)
+    :param list timings: timings to write, all collected by default
+
+    '''
+    timings = records if timings is None else timings
+    if isinstance(fp, str):
+        with open(fp, 'a') as f:
+            return dump_jsonl(f, timings)
+    for timing in timings:
+        fp.write(json.dumps(timing.as_dict()) + '\n')
+
+
+def clear():
+    ''' Removes all collected timings.
+    '''
+    del records[:]
+
+
+def _dump_at_exit():
+    path = os.environ.get('AIOUNITTEST_TIMING', '')
+    if path not in ('', '0', '1') and records:
+        dump_jsonl(path)
+
+
+atexit.register(_dump_at_exit)
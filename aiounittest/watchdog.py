@@ -0,0 +1,123 @@
+import asyncio
+import linecache
+import os
+import sys
+import threading
+import traceback
+from ._compat import _all_tasks, _get_coro
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    ''' Raised when the test doesn't complete in time, the message describes the pending tasks.
+    '''
+
+
+def get_timeout(timeout=None):
+    ''' Timeout in seconds, by the argument or :code:`AIOUNITTEST_TIMEOUT` environment variable, :code:`None` if disabled.
+    '''
+    if timeout is None:
+        timeout = os.environ.get('AIOUNITTEST_TIMEOUT', '')
+        if timeout in ('', '0'):
+            return None
+    return float(timeout) if timeout else None
+
+
+def _format_frame(frame):
+    lineno = frame.f_lineno
+    code = frame.f_code
+    line = linecache.getline(code.co_filename, lineno, frame.f_globals).strip()
+    ret = '  File "%s", line %d, in %s\n' % (code.co_filename, lineno, code.co_name)
+    if line:
+        ret += '    %s\n' % line
+    return ret
+
+
+def describe_task(task):
+    ''' Stack of the task's coroutine (following the awaited coroutines) and what it's waiting for.
+    '''
+    lines = [repr(task) + '\n']
+    coro = _get_coro(task)
+    awaiting = None
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            awaiting = coro
+            break
+        lines.append(_format_frame(frame))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    waiter = getattr(task, '_fut_waiter', None)
+    if awaiting is None or waiter is not None:
+        awaiting = waiter
+    if awaiting is not None:
+        lines.append('  awaiting %r\n' % (awaiting,))
+    return ''.join(lines)
+
+
+class Watchdog:
+    ''' Cancels the :code:`future` running on the :code:`loop`, if it doesn't complete in :code:`timeout` seconds.
+
+    It measures the real time (in a thread), so it works with :code:`aiounittest.VirtualTimeEventLoop` too.
+    On expiry the pending tasks are described (see :code:`describe_task`). If the loop is blocked
+    (eg. by synchronous code), it can't be cancelled, then the stack of the loop's thread is written
+    to stderr (after another :code:`timeout`, at least :code:`grace` seconds), so the hang can be found anyway.
+
+    '''
+    grace = 1.0
+
+    def __init__(self, loop, future, timeout, name=None, stream=None):
+        self.loop = loop
+        self.future = future
+        self.timeout = timeout
+        self.name = name
+        self.stream = stream
+        self.expired = False
+        self.report = None
+        self._thread_id = threading.get_ident()
+        self._timer = None
+        self._blocked_timer = None
+
+    def start(self):
+        self._timer = threading.Timer(self.timeout, self._expire_threadsafe)
+        self._timer.daemon = True
+        self._timer.start()
+        return self
+
+    def stop(self):
+        for timer in (self._timer, self._blocked_timer):
+            if timer is not None:
+                timer.cancel()
+
+    def _expire_threadsafe(self):
+        try:
+            self.loop.call_soon_threadsafe(self._expire)
+        except RuntimeError:
+            # loop closed meanwhile
+            return
+        self._blocked_timer = threading.Timer(max(self.timeout, self.grace), self._dump_blocked)
+        self._blocked_timer.daemon = True
+        self._blocked_timer.start()
+
+    def _expire(self):
+        if self.future.done():
+            return
+        if self._blocked_timer is not None:
+            self._blocked_timer.cancel()
+        self.expired = True
+        tasks = sorted((task for task in _all_tasks(self.loop) if not task.done()),
+                       key=lambda task: task is not self.future)
+        self.report = '%s timed out after %gs, pending tasks:\n\n%s' % (
+            self.name or 'Test', self.timeout, '\n'.join(describe_task(task) for task in tasks))
+        self.future.cancel()
+
+    def _dump_blocked(self):
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None or self.future.done():
+            return
+        stream = self.stream or sys.stderr
+        stream.write('%s timed out after %gs, but the event loop is blocked (cannot cancel), '
+                     'stack of its thread:\n%s' % (self.name or 'Test', self.timeout,
+                                                   ''.join(traceback.format_stack(frame))))
+        stream.flush()
+
+    def error(self):
+        return DeadlineExceeded(self.report)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+''' Benchmarks of aiounittest's own hot paths.
+
+Run against the working tree:
+
+    python benchmarks/bench_hot_paths.py
+
+Save the results and compare later runs with them:
+
+    python benchmarks/bench_hot_paths.py --save base.json
+    python benchmarks/bench_hot_paths.py --compare base.json
+
+Compare git revisions (each is checked out into a temporary worktree), the working tree is always included:
+
+    python benchmarks/bench_hot_paths.py --rev master --rev HEAD~3
+
+Every benchmark reports the best time per operation of several repeats.
+'''
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _setup_imports():
+    path = os.environ.get('AIOUNITTEST_BENCH_PATH', ROOT)
+    sys.path.insert(0, path)
+
+
+def bench_import(repeat, code):
+    path = os.environ.get('AIOUNITTEST_BENCH_PATH', ROOT)
+    env = dict(os.environ, PYTHONPATH=path)
+
+    def run(statement):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.check_call([sys.executable, '-c', statement], env=env, cwd=path)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    return max(run(code) - run('pass'), 0.0)
+
+
+def bench_run_sync(number, loop_scope=None):
+    from aiounittest import async_test
+
+    async def noop():
+        pass
+
+    kwargs = {'loop_scope': loop_scope} if loop_scope else {}
+    wrapped = async_test(noop, **kwargs)
+    return lambda: wrapped(), number
+
+
+def bench_getattribute(number, name):
+    import aiounittest
+
+    class Case(aiounittest.AsyncTestCase):
+        async def test_noop(self):
+            pass
+
+    case = Case('test_noop')
+    return lambda: getattr(case, name), number
+
+
+def bench_coroutine(coro_fn, number):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(coro_fn()), 1, number
+
+
+def bench_futurized(number):
+    import asyncio
+    from aiounittest import futurized
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+
+    async def create():
+        for _ in range(number):
+            futurized(1)
+
+    return lambda: loop.run_until_complete(create()), 1, number
+
+
+def bench_futurized_constant(number):
+    from aiounittest import futurized_constant
+    constant = futurized_constant(1)
+
+    async def consume():
+        for _ in range(number):
+            await constant
+
+    return bench_coroutine(consume, number)
+
+
+def bench_mock_iterator(number):
+    import asyncio
+    from aiounittest.mock import AsyncMockIterator
+    loop = asyncio.new_event_loop()
+    items = list(range(number))
+
+    async def consume():
+        async for _ in AsyncMockIterator(items):
+            pass
+
+    return lambda: loop.run_until_complete(consume()), 1, number
+
+
+BENCHMARKS = [
+    ('run_sync', lambda: bench_run_sync(200)),
+    ('run_sync[session]', lambda: bench_run_sync(2000, 'session')),
+    ('getattribute[assertEqual]', lambda: bench_getattribute(100000, 'assertEqual')),
+    ('getattribute[test_noop]', lambda: bench_getattribute(20000, 'test_noop')),
+    ('futurized', lambda: bench_futurized(20000)),
+    ('futurized_constant[await]', lambda: bench_futurized_constant(20000)),
+    ('AsyncMockIterator', lambda: bench_mock_iterator(100000)),
+]
+
+
+def run_benchmarks(repeat, only=None):
+    _setup_imports()
+    results = {}
+    for name, factory in BENCHMARKS:
+        if only and name not in only:
+            continue
+        try:
+            prepared = factory()
+            func, number = prepared[:2]
+            ops = prepared[2] if len(prepared) > 2 else number
+            results[name] = min(timeit.repeat(func, number=number, repeat=repeat)) / ops
+        except Exception as e:  # eg. an API not available in the benchmarked revision
+            print('%s: skipped (%s: %s)' % (name, type(e).__name__, e), file=sys.stderr)
+            results[name] = None
+    if not only or 'import' in only:
+        results['import'] = bench_import(repeat * 2, 'import aiounittest')
+    if not only or 'import[AsyncTestCase]' in only:
+        results['import[AsyncTestCase]'] = bench_import(repeat * 2, 'from aiounittest import AsyncTestCase')
+    return results
+
+
+def run_revision(rev, repeat):
+    directory = tempfile.mkdtemp(prefix='aiounittest-bench-')
+    worktree = os.path.join(directory, 'tree')
+    subprocess.check_call(['git', 'worktree', 'add', '--detach', worktree, rev], cwd=ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        env = dict(os.environ, AIOUNITTEST_BENCH_PATH=worktree)
+        out = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--json', '--repeat', str(repeat)],
+                                      env=env)
+        return json.loads(out.decode())
+    finally:
+        subprocess.call(['git', 'worktree', 'remove', '--force', worktree], cwd=ROOT)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def _format(seconds):
+    if seconds is None:
+        return '-'
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6), ('ns', 1e9)):
+        if seconds * scale >= 1:
+            return '%.2f %s' % (seconds * scale, unit)
+    return '%.2f ns' % (seconds * 1e9)
+
+
+def print_table(columns):
+    names = list(columns)
+    base = columns[names[0]]
+    rows = sorted({key for results in columns.values() for key in results})
+    width = max(len(row) for row in rows) + 2
+    print(''.join([' ' * width] + ['%22s' % name for name in names]))
+    for row in rows:
+        line = ['%-*s' % (width, row)]
+        for name in names:
+            value = columns[name].get(row)
+            cell = _format(value)
+            if name != names[0] and value is not None and base.get(row):
+                cell += ' (%+.1f%%)' % ((value - base[row]) / base[row] * 100)
+            line.append('%22s' % cell)
+        print(''.join(line))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='number of repeats, the best one is reported')
+    parser.add_argument('--save', help='save results of the working tree as JSON')
+    parser.add_argument('--compare', help='compare with results saved with --save')
+    parser.add_argument('--rev', action='append', default=[], help='git revision to compare with (repeatable)')
+    parser.add_argument('--only', action='append', help='run only given benchmark (repeatable)')
+    parser.add_argument('--json', action='store_true', help='print raw results as JSON')
+    args = parser.parse_args(argv)
+
+    columns = {}
+    if args.compare:
+        with open(args.compare) as f:
+            columns[os.path.basename(args.compare)] = json.load(f)
+    for rev in args.rev:
+        columns[rev] = run_revision(rev, args.repeat)
+    current = run_benchmarks(args.repeat, args.only)
+    columns['working tree'] = current
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+    if args.json:
+        print(json.dumps(current))
+    else:
+        print_table(columns)
+
+
+if __name__ == '__main__':
+    main()
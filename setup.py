@@ -18,6 +18,7 @@ setup(
     long_description=open('README.rst').read(),
     package_data={'aiounittest': ['py.typed']},
     install_requires=open('requirements.txt').read().splitlines(),
+    entry_points={'pytest11': ['aiounittest = aiounittest.pytest_plugin']},
     license="MIT",
     classifiers=[
         'License :: OSI Approved :: MIT License',
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import unittest
+import aiounittest
+
+
+class ConcurrentCase(aiounittest.AsyncTestCase):
+    concurrent = True
+    running = 0
+    max_running = 0
+
+    def setUp(self):
+        self.value = 1
+
+    async def sleep(self):
+        cls = self.__class__
+        cls.running += 1
+        cls.max_running = max(cls.max_running, cls.running)
+        await asyncio.sleep(0.1)
+        cls.running -= 1
+
+    async def test_1(self):
+        await self.sleep()
+        self.value += 1
+        self.assertEqual(self.value, 2)
+
+    async def test_2(self):
+        await self.sleep()
+        self.assertEqual(self.value, 1)
+
+    async def test_3_fail(self):
+        await self.sleep()
+        self.assertEqual(1, 2)
+
+    async def test_4_error(self):
+        await self.sleep()
+        raise ValueError('oops')
+
+    @unittest.expectedFailure
+    async def test_5_expected_failure(self):
+        await self.sleep()
+        self.fail()
+
+    @unittest.skip('no reason')
+    async def test_6_skip(self):
+        pass
+
+    @aiounittest.serial
+    async def test_7_serial(self):
+        self.assertEqual(self.__class__.running, 0)
+
+    def test_8_sync(self):
+        self.assertEqual(self.__class__.running, 0)
+
+
+class LimitedCase(ConcurrentCase):
+    concurrency_limit = 2
+    running = 0
+    max_running = 0
+
+
+class LeakingConcurrentCase(aiounittest.AsyncTestCase):
+    concurrent = True
+    leaks = 'count'
+
+    async def test_1_leak(self):
+        asyncio.ensure_future(asyncio.sleep(10))
+
+    async def test_2(self):
+        await asyncio.sleep(0)
+
+    @unittest.skip('no reason')
+    async def test_3_skip(self):
+        pass
+
+
+class CheckedConcurrentCase(aiounittest.AsyncTestCase):
+    concurrent = True
+    timeout = 0.3
+    max_loop_block = 0.05
+
+    async def test_1_hang(self):
+        await asyncio.sleep(10)
+
+    async def test_2_block(self):
+        await asyncio.sleep(0.01)
+        time.sleep(0.1)
+
+    async def test_3_ok(self):
+        await asyncio.sleep(0.2)
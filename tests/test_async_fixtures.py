@@ -0,0 +1,165 @@
+import asyncio
+import io
+import unittest
+import aiounittest
+
+
+class Pool:
+    created = 0
+
+    def __init__(self):
+        self.loop = asyncio.get_event_loop()
+        self.closed = False
+        Pool.created += 1
+
+    async def acquire(self):
+        self.assertLoop()
+        await asyncio.sleep(0)
+        return object()
+
+    def assertLoop(self):
+        assert self.loop is asyncio.get_event_loop()
+
+
+class TestAsyncFixtures(aiounittest.AsyncTestCase):
+    events = []
+
+    @classmethod
+    async def asyncSetUpClass(cls):
+        await asyncio.sleep(0)
+        cls.pool = Pool()
+
+    @classmethod
+    async def asyncTearDownClass(cls):
+        cls.pool.closed = True
+
+    def setUp(self):
+        self.events = ['setUp']
+
+    async def asyncSetUp(self):
+        self.events.append('asyncSetUp')
+        self.conn = await self.pool.acquire()
+
+    async def asyncTearDown(self):
+        self.pool.assertLoop()
+
+    async def test_async(self):
+        self.assertEqual(self.events, ['setUp', 'asyncSetUp'])
+        self.assertIsNotNone(self.conn)
+        self.pool.assertLoop()
+
+    async def test_async_other(self):
+        self.assertEqual(Pool.created, 1)
+        self.pool.assertLoop()
+
+    def test_sync(self):
+        self.assertEqual(self.events, ['setUp', 'asyncSetUp'])
+        self.assertEqual(Pool.created, 1)
+
+
+class TestAsyncFixturesRun(unittest.TestCase):
+
+    def test_class_fixtures_run_once(self):
+
+        class Case(aiounittest.AsyncTestCase):
+            calls = []
+
+            @classmethod
+            async def asyncSetUpClass(cls):
+                cls.calls.append('asyncSetUpClass')
+
+            @classmethod
+            async def asyncTearDownClass(cls):
+                cls.calls.append('asyncTearDownClass')
+
+            async def asyncTearDown(self):
+                self.calls.append('asyncTearDown')
+
+            async def test_1(self):
+                self.calls.append('test')
+
+            async def test_2(self):
+                self.calls.append('test')
+
+        result = unittest.TextTestRunner(io.StringIO()).run(unittest.TestLoader().loadTestsFromTestCase(Case))
+        self.assertTrue(result.wasSuccessful())
+        self.assertEqual(Case.calls, [
+            'asyncSetUpClass', 'test', 'asyncTearDown', 'test', 'asyncTearDown', 'asyncTearDownClass'
+        ])
+
+    def test_class_fixture_failure(self):
+
+        class Case(aiounittest.AsyncTestCase):
+
+            @classmethod
+            async def asyncSetUpClass(cls):
+                raise ValueError('fixture')
+
+            async def test_1(self):
+                pass
+
+            async def test_2(self):
+                pass
+
+        result = unittest.TextTestRunner(io.StringIO()).run(unittest.TestLoader().loadTestsFromTestCase(Case))
+        self.assertEqual(len(result.errors), 2)
+        self.assertIn('ValueError: fixture', result.errors[1][1])
+
+    def test_class_fixture_tasks_kept(self):
+
+        async def ticks():
+            while True:
+                yield
+                await asyncio.sleep(0)
+
+        class Case(aiounittest.AsyncTestCase):
+            loop_scope = 'module'
+
+            @classmethod
+            async def asyncSetUpClass(cls):
+                cls.consumer = asyncio.ensure_future(asyncio.sleep(3600))
+                cls.ticks = ticks()
+                await cls.ticks.__anext__()
+
+            @classmethod
+            async def asyncTearDownClass(cls):
+                cls.done_before_teardown = cls.consumer.done()
+
+            async def test_1(self):
+                asyncio.ensure_future(asyncio.sleep(3600))
+                self.assertFalse(self.consumer.done())
+                await self.ticks.__anext__()
+
+            async def test_2(self):
+                self.assertFalse(self.consumer.done())
+                await self.ticks.__anext__()
+
+        result = unittest.TextTestRunner(io.StringIO()).run(unittest.TestLoader().loadTestsFromTestCase(Case))
+        self.assertTrue(result.wasSuccessful(), result.errors + result.failures)
+        self.assertFalse(Case.done_before_teardown)
+        self.assertTrue(Case.consumer.cancelled())
+
+    def test_sync_tests_outside_loop(self):
+
+        class Case(aiounittest.AsyncTestCase):
+            calls = []
+
+            async def asyncSetUp(self):
+                self.loop = asyncio.get_event_loop()
+                self.calls.append('asyncSetUp')
+
+            async def asyncTearDown(self):
+                self.calls.append('asyncTearDown')
+
+            def test_sync(self):
+                self.assertFalse(self.loop.is_running())
+                self.assertIs(asyncio.get_event_loop(), self.loop)
+                self.calls.append('test')
+
+            @aiounittest.async_test
+            async def test_decorated(self):
+                await asyncio.sleep(0)
+
+        result = unittest.TextTestRunner(io.StringIO()).run(unittest.TestLoader().loadTestsFromTestCase(Case))
+        self.assertTrue(result.wasSuccessful(), result.errors + result.failures)
+        self.assertEqual(Case.calls, ['asyncSetUp', 'test', 'asyncTearDown'])
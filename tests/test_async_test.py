@@ -1,5 +1,9 @@
 import asyncio
+import os
+import subprocess
+import sys
 import unittest
+import aiounittest
 from aiounittest import async_test
 
 
@@ -36,3 +40,19 @@ class MyAsyncTestDecorator(unittest.TestCase):
 
         # decorator should not change the state (eg close) of the loop if it's custom
         self.assertFalse(loop.is_closed())
+
+    def test_features_imported_lazily(self):
+        code = (
+            'import sys, unittest, aiounittest\n'
+            'class Test(aiounittest.AsyncTestCase):\n'
+            '    async def test(self):\n'
+            '        pass\n'
+            'unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromTestCase(Test))\n'
+            'print(" ".join(sorted(name for name in sys.modules if name.startswith("aiounittest."))))\n'
+        )
+        env = {name: value for name, value in os.environ.items() if not name.startswith('AIOUNITTEST_')}
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(aiounittest.__file__)))
+        output = subprocess.check_output([sys.executable, '-c', code], env=env, stderr=subprocess.DEVNULL)
+        loaded = set(output.decode().split())
+        for name in ('blocking', 'executor', 'leaks', 'memory', 'profiling', 'timing', 'watchdog'):
+            self.assertNotIn('aiounittest.' + name, loaded)
@@ -0,0 +1,53 @@
+import asyncio
+from unittest.mock import Mock
+from aiounittest import AsyncTestCase
+from aiounittest.mock import AsyncMockContextManager
+
+
+async def fetch_user(db, user_id):
+    async with db.transaction() as tx:
+        return await tx.fetch(user_id)
+
+
+class MyAsyncMockContextManagerTest(AsyncTestCase):
+    virtual_time = True
+
+    async def test_value(self):
+        tx = Mock()
+        tx.fetch.return_value = asyncio.sleep(0, result={'id': 1})
+        db = Mock()
+        db.transaction.return_value = AsyncMockContextManager(tx, latency=0.5, exit_latency=0.25)
+        self.assertEqual(await fetch_user(db, 1), {'id': 1})
+        db.transaction.return_value.assertEnterCount(1)
+        db.transaction.return_value.assertExited()
+        self.assertEqual(db.transaction.return_value.exceptions, [None])
+        self.assertEqual(asyncio.get_event_loop().time(), 0.75)
+
+    async def test_exceptions(self):
+        cm = AsyncMockContextManager()
+        with self.assertRaises(ValueError):
+            async with cm:
+                raise ValueError('inside')
+        self.assertIsInstance(cm.exceptions[0], ValueError)
+
+        cm = AsyncMockContextManager(suppress=True)
+        async with cm:
+            raise ValueError('suppressed')
+        cm.assertExited()
+
+    async def test_error(self):
+        cm = AsyncMockContextManager(error=ConnectionError)
+        with self.assertRaises(ConnectionError):
+            async with cm:
+                pass
+        cm.assertEnterCount(1)
+        cm.assertExited()
+        self.assertEqual(cm.exceptions, [])
+
+    async def test_not_exited(self):
+        cm = AsyncMockContextManager()
+        await cm.__aenter__()
+        with self.assertRaises(AssertionError):
+            cm.assertExited()
+        with self.assertRaises(AssertionError):
+            cm.assertEnterCount(2)
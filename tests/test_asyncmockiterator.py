@@ -1,3 +1,5 @@
+import asyncio
+import itertools
 from aiounittest import AsyncTestCase
 from aiounittest.mock import AsyncMockIterator
 from unittest.mock import Mock
@@ -23,3 +25,90 @@ class MyAsyncMockIteratorTest(AsyncTestCase):
         self.assertEqual(res, 'asdfqwerzxcv')
         mock_iter.assertFullyConsumed()
         mock_iter.assertIterCount(3)
+
+
+async def agen(n):
+    for i in range(n):
+        yield i
+
+
+async def consume(mock_iter, delay=0):
+    ret = []
+    async for val in mock_iter:
+        ret.append(val)
+        if delay:
+            await asyncio.sleep(delay)
+    return ret
+
+
+class AsyncMockIteratorStreamTest(AsyncTestCase):
+    virtual_time = True
+
+    async def test_lazy(self):
+        mock_iter = AsyncMockIterator(itertools.count())
+        async for val in mock_iter:
+            if val == 5:
+                break
+        self.assertEqual(mock_iter.stats['items'], 6)
+        with self.assertRaises(AssertionError):
+            mock_iter.assertFullyConsumed()
+
+    async def test_async_source(self):
+        mock_iter = AsyncMockIterator(agen(3))
+        self.assertEqual(await consume(mock_iter), [0, 1, 2])
+        mock_iter.assertFullyConsumed()
+        mock_iter.assertIterCount(3)
+
+    async def test_latency(self):
+        loop = asyncio.get_event_loop()
+        mock_iter = AsyncMockIterator(range(10), latency=0.5)
+        await consume(mock_iter)
+        # plus the last (empty) fetch
+        self.assertEqual(loop.time(), 5.5)
+        self.assertEqual(mock_iter.stats['throughput'], 10 / 5.5)
+
+    async def test_page_latency(self):
+        loop = asyncio.get_event_loop()
+        delays = iter([1, 2, 3])
+        mock_iter = AsyncMockIterator(range(5), latency=lambda: next(delays), page_size=2)
+        await consume(mock_iter)
+        self.assertEqual(loop.time(), 6)
+
+    async def test_chunks(self):
+        mock_iter = AsyncMockIterator(agen(5), chunk_size=2)
+        self.assertEqual(await consume(mock_iter), [[0, 1], [2, 3], [4]])
+        mock_iter.assertFullyConsumed()
+        mock_iter.assertIterCount(3)
+        self.assertEqual(mock_iter.stats['items'], 5)
+
+    async def test_prefetch(self):
+        loop = asyncio.get_event_loop()
+        mock_iter = AsyncMockIterator(range(10), latency=1, prefetch=3)
+        self.assertEqual(await consume(mock_iter, delay=1), list(range(10)))
+        mock_iter.assertFullyConsumed()
+        # fetching overlaps with consuming
+        self.assertLess(loop.time(), 15)
+
+    async def test_prefetch_error(self):
+
+        async def failing():
+            yield 1
+            raise ValueError('source')
+
+        mock_iter = AsyncMockIterator(failing(), prefetch=2)
+        with self.assertRaises(ValueError):
+            await consume(mock_iter)
+        # the error doesn't turn into waiting for items that will never come
+        with self.assertRaises(ValueError):
+            await asyncio.wait_for(mock_iter.__anext__(), 1)
+
+    async def test_aclose(self):
+        mock_iter = AsyncMockIterator(itertools.count(), latency=1, prefetch=2)
+        await mock_iter.__anext__()
+        await mock_iter.aclose()
+
+    async def test_aclose_full_buffer(self):
+        mock_iter = AsyncMockIterator(itertools.count(), prefetch=2)
+        await mock_iter.__anext__()
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(mock_iter.aclose(), 1)
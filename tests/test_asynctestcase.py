@@ -2,6 +2,8 @@ import aiounittest
 import asyncio
 import time
 import sys
+import io
+import unittest
 from unittest import expectedFailure
 
 
@@ -62,3 +64,54 @@ class TestAsyncCase(aiounittest.AsyncTestCase):
         def test_yield_async_add(self):
             ret = yield from async_add(1, 5)
             self.assertEqual(ret, -1)
+
+
+class TestAsyncTestCaseWrapping(unittest.TestCase):
+
+    def test_wrapped_once_per_class(self):
+
+        class Case(aiounittest.AsyncTestCase):
+            async def test_async(self):
+                pass
+
+            def test_sync(self):
+                pass
+
+        self.assertTrue(Case.__dict__['test_async'].__aiounittest_wrapped__)
+        self.assertNotIn('__aiounittest_wrapped__', Case.__dict__['test_sync'].__dict__)
+        case = Case('test_async')
+        self.assertEqual(case.test_async.__func__, case.test_async.__func__)
+        self.assertEqual(type(case).assertEqual, unittest.TestCase.assertEqual)
+        self.assertTrue(unittest.TextTestRunner(io.StringIO()).run(case).wasSuccessful())
+
+    def test_inherited_with_fixtures(self):
+
+        class Base(aiounittest.AsyncTestCase):
+            def test_sync(self):
+                self.assertEqual(self.events, ['asyncSetUp'])
+
+        class Case(Base):
+            async def asyncSetUp(self):
+                self.events = ['asyncSetUp']
+
+        self.assertNotIn('__aiounittest_wrapped__', Base.__dict__['test_sync'].__dict__)
+        self.assertTrue(Case.__dict__['test_sync'].__aiounittest_wrapped__)
+        result = unittest.TextTestRunner(io.StringIO()).run(Case('test_sync'))
+        self.assertTrue(result.wasSuccessful())
+
+    def test_added_after_class_creation(self):
+
+        def add_tests(cls):
+            async def test_added(self):
+                await asyncio.sleep(0)
+                self.fail('awaited')
+            setattr(cls, 'test_added', test_added)
+            return cls
+
+        @add_tests
+        class Case(aiounittest.AsyncTestCase):
+            pass
+
+        result = unittest.TextTestRunner(io.StringIO()).run(Case('test_added'))
+        self.assertEqual(len(result.failures), 1)
+        self.assertIn('awaited', result.failures[0][1])
@@ -0,0 +1,68 @@
+import io
+import sys
+import time
+import unittest
+import aiounittest
+import dummy_cases
+
+
+def count_run(result):
+    # only Python 3.12.1 doesn't count skipped tests
+    return result.testsRun + (len(result.skipped) if sys.version_info[:3] == (3, 12, 1) else 0)
+
+
+class TestAsyncTestSuite(unittest.TestCase):
+
+    def run_case(self, case):
+        suite = aiounittest.AsyncTestLoader().loadTestsFromTestCase(case)
+        result = unittest.TextTestRunner(io.StringIO(), verbosity=2)._makeResult()
+        started = time.perf_counter()
+        suite.run(result)
+        return result, time.perf_counter() - started
+
+    def test_concurrent(self):
+        result, elapsed = self.run_case(dummy_cases.ConcurrentCase)
+        self.assertEqual(count_run(result), 8)
+        self.assertEqual(dummy_cases.ConcurrentCase.max_running, 5)
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual([str(t).split()[0] for t, _ in result.failures], ['test_3_fail'])
+        self.assertEqual([str(t).split()[0] for t, _ in result.errors], ['test_4_error'])
+        self.assertEqual(len(result.expectedFailures), 1)
+        self.assertEqual(len(result.skipped), 1)
+
+    def test_concurrency_limit(self):
+        result, _ = self.run_case(dummy_cases.LimitedCase)
+        self.assertEqual(count_run(result), 8)
+        self.assertEqual(dummy_cases.LimitedCase.max_running, 2)
+
+    def test_load_tests_protocol(self):
+        tests = unittest.TestLoader().loadTestsFromTestCase(dummy_cases.ConcurrentCase)
+        suite = aiounittest.AsyncTestSuite([tests])
+        result = unittest.TestResult()
+        suite.run(result)
+        self.assertEqual(count_run(result), 8)
+        self.assertEqual(len(result.failures), 1)
+
+    def test_batch_leaks(self):
+        result, _ = self.run_case(dummy_cases.LeakingConcurrentCase)
+        self.assertEqual([str(t).split()[0] for t, _ in result.failures], ['test_1_leak', 'test_2'])
+        self.assertIn('ResourceLeakError: Resources leaked by dummy_cases.LeakingConcurrentCase (2 concurrent tests)',
+                      result.failures[0][1])
+        self.assertEqual(len(result.skipped), 1)
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'blocking callbacks are not attributed to tests without contextvars')
+    def test_checked_per_test(self):
+        result, elapsed = self.run_case(dummy_cases.CheckedConcurrentCase)
+        self.assertLess(elapsed, 1)
+        self.assertEqual([str(t).split()[0] for t, _ in result.errors], ['test_1_hang'])
+        self.assertIn('DeadlineExceeded: dummy_cases.CheckedConcurrentCase.test_1_hang timed out after 0.3s',
+                      result.errors[0][1])
+        self.assertEqual([str(t).split()[0] for t, _ in result.failures], ['test_2_block'])
+        self.assertIn('LoopBlockedError', result.failures[0][1])
+        self.assertEqual(result.testsRun, 3)
+
+    def test_measured_tests_not_concurrent(self):
+        self.assertTrue(dummy_cases.ConcurrentCase('test_1')._can_run_concurrently())
+        case = dummy_cases.ConcurrentCase('test_1')
+        case.memory = 'summary'
+        self.assertFalse(case._can_run_concurrently())
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+import aiounittest
+from aiounittest import async_benchmark, benchmark
+from aiounittest.benchmark import BenchmarkRegression, BenchmarkStats
+
+
+async def work(calls):
+    calls.append(asyncio.get_event_loop())
+    await asyncio.sleep(0)
+
+
+class TestBenchmarkCase(aiounittest.AsyncTestCase):
+
+    def setUp(self):
+        self.addCleanup(benchmark.clear)
+
+    async def test_benchmark(self):
+        calls = []
+        stats = await self.benchmark(work, calls, rounds=20, warmup=5)
+        self.assertEqual(len(calls), 25)
+        self.assertEqual(set(calls), {asyncio.get_event_loop()})
+        self.assertEqual(stats.name, self.id())
+        self.assertEqual(stats.rounds, 20)
+        self.assertLessEqual(stats.min, stats.median)
+        self.assertLessEqual(stats.median, stats.p99)
+        self.assertLessEqual(stats.p99, stats.max)
+        self.assertGreater(stats.ops, 0)
+        self.assertIn(stats, benchmark.results)
+
+        stats = await self.benchmark(work, calls, rounds=1, warmup=0)
+        self.assertEqual(stats.name, '%s[work]' % self.id())
+
+    async def test_regression(self):
+        with self.assertRaises(BenchmarkRegression):
+            await self.benchmark(work, [], rounds=5, baseline={self.id(): 1e-9})
+        await self.benchmark(work, [], rounds=5, name='other', baseline={self.id(): 1e-9})
+        await self.benchmark(work, [], rounds=5, name='slow', baseline={'slow': {'median': 1e-9}}, tolerance=1e9)
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(benchmark.clear)
+
+    def test_stats(self):
+        stats = BenchmarkStats('x', [float(i) for i in range(100, 0, -1)])
+        self.assertEqual(stats.min, 1)
+        self.assertEqual(stats.max, 100)
+        self.assertEqual(stats.median, 50)
+        self.assertEqual(stats.p99, 99)
+        self.assertEqual(stats.mean, 50.5)
+        self.assertEqual(set(stats.as_dict()), {'name', 'rounds', 'min', 'max', 'mean', 'median', 'p99', 'ops'})
+
+    @async_benchmark(rounds=10, warmup=2)
+    async def test_decorator(self):
+        await asyncio.sleep(0)
+
+    def test_decorator_result(self):
+        calls = []
+        stats = async_benchmark(work, rounds=10, warmup=0, name='work', loop_scope='test')(calls)
+        self.assertEqual(stats.rounds, 10)
+        self.assertEqual(len(set(calls)), 1)
+        self.assertTrue(calls[0].is_closed())
+
+    def test_save_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            stats = async_benchmark(work, rounds=5, name='work')([])
+            benchmark.save_baseline(path)
+            with open(path) as f:
+                self.assertEqual(json.load(f)['work']['median'], stats.median)
+            with self.assertRaises(BenchmarkRegression):
+                benchmark.check_baseline(BenchmarkStats('work', [stats.median * 2]), path)
+            benchmark.check_baseline(BenchmarkStats('unknown', [1]), path)
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import time
+import unittest
+import warnings
+import aiounittest
+from aiounittest import async_test
+from aiounittest.blocking import LoopBlockedError, LoopBlockedWarning, get_action, get_threshold
+
+
+def sync_add(x, y, delay=0.1):
+    time.sleep(delay)
+    return x + y
+
+
+async def blocking_handler():
+    await asyncio.sleep(0)
+    return sync_add(1, 2)
+
+
+async def friendly_handler():
+    await asyncio.sleep(0.1)
+    return 3
+
+
+class TestLoopBlocking(unittest.TestCase):
+
+    def test_fail(self):
+        with self.assertRaises(LoopBlockedError) as cm:
+            async_test(blocking_handler, max_loop_block=0.05)()
+        (duration, description), = cm.exception.blocks
+        self.assertGreaterEqual(duration, 0.1)
+        self.assertIn('blocking_handler', description)
+        self.assertIn('%s:%d' % (__file__, blocking_handler.__code__.co_firstlineno + 1), description)
+        self.assertIn('longer than 0.050s', str(cm.exception))
+
+    def test_warn(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(async_test(blocking_handler, max_loop_block=0.05, on_loop_block='warn')(), 3)
+        self.assertEqual([warning.category for warning in caught], [LoopBlockedWarning])
+
+    def test_not_blocking(self):
+        self.assertEqual(async_test(friendly_handler, max_loop_block=0.05)(), 3)
+
+    def test_disabled(self):
+        self.assertEqual(async_test(blocking_handler)(), 3)
+
+    def test_environment(self):
+        self.assertIsNone(get_threshold())
+        self.assertIsNone(get_threshold(0))
+        self.assertEqual(get_action(), 'fail')
+        os.environ['AIOUNITTEST_MAX_LOOP_BLOCK'] = '0.2'
+        os.environ['AIOUNITTEST_ON_LOOP_BLOCK'] = 'warn'
+        try:
+            self.assertEqual(get_threshold(), 0.2)
+            self.assertEqual(get_action(), 'warn')
+            os.environ['AIOUNITTEST_MAX_LOOP_BLOCK'] = '0'
+            self.assertIsNone(get_threshold())
+        finally:
+            del os.environ['AIOUNITTEST_MAX_LOOP_BLOCK']
+            del os.environ['AIOUNITTEST_ON_LOOP_BLOCK']
+        with self.assertRaises(ValueError):
+            get_action('ignore')
+
+
+class TestLoopBlockingCase(aiounittest.AsyncTestCase):
+    max_loop_block = 0.5
+
+    async def test_max_loop_block(self):
+        async with self.assertMaxLoopBlock(50) as blocks:
+            await friendly_handler()
+        self.assertEqual(blocks, [])
+
+    async def test_max_loop_block_exceeded(self):
+        with self.assertRaises(AssertionError) as cm:
+            async with self.assertMaxLoopBlock(50):
+                await blocking_handler()
+        self.assertIn('resumed at %s:%d' % (__file__, blocking_handler.__code__.co_firstlineno + 1), str(cm.exception))
+
+    async def test_max_loop_block_body(self):
+        with self.assertRaises(AssertionError) as cm:
+            async with self.assertMaxLoopBlock(50):
+                sync_add(1, 2)
+        self.assertIn('test_max_loop_block_body', str(cm.exception))
+
+    async def test_completes_within(self):
+        self.assertEqual(await self.assertCompletesWithin(friendly_handler(), 1), 3)
+
+    async def test_completes_within_timeout(self):
+        with self.assertRaises(AssertionError) as cm:
+            await self.assertCompletesWithin(friendly_handler(), 0.01)
+        self.assertIn('did not complete within 0.01s', str(cm.exception))
+
+    async def test_completes_within_blocked(self):
+        with self.assertRaises(AssertionError) as cm:
+            await self.assertCompletesWithin(blocking_handler(), 0.05)
+        self.assertIn('not within 0.05s', str(cm.exception))
+
+
+class TestMaxLoopBlockWithoutMonitoring(aiounittest.AsyncTestCase):
+
+    async def test_own_probe(self):
+        loop = asyncio.get_event_loop()
+        with self.assertRaises(AssertionError):
+            async with self.assertMaxLoopBlock(50):
+                await blocking_handler()
+        self.assertIsNone(aiounittest.timing.get_probe(loop))
@@ -0,0 +1,67 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from aiounittest.durations import DurationCache, class_key, get_path
+
+
+class TestDurationCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'durations.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_class_key(self):
+        self.assertEqual(class_key('pkg.test_mod.TestCase.test_x'), 'pkg.test_mod.TestCase')
+        self.assertEqual(class_key('pkg.test_mod.TestCase.test_x (i=1.5)'), 'pkg.test_mod.TestCase')
+
+    def test_save_incremental(self):
+        cache = DurationCache(self.path)
+        cache.record('mod.A.test_1', 1.0)
+        cache.record('mod.A.test_2', 2.0, failed=True)
+        cache.save()
+        cache = DurationCache(self.path)
+        self.assertEqual(cache.get('mod.A'), {'duration': 3.0, 'failed': True})
+        # the next run updates the tests run only
+        cache.record('mod.A.test_2', 0.5)
+        cache.save()
+        cache = DurationCache(self.path)
+        self.assertEqual(cache.get('mod.A.test_1'), {'duration': 1.0, 'failed': False})
+        self.assertEqual(cache.get('mod.A'), {'duration': 1.5, 'failed': False})
+
+    def test_concurrent_save(self):
+        first, second = DurationCache(self.path), DurationCache(self.path)
+        first.record('mod.A.test_1', 1.0)
+        second.record('mod.B.test_1', 2.0)
+        first.save()
+        second.save()
+        with open(self.path) as f:
+            self.assertEqual(sorted(json.load(f)['tests']), ['mod.A.test_1', 'mod.B.test_1'])
+
+    def test_sort(self):
+        cache = DurationCache(self.path)
+        cache.record('mod.Short.test', 0.1)
+        cache.record('mod.Long.test', 5.0)
+        cache.record('mod.Failed.test', 0.2, failed=True)
+        cache.save()
+        keys = ['mod.Short', 'mod.Failed', 'mod.New', 'mod.Long']
+        self.assertEqual(cache.sort(keys), ['mod.Failed', 'mod.New', 'mod.Long', 'mod.Short'])
+        self.assertEqual(cache.sort(keys, 'longest'), ['mod.New', 'mod.Long', 'mod.Failed', 'mod.Short'])
+        self.assertEqual(cache.sort(keys, 'none'), keys)
+        with self.assertRaises(ValueError):
+            cache.sort(keys, 'random')
+
+    def test_broken_file(self):
+        with open(self.path, 'w') as f:
+            f.write('{')
+        self.assertEqual(DurationCache(self.path).tests, {})
+
+    def test_get_path(self):
+        self.assertIsNone(get_path())
+        self.assertIsNone(get_path(False))
+        self.assertEqual(get_path(True), '.aiounittest-durations.json')
+        self.assertEqual(get_path(self.path), self.path)
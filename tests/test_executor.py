@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+import unittest
+import aiounittest
+from aiounittest import async_test
+from aiounittest.executor import ExecutorBusyError, SharedExecutor, get_shared_executor, get_size
+
+
+def thread_ident():
+    time.sleep(0.01)
+    return threading.get_ident()
+
+
+class TestSharedExecutor(aiounittest.AsyncTestCase):
+    shared_executor = 2
+    threads = set()
+
+    async def test_1(self):
+        loop = asyncio.get_event_loop()
+        self.assertIs(loop._default_executor, get_shared_executor())
+        results = await asyncio.gather(*[loop.run_in_executor(None, thread_ident) for _ in range(4)])
+        self.threads.update(results)
+
+    async def test_2(self):
+        loop = asyncio.get_event_loop()
+        self.threads.add(await loop.run_in_executor(None, thread_ident))
+        self.assertLessEqual(len(self.threads), 2)
+
+
+class TestExecutor(unittest.TestCase):
+
+    def test_get_size(self):
+        self.assertIs(get_size(False), False)
+        self.assertIsNone(get_size(True))
+        self.assertEqual(get_size(4), 4)
+
+    def test_stats(self):
+        executor = SharedExecutor(2)
+        self.addCleanup(executor.close)
+        futures = [executor.submit(time.sleep, 0.05) for _ in range(4)]
+        stats = executor.stats()
+        self.assertEqual(stats['submitted'], 4)
+        self.assertGreaterEqual(stats['max_queue_depth'], 1)
+        [f.result() for f in futures]
+        stats = executor.stats()
+        self.assertEqual(stats['completed'], 4)
+        self.assertEqual(stats['max_active'], 2)
+        self.assertEqual(stats['threads'], 2)
+        self.assertGreaterEqual(stats['busy'], 0.2)
+        self.assertGreater(stats['utilisation'], 0)
+        executor.shutdown()
+        self.assertEqual(executor.submit(sum, [1, 2]).result(), 3)
+
+    def test_busy_at_the_end(self):
+        event = threading.Event()
+
+        async def forget():
+            loop = asyncio.get_event_loop()
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(loop.run_in_executor(None, event.wait), 0.01)
+
+        with self.assertRaises(ExecutorBusyError) as ctx:
+            async_test(forget, shared_executor=True)()
+        self.assertIn('wait', str(ctx.exception))
+        event.set()
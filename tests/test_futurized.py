@@ -1,4 +1,5 @@
-from aiounittest import futurized, AsyncTestCase
+import asyncio
+from aiounittest import futurized, futurized_constant, futurized_sequence, AsyncTestCase
 from unittest.mock import Mock, patch
 
 import dummy_math
@@ -18,3 +19,43 @@ class MyAddTest(AsyncTestCase):
         with self.assertRaises(Exception) as e:
             await dummy_math.add(5, 6)
         mock_sleep.assert_called_once_with(666)
+
+
+class FuturizedConstantTest(AsyncTestCase):
+
+    async def test_constant(self):
+        mock_fetch = Mock(return_value=futurized_constant('whatever'))
+        for _ in range(3):
+            self.assertEqual(await mock_fetch(), 'whatever')
+        self.assertEqual(mock_fetch.call_count, 3)
+
+    def test_loop_agnostic(self):
+        constant = futurized_constant(5)
+        for _ in range(2):
+            loop = asyncio.new_event_loop()
+            self.assertEqual(loop.run_until_complete(self._await(constant)), 5)
+            loop.close()
+
+    async def _await(self, awaitable):
+        return await awaitable
+
+    async def test_exception(self):
+        constant = futurized_constant(ValueError('whatever'))
+        depths = []
+        for _ in range(2):
+            try:
+                await constant
+            except ValueError as e:
+                depth, tb = 0, e.__traceback__
+                while tb is not None:
+                    depth, tb = depth + 1, tb.tb_next
+                depths.append(depth)
+        # the traceback doesn't grow
+        self.assertEqual(depths[0], depths[1])
+
+    async def test_sequence(self):
+        mock_fetch = Mock(side_effect=futurized_sequence(['page1', 'page2', TimeoutError('end')]))
+        self.assertEqual(await mock_fetch(), 'page1')
+        self.assertEqual(await mock_fetch(), 'page2')
+        with self.assertRaises(TimeoutError):
+            await mock_fetch()
@@ -0,0 +1,61 @@
+import asyncio
+import random
+import unittest
+from aiounittest import AsyncTestCase
+from aiounittest.mock import (
+    LatencyMock, constant_latency, uniform_latency, lognormal_latency, histogram_latency
+)
+
+
+class TestLatencyDistributions(unittest.TestCase):
+
+    def test_distributions(self):
+        rng = random.Random(0)
+        self.assertEqual(constant_latency(0.5)(), 0.5)
+        self.assertTrue(all(1 <= uniform_latency(1, 2, rng)() <= 2 for _ in range(100)))
+        samples = sorted(lognormal_latency(0.1, 0.5, rng)() for _ in range(1001))
+        self.assertAlmostEqual(samples[500], 0.1, delta=0.01)
+        latency = histogram_latency({0.01: 90, 0.5: 10}, rng)
+        samples = [latency() for _ in range(1000)]
+        self.assertEqual(set(samples), {0.01, 0.5})
+        self.assertAlmostEqual(samples.count(0.5) / 1000, 0.1, delta=0.03)
+        self.assertEqual(histogram_latency([0.2])(), 0.2)
+
+
+class TestLatencyMock(AsyncTestCase):
+    virtual_time = True
+
+    async def test_latency(self):
+        loop = asyncio.get_event_loop()
+        backend = LatencyMock(return_value='OK', latency=2)
+        self.assertEqual(await backend(1, key='value'), 'OK')
+        backend.assert_called_once_with(1, key='value')
+        self.assertEqual(loop.time(), 2)
+        self.assertEqual(backend.latency_stats.median, 2)
+
+    async def test_side_effect(self):
+        backend = LatencyMock(side_effect=[asyncio.sleep(1, result='first'), ValueError('second')],
+                              latency=constant_latency(1))
+        self.assertEqual(await backend(), 'first')
+        with self.assertRaises(ValueError):
+            await backend()
+        self.assertEqual(backend.errors, 1)
+        self.assertEqual(asyncio.get_event_loop().time(), 3)
+
+    async def test_concurrency(self):
+        loop = asyncio.get_event_loop()
+        backend = LatencyMock(latency=1, concurrency=2)
+        await asyncio.gather(*[backend() for _ in range(6)])
+        self.assertEqual(loop.time(), 3)
+        self.assertEqual(backend.max_concurrency, 2)
+        self.assertEqual(sorted(backend.latencies), [1, 1, 2, 2, 3, 3])
+        backend.reset_mock()
+        self.assertEqual(backend.latencies, [])
+
+    async def test_error_rate(self):
+        backend = LatencyMock(latency=0.1, error_rate=0.25, seed=1)
+        results = await asyncio.gather(*[backend() for _ in range(400)], return_exceptions=True)
+        errors = [r for r in results if isinstance(r, ConnectionError)]
+        self.assertEqual(len(errors), backend.errors)
+        self.assertAlmostEqual(backend.errors / 400, 0.25, delta=0.06)
+        self.assertEqual(backend.call_count, 400)
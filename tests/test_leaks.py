@@ -0,0 +1,115 @@
+import asyncio
+import io
+import unittest
+import warnings
+import aiounittest
+from aiounittest import async_test
+from aiounittest.leaks import ResourceLeakError, get_mode
+
+
+async def forever():
+    await asyncio.sleep(3600)
+
+
+async def ticker():
+    while True:
+        yield
+        await asyncio.sleep(0)
+
+
+class TestLeaks(unittest.TestCase):
+
+    def test_get_mode(self):
+        self.assertIsNone(get_mode(False))
+        self.assertEqual(get_mode(True), 'count')
+        self.assertEqual(get_mode('detailed'), 'detailed')
+        with self.assertRaises(ValueError):
+            get_mode('all')
+
+    def test_pending_task(self):
+
+        async def leak():
+            asyncio.ensure_future(forever())
+
+        with self.assertRaises(ResourceLeakError) as ctx:
+            async_test(leak, leaks='count')()
+        self.assertEqual(list(ctx.exception.leaks), ['pending task'])
+        self.assertIn('pending task: 1', str(ctx.exception))
+        self.assertNotIn('created at', str(ctx.exception))
+
+        with self.assertRaises(ResourceLeakError) as ctx:
+            async_test(leak, leaks='detailed')()
+        self.assertIn('created at', str(ctx.exception))
+        self.assertIn('in leak', str(ctx.exception))
+
+    def test_server_and_transport(self):
+
+        async def serve():
+            server = await asyncio.get_event_loop().create_server(asyncio.Protocol, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            await asyncio.open_connection('127.0.0.1', port)
+
+        with self.assertRaises(ResourceLeakError) as ctx:
+            async_test(serve, leaks='detailed')()
+        self.assertIn('open server', ctx.exception.leaks)
+        self.assertIn('open transport', ctx.exception.leaks)
+
+    def test_unawaited_coroutine(self):
+
+        async def forget():
+            forever()
+
+        with self.assertRaises(ResourceLeakError) as ctx:
+            async_test(forget, leaks='detailed')()
+        self.assertIn("coroutine 'forever' was never awaited", str(ctx.exception))
+
+    def test_asyncgen(self):
+        agens = []
+
+        async def iterate():
+            agen = ticker()
+            agens.append(agen)
+            await agen.__anext__()
+
+        with self.assertRaises(ResourceLeakError) as ctx:
+            async_test(iterate, leaks='detailed')()
+        self.assertIn('async generator not finalized', ctx.exception.leaks)
+        self.assertIn('ticker', str(ctx.exception))
+
+    def test_clean(self):
+
+        async def clean():
+            task = asyncio.ensure_future(forever())
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with warnings.catch_warnings(record=True) as recorded:
+            warnings.simplefilter('always')
+            async_test(clean, leaks='detailed')()
+            warnings.warn('kept', UserWarning)
+        self.assertEqual([str(w.message) for w in recorded], ['kept'])
+
+    def test_class_fixtures(self):
+
+        class Case(aiounittest.AsyncTestCase):
+            leaks = 'count'
+
+            @classmethod
+            async def asyncSetUpClass(cls):
+                cls.task = asyncio.ensure_future(forever())
+
+            @classmethod
+            async def asyncTearDownClass(cls):
+                cls.task.cancel()
+
+            async def test_1(self):
+                pass
+
+            async def test_2(self):
+                asyncio.ensure_future(forever())
+
+        result = unittest.TextTestRunner(io.StringIO()).run(unittest.TestLoader().loadTestsFromTestCase(Case))
+        self.assertEqual(result.testsRun, 2)
+        self.assertEqual(len(result.failures), 1)
+        self.assertIn('test_2', result.failures[0][0].id())
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest.mock import patch
+import aiounittest
+from aiounittest import async_test, VirtualTimeEventLoop
+from aiounittest.loops import resolve_loop_factory, new_eager_event_loop
+
+
+class CustomEventLoop(asyncio.SelectorEventLoop):
+    pass
+
+
+class TestLoopFactoryCase(aiounittest.AsyncTestCase):
+    loop_factory = CustomEventLoop
+    loop_debug = True
+
+    async def test_custom_loop(self):
+        loop = asyncio.get_event_loop()
+        self.assertIsInstance(loop, CustomEventLoop)
+        self.assertTrue(loop.get_debug())
+
+
+class TestLoopFactoryNameCase(aiounittest.AsyncTestCase):
+    loop_factory = 'test_loop_factory:CustomEventLoop'
+    loop_scope = 'class'
+
+    @classmethod
+    def tearDownClass(cls):
+        aiounittest.helpers.close_scoped_loops()
+
+    async def test_custom_loop(self):
+        self.assertIsInstance(asyncio.get_event_loop(), CustomEventLoop)
+
+
+class TestLoopFactory(unittest.TestCase):
+
+    def test_resolve(self):
+        self.assertIs(resolve_loop_factory(), asyncio.new_event_loop)
+        self.assertIs(resolve_loop_factory('virtual'), VirtualTimeEventLoop)
+        self.assertIs(resolve_loop_factory(CustomEventLoop), CustomEventLoop)
+        self.assertIs(resolve_loop_factory('asyncio:new_event_loop'), asyncio.new_event_loop)
+        with self.assertRaises(ValueError):
+            resolve_loop_factory('unknown')
+
+    def test_environment_variable(self):
+
+        @async_test
+        async def get_loop():
+            return asyncio.get_event_loop()
+
+        with patch.dict(os.environ, {'AIOUNITTEST_LOOP_FACTORY': 'virtual', 'AIOUNITTEST_LOOP_DEBUG': '1',
+                                     'AIOUNITTEST_LOOP_SCOPE': 'test'}):
+            loop = get_loop()
+        self.assertIsInstance(loop, VirtualTimeEventLoop)
+        self.assertTrue(loop.get_debug())
+        self.assertTrue(loop.is_closed())
+
+    @unittest.skipIf(sys.version_info < (3, 12), 'eager_task_factory requires Python 3.12+')
+    def test_eager(self):
+        started = []
+
+        @async_test(loop_factory='eager')
+        async def run():
+            async def coro():
+                started.append(True)
+            task = asyncio.ensure_future(coro())
+            self.assertEqual(started, [True])
+            await task
+
+        run()
+
+    @unittest.skipIf(sys.version_info >= (3, 12), 'eager_task_factory is available')
+    def test_eager_not_available(self):
+        with self.assertRaises(RuntimeError):
+            new_eager_event_loop()
@@ -0,0 +1,69 @@
+import asyncio
+import unittest
+import aiounittest
+from aiounittest import async_test
+from aiounittest.helpers import close_scoped_loops
+
+
+class TestClassLoopScope(aiounittest.AsyncTestCase):
+    loop_scope = 'class'
+    loops = []
+
+    @classmethod
+    def tearDownClass(cls):
+        close_scoped_loops('class')
+
+    async def test_1_first(self):
+        self.loops.append(asyncio.get_event_loop())
+
+    async def test_2_leftover_task(self):
+        loop = asyncio.get_event_loop()
+        self.loops.append(loop)
+        self.__class__.leftover = loop.create_task(asyncio.sleep(666))
+
+    async def test_3_same_loop_clean(self):
+        loop = asyncio.get_event_loop()
+        self.assertIs(loop, self.loops[0])
+        self.assertIs(loop, self.loops[1])
+        self.assertTrue(self.leftover.cancelled())
+
+
+class TestSessionLoopScopeDecorator(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        close_scoped_loops('session')
+
+    @async_test(loop_scope='session')
+    async def get_loop(self):
+        return asyncio.get_event_loop()
+
+    def test_reuse(self):
+        loop = self.get_loop()
+        self.assertIs(loop, self.get_loop())
+        self.assertFalse(loop.is_closed())
+        close_scoped_loops('session')
+        self.assertTrue(loop.is_closed())
+        self.assertIsNot(loop, self.get_loop())
+
+    def test_async_generator_closed(self):
+        closed = []
+
+        async def agen():
+            try:
+                yield 1
+                yield 2
+            finally:
+                closed.append(True)
+
+        @async_test(loop_scope='session')
+        async def partially_consume():
+            async for _ in agen():
+                break
+
+        partially_consume()
+        self.assertEqual(closed, [True])
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            async_test(self.get_loop.__wrapped__, loop_scope='galaxy')()
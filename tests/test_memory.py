@@ -0,0 +1,113 @@
+import asyncio
+import os
+import tracemalloc
+import unittest
+import aiounittest
+from aiounittest import async_test, memory
+from aiounittest.memory import MemoryTracker, get_mode
+
+
+async def buffer_all(size):
+    chunks = []
+    for _ in range(size // 1024):
+        chunks.append(bytes(1024))
+        await asyncio.sleep(0)
+    return len(chunks)
+
+
+async def stream_all(size):
+    total = 0
+    for _ in range(size // 1024):
+        total += len(bytes(1024))
+        await asyncio.sleep(0)
+    return total
+
+
+class Cache:
+    def __init__(self):
+        self.items = []
+
+    async def add(self):
+        self.items.append(bytearray(4096))
+
+
+class TestMemory(unittest.TestCase):
+
+    def setUp(self):
+        memory.clear()
+
+    def tearDown(self):
+        memory.clear()
+
+    def test_results(self):
+        async_test(buffer_all, memory=True)(512 * 1024)
+        usage, = memory.results
+        self.assertEqual(usage.name, '%s.buffer_all' % __name__)
+        self.assertGreater(usage.peak, 512 * 1024)
+        # freed at the end
+        self.assertLess(usage.net, 64 * 1024)
+        self.assertEqual(usage.top, [])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_detailed(self):
+        cache = Cache()
+
+        async def fill():
+            for _ in range(100):
+                await cache.add()
+
+        async_test(fill, memory='detailed')()
+        usage, = memory.results
+        self.assertGreater(usage.net, 100 * 4096)
+        self.assertIn(__file__, usage.top[0][2])
+
+    def test_disabled(self):
+        async_test(buffer_all)(1024)
+        self.assertEqual(memory.results, [])
+
+    def test_nested_peak(self):
+        outer = MemoryTracker('outer').start()
+        data = bytearray(1024 * 1024)
+        del data
+        with MemoryTracker('inner') as inner:
+            pass
+        usage = outer.stop()
+        self.assertLess(inner.usage.peak, 1024 * 1024)
+        self.assertGreater(usage.peak, 1024 * 1024)
+
+    def test_get_mode(self):
+        self.assertIsNone(get_mode())
+        self.assertEqual(get_mode(True), 'summary')
+        self.assertEqual(get_mode('detailed'), 'detailed')
+        os.environ['AIOUNITTEST_MEMORY'] = '1'
+        try:
+            self.assertEqual(get_mode(), 'summary')
+        finally:
+            del os.environ['AIOUNITTEST_MEMORY']
+        with self.assertRaises(ValueError):
+            get_mode('everything')
+
+
+class TestMemoryAssertions(aiounittest.AsyncTestCase):
+
+    async def test_max_memory(self):
+        with self.assertMaxMemory(256 * 1024) as usage:
+            await stream_all(1024 * 1024)
+        self.assertLess(usage.peak, 256 * 1024)
+
+    async def test_max_memory_exceeded(self):
+        with self.assertRaises(AssertionError) as cm:
+            with self.assertMaxMemory(256 * 1024, detailed=True):
+                self.buffered = await buffer_all(1024 * 1024)
+        self.assertIn('exceeds 256.0 KiB', str(cm.exception))
+
+    async def test_no_memory_growth(self):
+        usage = await self.assertNoMemoryGrowth(stream_all, 64 * 1024)
+        self.assertLess(usage.net, 10 * 1024)
+
+    async def test_memory_growth(self):
+        cache = Cache()
+        with self.assertRaises(AssertionError) as cm:
+            await self.assertNoMemoryGrowth(cache.add, rounds=20)
+        self.assertIn('memory grew by', str(cm.exception))
+        self.assertIn(__file__, str(cm.exception))
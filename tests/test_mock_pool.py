@@ -0,0 +1,78 @@
+import asyncio
+from aiounittest import AsyncTestCase
+from aiounittest.mock import MockPool
+
+
+async def handle(pool, duration=1):
+    async with pool.acquire() as conn:
+        await asyncio.sleep(duration)
+        return conn
+
+
+class TestMockPool(AsyncTestCase):
+    virtual_time = True
+
+    async def test_free(self):
+        pool = MockPool(size=2)
+        first = await handle(pool)
+        second = await handle(pool)
+        self.assertIs(first, second)
+        self.assertEqual(len(pool.connections), 1)
+        self.assertEqual(pool.stats['acquired'], 2)
+        self.assertEqual(pool.max_wait, 0)
+        pool.assertAllReleased()
+
+    async def test_saturated(self):
+        loop = asyncio.get_event_loop()
+        pool = MockPool(size=2, latency=0.5)
+        connections = await asyncio.gather(*[handle(pool) for _ in range(6)])
+        self.assertEqual(len(set(map(id, connections))), 2)
+        self.assertEqual(loop.time(), 4.5)
+        self.assertEqual(pool.max_in_use, 2)
+        self.assertEqual(pool.max_queue_depth, 4)
+        self.assertEqual(sorted(pool.waits), [0, 0, 1.5, 1.5, 3, 3])
+        self.assertEqual(pool.max_wait, 3)
+        self.assertEqual(pool.wait_stats.median, 1.5)
+        stats = pool.stats
+        self.assertEqual(stats['max_queue_depth'], 4)
+        # 4 waiting for 1.5s, 2 for the next 1.5s, of 4.5s
+        self.assertAlmostEqual(stats['mean_queue_depth'], 2)
+        pool.assertAllReleased()
+        pool.assertMaxWait(3)
+        with self.assertRaises(AssertionError):
+            pool.assertMaxWait(1)
+
+    async def test_timeout(self):
+        pool = MockPool(size=1, timeout=0.5)
+        task = asyncio.ensure_future(handle(pool))
+        await asyncio.sleep(0)
+        with self.assertRaises(asyncio.TimeoutError):
+            await handle(pool)
+        self.assertEqual(pool.timeouts, 1)
+        conn = await pool.acquire(timeout=None)
+        self.assertIs(conn, await task)
+        pool.release(conn)
+        self.assertEqual(pool.queue_depth, [(0, 1), (0.5, 0), (0.5, 1), (1, 0)])
+        self.assertEqual(pool.waits, [0, 0.5])
+
+    async def test_cancelled(self):
+        pool = MockPool(size=1)
+        conn = await pool.acquire()
+        waiting = asyncio.ensure_future(handle(pool))
+        served = asyncio.ensure_future(handle(pool))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        pool.release(conn)
+        self.assertIs(await served, conn)
+        self.assertTrue(waiting.cancelled())
+        pool.assertAllReleased()
+
+    async def test_release(self):
+        pool = MockPool(size=1)
+        conn = await pool.acquire(timeout=1)
+        with self.assertRaises(AssertionError):
+            pool.assertAllReleased()
+        pool.release(conn)
+        with self.assertRaises(ValueError):
+            pool.release(conn)
+        self.assertIn('size=1', repr(pool))
@@ -0,0 +1,96 @@
+import asyncio
+import os
+import pstats
+import shutil
+import tempfile
+import time
+import unittest
+import aiounittest
+from aiounittest import async_test, profiling
+
+
+async def wait_for_reply():
+    await asyncio.sleep(0.05)
+
+
+def crunch():
+    started = time.perf_counter()
+    while time.perf_counter() - started < 0.05:
+        pass
+
+
+async def handle():
+    crunch()
+    await wait_for_reply()
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        profiling.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        profiling.clear()
+
+    def test_files(self):
+        async_test(handle, profile=self.directory)()
+        profiler, = profiling.results
+        self.assertEqual(profiler.name, '%s.handle' % __name__)
+        self.assertEqual(os.path.dirname(profiler.pstats_path), self.directory)
+        functions = {name for _, _, name in pstats.Stats(profiler.pstats_path).stats}
+        self.assertIn('crunch', functions)
+        with open(profiler.collapsed_path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack.startswith(profiler.name + ';'))
+            self.assertGreater(int(count), 0)
+
+    def test_logical_stacks(self):
+        async_test(handle, profile=self.directory)()
+        samples = profiling.results[0].samples
+        running = sum(count for stack, count in samples.items() if stack.split(';')[-1].startswith('crunch'))
+        awaiting = sum(count for stack, count in samples.items()
+                       if 'wait_for_reply' in stack and stack.endswith('[await Future]'))
+        self.assertGreater(running, 0)
+        # the time of sleep is attributed to the coroutine awaiting it
+        self.assertGreater(awaiting, 0)
+        for stack in samples:
+            if 'crunch' in stack:
+                self.assertIn('handle (', stack)
+
+    def test_disabled(self):
+        async_test(handle)()
+        self.assertEqual(profiling.results, [])
+
+    def test_environment(self):
+        os.environ['AIOUNITTEST_PROFILE'] = self.directory
+        try:
+            self.assertEqual(profiling.get_directory(), self.directory)
+            self.assertEqual(profiling.get_directory(True), self.directory)
+            self.assertIsNone(profiling.get_directory(False))
+            os.environ['AIOUNITTEST_PROFILE'] = '1'
+            self.assertEqual(profiling.get_directory(), profiling.DEFAULT_DIRECTORY)
+        finally:
+            del os.environ['AIOUNITTEST_PROFILE']
+        self.assertIsNone(profiling.get_directory())
+        self.assertEqual(profiling.get_directory(True), profiling.DEFAULT_DIRECTORY)
+
+
+class TestProfilingCase(aiounittest.AsyncTestCase):
+    directory = tempfile.mkdtemp()
+    profile = directory
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    async def test_profiled(self):
+        await handle()
+
+    def test_zz_written(self):
+        self.assertTrue(os.path.exists(os.path.join(self.directory, self.id().replace('test_zz_written', 'test_profiled')
+                                                    + '.collapsed')))
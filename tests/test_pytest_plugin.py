@@ -0,0 +1,127 @@
+import json
+import os
+
+pytest_plugins = ['pytester']
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TESTS = '''
+import asyncio
+import pytest
+import aiounittest
+
+loops = {}
+
+
+@pytest.fixture
+async def server():
+    loops['server'] = asyncio.get_event_loop()
+    queue = asyncio.Queue()
+    task = asyncio.ensure_future(queue.get())
+    yield queue
+    await queue.put(None)
+    assert task.done() or (await task) is None
+
+
+class TestCase(aiounittest.AsyncTestCase):
+
+    @pytest.fixture(autouse=True)
+    def use_server(self, server):
+        self.server = server
+
+    async def test_shares_loop_with_fixture(self):
+        assert asyncio.get_event_loop() is loops['server']
+        loops.setdefault('tests', []).append(asyncio.get_event_loop())
+
+
+@aiounittest.async_test
+async def test_async_test(server):
+    assert asyncio.get_event_loop() is loops['server']
+    loops.setdefault('tests', []).append(asyncio.get_event_loop())
+
+
+@pytest.mark.aiounittest
+async def test_marked(server):
+    await asyncio.sleep(0)
+    assert asyncio.get_event_loop() is loops['server']
+    loops.setdefault('tests', []).append(asyncio.get_event_loop())
+
+
+def test_loops():
+    assert len(loops['tests']) == 3
+    assert len(set(map(id, loops['tests']))) == EXPECTED
+'''
+
+
+class TestPytestPlugin:
+
+    def run(self, testdir, monkeypatch, expected, *args):
+        monkeypatch.setenv('PYTHONPATH', ROOT)
+        monkeypatch.delenv('AIOUNITTEST_LOOP_SCOPE', raising=False)
+        testdir.makepyfile(test_plugin=TESTS.replace('EXPECTED', str(expected)))
+        return testdir.runpytest_subprocess('-p', 'aiounittest.pytest_plugin', '-p', 'no:cacheprovider', *args)
+
+    def test_test_scope(self, testdir, monkeypatch):
+        self.run(testdir, monkeypatch, 3).assert_outcomes(passed=4)
+
+    def test_session_scope(self, testdir, monkeypatch):
+        self.run(testdir, monkeypatch, 1, '--aiounittest-loop-scope=session').assert_outcomes(passed=4)
+
+    def test_ini_scope(self, testdir, monkeypatch):
+        testdir.makeini('[pytest]\naiounittest_loop_scope = module\n')
+        self.run(testdir, monkeypatch, 1).assert_outcomes(passed=4)
+
+    def test_other_tests_fixtures_untouched(self, testdir, monkeypatch):
+        monkeypatch.setenv('PYTHONPATH', ROOT)
+        fixture = '''
+import pytest
+import aiounittest
+
+@pytest.fixture
+async def resource():
+    return 1
+'''
+        testdir.makepyfile(test_plain=fixture + '''
+def test_plain(resource):
+    # pytest doesn't run async fixtures of sync tests
+    assert resource == 1
+''', test_resource=fixture + '''
+@aiounittest.async_test
+async def test_resource(resource):
+    assert resource == 1
+''')
+        result = testdir.runpytest_subprocess('-p', 'aiounittest.pytest_plugin', '-p', 'no:cacheprovider', '-v')
+        result.stdout.fnmatch_lines(['*test_resource PASSED*'])
+        result.stdout.no_fnmatch_line('*test_plain PASSED*')
+
+    def test_fixture_scope_mismatch(self, testdir, monkeypatch):
+        monkeypatch.setenv('PYTHONPATH', ROOT)
+        # a session fixture for the loop of a test
+        monkeypatch.setenv('AIOUNITTEST_LOOP_SCOPE', 'test')
+        testdir.makepyfile('''
+import pytest
+import aiounittest
+
+@pytest.fixture(scope='session')
+async def resource():
+    return 1
+
+@aiounittest.async_test
+async def test_resource(resource):
+    pass
+''')
+        result = testdir.runpytest_subprocess('-p', 'aiounittest.pytest_plugin', '-p', 'no:cacheprovider')
+        result.assert_outcomes(errors=1)
+        result.stdout.fnmatch_lines(['*ScopeMismatch*'])
+
+    def test_xdist_worker_results_merged(self, tmp_path):
+        from aiounittest.pytest_plugin import _merge_benchmarks
+        path = str(tmp_path / 'baseline.json')
+        for name, content in ((path, '{"a": {"median": 1}}'), (path + '.gw0', '{"b": {"median": 2}}'),
+                              (path + '.gw1', '{"a": {"median": 3}}')):
+            with open(name, 'w') as f:
+                f.write(content)
+        _merge_benchmarks(path)
+        with open(path) as f:
+            assert json.load(f) == {'a': {'median': 3}, 'b': {'median': 2}}
+        assert os.listdir(str(tmp_path)) == ['baseline.json']
@@ -0,0 +1,161 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest.mock import patch
+from aiounittest.durations import DurationCache
+from aiounittest.runner import ShardedTestRunner, main
+
+
+SAMPLE_TESTS = '''
+import asyncio
+import os
+import aiounittest
+
+
+class TestFirst(aiounittest.AsyncTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pid = os.getpid()
+        cls.loops = set()
+
+    async def test_1(self):
+        self.assertEqual(os.getpid(), self.pid)
+        self.loops.add(asyncio.get_event_loop())
+
+    async def test_2(self):
+        self.assertEqual(os.getpid(), self.pid)
+        self.loops.add(asyncio.get_event_loop())
+
+    async def test_3(self):
+        # a loop per test, unless the worker reuses one
+        self.assertEqual(len(self.loops), 2 if os.environ.get('AIOUNITTEST_LOOP_SCOPE', 'test') == 'test' else 1)
+
+
+class TestSecond(aiounittest.AsyncTestCase):
+
+    async def test_fail(self):
+        self.assertEqual(1, 2, 'expected failure message')
+
+    def test_sync(self):
+        pass
+
+    @unittest.skip('skipped')
+    def test_skip(self):
+        pass
+'''
+
+
+TEARDOWN_TESTS = '''
+import os
+import unittest
+
+
+def log(line):
+    with open(os.path.join(os.path.dirname(__file__), 'teardown.log'), 'a') as f:
+        f.write(line + '\\n')
+
+
+def tearDownModule():
+    log('tearDownModule')
+
+
+class TestA(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        log('tearDownClass A')
+
+    def test(self):
+        pass
+
+
+class TestB(TestA):
+
+    @classmethod
+    def tearDownClass(cls):
+        log('tearDownClass B')
+'''
+
+
+def count_run(result):
+    # only Python 3.12.1 doesn't count skipped tests
+    return result.testsRun + (len(result.skipped) if sys.version_info[:3] == (3, 12, 1) else 0)
+
+
+class TestShardedTestRunner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        with open(os.path.join(cls.directory, 'test_sharded_sample.py'), 'w') as f:
+            f.write('import unittest\n' + textwrap.dedent(SAMPLE_TESTS))
+        with open(os.path.join(cls.directory, 'test_sharded_broken.py'), 'w') as f:
+            f.write('import not_existing_module\n')
+        with open(os.path.join(cls.directory, 'teardown_sample.py'), 'w') as f:
+            f.write(TEARDOWN_TESTS)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def run_sharded(self, **kwargs):
+        suite = unittest.TestLoader().discover(self.directory, top_level_dir=self.directory)
+        stream = io.StringIO()
+        result = ShardedTestRunner(stream=stream, verbosity=2, **kwargs).run(suite)
+        return result, stream.getvalue()
+
+    def test_run(self):
+        result, output = self.run_sharded(jobs=2, loop_scope='session')
+        self.assertEqual(count_run(result), 7)
+        self.assertEqual(len(result.failures), 1)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(len(result.skipped), 1)
+        self.assertIn('expected failure message', result.failures[0][1])
+        self.assertIn('not_existing_module', result.errors[0][1])
+        self.assertIn('test_3 (test_sharded_sample.TestFirst', output)
+
+    def test_split(self):
+        suite = unittest.TestLoader().discover(self.directory, top_level_dir=self.directory)
+        shards, local = ShardedTestRunner(granularity='class').split(suite)
+        self.assertEqual([len(shard) for shard in shards], [3, 3])
+        self.assertEqual(local.countTestCases(), 1)
+        shards, _ = ShardedTestRunner(granularity='test').split(suite)
+        self.assertEqual(len(shards), 6)
+
+    def test_durations(self):
+        path = os.path.join(self.directory, 'durations.json')
+        self.run_sharded(jobs=2, duration_cache=path)
+        cache = DurationCache(path)
+        self.assertEqual(len(cache.tests), 6)
+        self.assertTrue(cache.get('test_sharded_sample.TestSecond')['failed'])
+        self.assertFalse(cache.get('test_sharded_sample.TestFirst')['failed'])
+        suite = unittest.TestLoader().discover(self.directory, top_level_dir=self.directory)
+        # failed first
+        shards, _ = ShardedTestRunner(duration_cache=path).split(suite)
+        self.assertEqual(shards[0][0], 'test_sharded_sample.TestSecond.test_fail')
+        cache.record('test_sharded_sample.TestFirst.test_1', 10.0)
+        cache.save()
+        shards, _ = ShardedTestRunner(duration_cache=path, order='longest').split(suite)
+        self.assertEqual(shards[0][0], 'test_sharded_sample.TestFirst.test_1')
+
+    def test_main(self):
+        path = os.path.join(self.directory, 'main-durations.json')
+        with patch('sys.stderr', io.StringIO()):
+            code = main(['-s', self.directory, '-t', self.directory, '-j', '2', '-p', 'test_sharded_sample.py',
+                         '--durations', path])
+        self.assertEqual(code, 1)
+        self.assertTrue(os.path.exists(path))
+
+    def test_fixtures_torn_down_once(self):
+        with patch('sys.stderr', io.StringIO()):
+            code = main(['-s', self.directory, '-t', self.directory, '-j', '1', '-p', 'teardown_sample.py',
+                         '--durations', '', '--order', 'none'])
+        self.assertEqual(code, 0)
+        with open(os.path.join(self.directory, 'teardown.log')) as f:
+            self.assertEqual(f.read().splitlines(), ['tearDownClass A', 'tearDownModule', 'tearDownClass B',
+                                                     'tearDownModule'])
@@ -0,0 +1,106 @@
+import asyncio
+import aiounittest
+from aiounittest.streams import MemoryNetwork, create_stream_pair, create_transport_pair
+
+
+async def echo(reader, writer):
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        writer.write(line)
+        await writer.drain()
+    writer.close()
+
+
+class Recorder(asyncio.Protocol):
+
+    def __init__(self):
+        self.events = []
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.events.append('connection_made')
+
+    def data_received(self, data):
+        self.events.append(data)
+
+    def eof_received(self):
+        self.events.append('eof')
+
+    def connection_lost(self, exc):
+        self.events.append(('connection_lost', exc))
+
+
+class TestStreams(aiounittest.AsyncTestCase):
+    virtual_time = True
+
+    async def test_stream_pair(self):
+        loop = asyncio.get_event_loop()
+        (reader, writer), server = await create_stream_pair(latency=0.5)
+        task = asyncio.ensure_future(echo(*server))
+        writer.write(b'ping\n')
+        await writer.drain()
+        self.assertEqual(await reader.readline(), b'ping\n')
+        self.assertEqual(loop.time(), 1)
+        writer.write_eof()
+        self.assertEqual(await reader.read(), b'')
+        await task
+        writer.close()
+
+    async def test_zero_copy(self):
+        client, server = Recorder(), Recorder()
+        transport, _ = create_transport_pair(client, server)
+        payload = b'x' * 1024
+        transport.write(payload)
+        transport.write(bytearray(b'abc'))
+        await asyncio.sleep(0)
+        self.assertIs(server.events[1], payload)
+        self.assertEqual(server.events[2], b'abc')
+
+    async def test_bandwidth_and_backpressure(self):
+        loop = asyncio.get_event_loop()
+        (reader, writer), (server_reader, server_writer) = await create_stream_pair(bandwidth=1000, limit=100)
+        writer.transport.set_write_buffer_limits(high=500)
+        writer.write(b'x' * 1000)
+        self.assertEqual(writer.transport.get_write_buffer_size(), 1000)
+        drained = asyncio.ensure_future(writer.drain())
+        await asyncio.sleep(0.5)
+        # the server doesn't read, so its reader pauses the transport
+        self.assertFalse(drained.done())
+        self.assertEqual(await server_reader.readexactly(1000), b'x' * 1000)
+        await drained
+        self.assertEqual(loop.time(), 1)
+        writer.close()
+        server_writer.close()
+
+    async def test_close_and_abort(self):
+        client, server = Recorder(), Recorder()
+        transport, server_transport = create_transport_pair(client, server)
+        transport.write(b'data')
+        transport.close()
+        self.assertTrue(transport.is_closing())
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.assertEqual(server.events, ['connection_made', b'data', 'eof'])
+        self.assertEqual(client.events, ['connection_made', ('connection_lost', None)])
+        server_transport.abort()
+        await asyncio.sleep(0)
+        self.assertEqual(server.events[-1], ('connection_lost', None))
+
+    async def test_network(self):
+        network = MemoryNetwork(latency=0.1)
+        with network.patch():
+            server = await asyncio.start_server(echo, '127.0.0.1', 0)
+            host, port = server.address
+            reader, writer = await asyncio.open_connection(host, port)
+            self.assertEqual(writer.get_extra_info('peername'), server.address)
+            writer.write(b'hello\n')
+            self.assertEqual(await reader.readline(), b'hello\n')
+            writer.close()
+            await asyncio.sleep(1)  # let the server finish
+            server.close()
+            await server.wait_closed()
+            with self.assertRaises(ConnectionRefusedError):
+                await asyncio.open_connection(host, port)
+        self.assertIsNot(asyncio.open_connection, network.open_connection)
@@ -0,0 +1,111 @@
+import asyncio
+import io
+import unittest
+import aiounittest
+from aiounittest import async_stress, async_test, stress
+from aiounittest.stress import StressFailure
+
+
+class Counter:
+
+    def __init__(self):
+        self.value = 0
+
+    async def racy_increment(self):
+        value = self.value
+        await asyncio.sleep(0)
+        self.value = value + 1
+
+    async def increment(self):
+        await asyncio.sleep(0)
+        self.value += 1
+
+
+class TestStressCase(aiounittest.AsyncTestCase):
+    stress = {'concurrency': 5, 'iterations': 50}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.counters = []
+
+    @classmethod
+    def tearDownClass(cls):
+        assert [counter.value for counter in cls.counters] == [50], cls.counters
+
+    async def asyncSetUp(self):
+        self.counter = Counter()
+        self.counters.append(self.counter)
+
+    async def test_increment(self):
+        await self.counter.increment()
+
+
+class TestStress(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(stress.clear)
+
+    @async_test
+    @async_stress(concurrency=4, iterations=20)
+    async def test_decorator(self):
+        await asyncio.sleep(0)
+
+    def test_stats(self):
+        counter = Counter()
+        stats = async_test(async_stress(counter.increment, concurrency=3, iterations=30))()
+        self.assertEqual(counter.value, 30)
+        self.assertEqual(stats.iterations, 30)
+        self.assertEqual(stats.concurrency, 3)
+        self.assertEqual(stats.failed, 0)
+        self.assertGreater(stats.throughput, 0)
+        self.assertLessEqual(stats.median, stats.p99)
+        self.assertIn(stats, stress.results)
+
+    def test_duration(self):
+        counter = Counter()
+
+        async def tick():
+            await asyncio.sleep(1)
+            await counter.increment()
+
+        stats = async_test(async_stress(tick, concurrency=2, duration=10), virtual_time=True)()
+        self.assertEqual(counter.value, 20)
+        self.assertEqual(stats.elapsed, 10)
+        self.assertEqual(stats.median, 1)
+        self.assertEqual(stats.throughput, 2)
+
+    def test_no_iterations(self):
+        stats = async_test(async_stress(Counter().increment, duration=0))()
+        self.assertEqual(stats.iterations, 0)
+        self.assertEqual(stats.median, 0)
+        self.assertEqual(stats.as_dict()['p99'], 0)
+
+    def test_failures_aggregated(self):
+
+        async def check(counter):
+            await counter.racy_increment()
+            assert counter.value % 2, 'even'
+
+        with self.assertRaises(StressFailure) as ctx:
+            async_test(async_stress(check, concurrency=4, iterations=40))(Counter())
+        self.assertEqual(ctx.exception.stats.iterations, 40)
+        self.assertEqual(len(ctx.exception.failures), ctx.exception.stats.failed)
+        self.assertIn('1 distinct errors', str(ctx.exception))
+        self.assertIn('AssertionError: even', str(ctx.exception))
+
+    def test_case_failure(self):
+
+        class Case(aiounittest.AsyncTestCase):
+            stress = {'concurrency': 10, 'iterations': 100}
+
+            async def asyncSetUp(self):
+                self.counter = Counter()
+
+            async def test_race(self):
+                await self.counter.racy_increment()
+
+            async def asyncTearDown(self):
+                self.assertEqual(self.counter.value, 100)
+
+        result = unittest.TextTestRunner(io.StringIO()).run(Case('test_race'))
+        self.assertEqual(len(result.failures), 1)
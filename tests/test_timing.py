@@ -0,0 +1,56 @@
+import asyncio
+import io
+import json
+import time
+import unittest
+import aiounittest
+from aiounittest import async_test, timing
+
+
+async def work():
+    await asyncio.gather(asyncio.sleep(0.05), asyncio.sleep(0.01))
+    time.sleep(0.02)
+
+
+class TestTimingCase(aiounittest.AsyncTestCase):
+    timing = True
+
+    def tearDown(self):
+        record = timing.records[-1]
+        self.assertEqual(record.name, self.id())
+        self.assertGreaterEqual(record.run, 0.07)
+        self.assertGreaterEqual(record.busy, 0.02)
+        self.assertGreaterEqual(record.idle, 0.04)
+        self.assertGreaterEqual(record.tasks, 3)
+        self.assertGreater(record.callbacks, 0)
+        self.assertGreaterEqual(record.slowest[0][0], 0.02)
+        self.assertTrue(record.slowest[0][1].startswith('Task '))
+        self.assertAlmostEqual(record.wall, record.setup + record.run + record.teardown)
+
+    async def test_work(self):
+        await work()
+
+
+class TestTiming(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(timing.clear)
+
+    def test_disabled(self):
+        timing.clear()
+        async_test(work)()
+        self.assertEqual(timing.records, [])
+
+    def test_dump_jsonl(self):
+        timing.clear()
+        async_test(work, timing=True)()
+        async_test(work, timing=True, loop_scope='session')()
+        out = io.StringIO()
+        timing.dump_jsonl(out)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]['name'], 'test_timing.work')
+        self.assertEqual(set(lines[0]), {
+            'name', 'wall', 'setup', 'run', 'teardown', 'busy', 'idle', 'callbacks', 'tasks', 'slowest'
+        })
+        aiounittest.helpers.close_scoped_loops()
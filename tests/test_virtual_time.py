@@ -0,0 +1,86 @@
+import asyncio
+import time
+import unittest
+from aiounittest import AsyncTestCase, VirtualTimeEventLoop, async_test
+
+
+async def add(x, y):
+    await asyncio.sleep(666)
+    return x + y
+
+
+class TestVirtualTime(AsyncTestCase):
+    virtual_time = True
+
+    async def test_sleep(self):
+        loop = asyncio.get_event_loop()
+        self.assertIsInstance(loop, VirtualTimeEventLoop)
+        started = time.monotonic()
+        ret = await add(5, 6)
+        self.assertEqual(ret, 11)
+        self.assertEqual(loop.time(), 666)
+        self.assertLess(time.monotonic() - started, 1)
+
+    async def test_order(self):
+        loop = asyncio.get_event_loop()
+        called = []
+        loop.call_later(3, called.append, 3)
+        loop.call_later(1, called.append, 1)
+        loop.call_later(2, called.append, 2)
+        await asyncio.sleep(5)
+        self.assertEqual(called, [1, 2, 3])
+
+    async def test_wait_for(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(asyncio.sleep(3600), 60)
+        self.assertEqual(asyncio.get_event_loop().time(), 60)
+
+    async def test_advance(self):
+        loop = asyncio.get_event_loop()
+        task = asyncio.ensure_future(add(5, 6))
+        await asyncio.sleep(0)  # let the task start
+        await loop.advance(600)
+        self.assertFalse(task.done())
+        await loop.advance(66)
+        self.assertTrue(task.done())
+        self.assertEqual(loop.time(), 666)
+        with self.assertRaises(ValueError):
+            await loop.advance(-1)
+
+    async def test_executor(self):
+        loop = asyncio.get_event_loop()
+        ret = await loop.run_in_executor(None, time.sleep, 0.1)
+        self.assertIsNone(ret)
+        self.assertEqual(loop.time(), 0)
+
+
+class TestVirtualTimeDecorator(unittest.TestCase):
+
+    @async_test(virtual_time=True)
+    async def test_sleep(self):
+        await asyncio.sleep(3600)
+        self.assertEqual(asyncio.get_event_loop().time(), 3600)
+
+
+class TestVirtualTimeReused(AsyncTestCase):
+    virtual_time = True
+    loop_scope = 'class'
+
+    @classmethod
+    async def asyncSetUpClass(cls):
+        cls.fired = []
+        asyncio.get_event_loop().call_later(100, cls.fired.append, True)
+
+    async def test_1(self):
+        await asyncio.sleep(60)
+        self.assertEqual(asyncio.get_event_loop().time(), 60)
+        self.assertEqual(self.fired, [])
+
+    async def test_2(self):
+        # the clock starts from 0 again, the timer of the class fixture has 40 seconds left
+        loop = asyncio.get_event_loop()
+        self.assertEqual(loop.time(), 0)
+        await asyncio.sleep(39)
+        self.assertEqual(self.fired, [])
+        await asyncio.sleep(2)
+        self.assertEqual(self.fired, [True])
@@ -0,0 +1,73 @@
+import asyncio
+import io
+import time
+import unittest
+import aiounittest
+from aiounittest import async_test
+from aiounittest.watchdog import DeadlineExceeded, Watchdog, get_timeout
+
+
+async def stuck(event):
+    await event.wait()
+
+
+async def outer():
+    await stuck(asyncio.Event())
+
+
+class TestWatchdog(unittest.TestCase):
+
+    def test_get_timeout(self):
+        self.assertIsNone(get_timeout(0))
+        self.assertEqual(get_timeout(1.5), 1.5)
+
+    def test_timeout(self):
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded) as ctx:
+            async_test(outer, timeout=0.1)()
+        self.assertLess(time.monotonic() - started, 1)
+        message = str(ctx.exception)
+        self.assertIn('timed out after 0.1s', message)
+        self.assertIn('in outer', message)
+        self.assertIn('await event.wait()', message)
+        self.assertIn('awaiting <Future pending', message)
+
+    def test_virtual_time(self):
+
+        async def sleep_forever():
+            await asyncio.get_event_loop().run_in_executor(None, time.sleep, 0.3)
+
+        with self.assertRaises(DeadlineExceeded):
+            async_test(sleep_forever, timeout=0.1, virtual_time=True)()
+
+    def test_in_time(self):
+        self.assertEqual(async_test(asyncio.sleep, timeout=1)(0, 'ok'), 'ok')
+
+    def test_blocked_loop(self):
+        stream = io.StringIO()
+
+        async def block():
+            time.sleep(0.5)
+
+        loop = asyncio.new_event_loop()
+        future = asyncio.ensure_future(block(), loop=loop)
+        watchdog = Watchdog(loop, future, 0.1, 'blocking', stream)
+        watchdog.grace = 0.1
+        watchdog.start()
+        loop.run_until_complete(future)
+        watchdog.stop()
+        loop.close()
+        self.assertIn('event loop is blocked', stream.getvalue())
+        self.assertIn('time.sleep(0.5)', stream.getvalue())
+
+    def test_case(self):
+
+        class Case(aiounittest.AsyncTestCase):
+            timeout = 0.1
+
+            async def test_hang(self):
+                await outer()
+
+        result = unittest.TextTestRunner(io.StringIO()).run(Case('test_hang'))
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn('DeadlineExceeded', result.errors[0][1])